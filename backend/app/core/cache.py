@@ -0,0 +1,109 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from app.core import metrics
+
+
+class TTLCache:
+    """
+    A small, thread-safe, in-process LRU cache whose entries expire after a
+    fixed time-to-live. Used as a local store in front of Firestore-backed
+    caches so repeated lookups on the same instance skip the network.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = None):
+        """
+        Args:
+            maxsize (int): Maximum number of entries kept before evicting the least recently used.
+            ttl (float, optional): Lifetime of an entry in seconds. None means entries never expire.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at and expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else 0.0
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return entry[1] if entry else default
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CacheStats:
+    """
+    Hit/miss counters for a cache, plus an estimate of the LLM tokens
+    that were not spent because a cached result was served.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.tokens_saved = 0
+        self._lock = threading.Lock()
+
+    def record_hit(self, tokens_saved: int = 0) -> None:
+        with self._lock:
+            self.hits += 1
+            self.tokens_saved += tokens_saved
+        metrics.cache_requests.inc(self.name, "hit")
+
+    def record_miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+        metrics.cache_requests.inc(self.name, "miss")
+
+    def record_bypass(self) -> None:
+        with self._lock:
+            self.bypasses += 1
+        metrics.cache_requests.inc(self.name, "bypass")
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def snapshot(self) -> dict:
+        return {
+            "cache": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+            "hit_rate": round(self.hit_rate, 4),
+            "estimated_tokens_saved": self.tokens_saved,
+        }
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for Gemini-style tokenizers (~4 characters per token)."""
+    return max(1, len(text) // 4) if text else 0
@@ -9,6 +9,56 @@ class Settings(BaseSettings):
     """
     
     LOGGER: int = logging.INFO  # Default to INFO level
+    # Bounded log queue: records buffered for the writer thread, and how long
+    # WARNING+ records wait for space before being dropped
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_QUEUE_BLOCK_SECONDS: float = 0.05
+    # Request logs kept in full per second; beyond that, one in N is kept
+    LOG_REQUEST_BURST_PER_SECOND: int = 50
+    LOG_REQUEST_SAMPLE_EVERY: int = 10
+
+    # Career map cache: how long a generated map is reused for a matching profile
+    CAREER_MAP_CACHE_TTL_SECONDS: int = 7 * 24 * 60 * 60
+
+    # Number of generated quiz variants kept per role in the quiz bank
+    QUIZ_VARIANTS_PER_ROLE: int = 3
+    # How long one instance may hold the right to generate a role's quiz, and how
+    # often other instances poll for its result while waiting. The lease is
+    # extended to the LLM retry budget (see LLM_TIMEOUT_SECONDS) when that is longer.
+    QUIZ_GENERATION_LEASE_SECONDS: int = 90
+    QUIZ_GENERATION_POLL_SECONDS: float = 1.0
+
+    # Quiz warm-up job: parallel generations and LLM generations started per minute
+    QUIZ_WARMUP_CONCURRENCY: int = 4
+    QUIZ_WARMUP_RATE_PER_MINUTE: float = 30
+    # How often the recommendation counts the warm-up ranks roles by are written to Firestore
+    RECOMMENDATION_STATS_FLUSH_SECONDS: float = 60.0
+
+    # Shared secret for operational endpoints; leave empty to disable them
+    ADMIN_API_KEY: str = ""
+
+    # Request profiling: off by default. When enabled, requests sending
+    # X-Polaris-Profile: 1 are profiled, plus this fraction of all requests
+    PROFILING_ENABLED: bool = False
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_STORE_SIZE: int = 200
+
+    # Responses smaller than this many bytes are sent uncompressed
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    # How long clients and the CDN may reuse the static ML data (jobs, cluster profiles)
+    STATIC_DATA_MAX_AGE_SECONDS: int = 3600
+
+    # LLM resilience: timeout per attempt, attempts per call for transient errors (jittered exponential
+    # backoff between them), failures that open the circuit breaker and how long it
+    # stays open, and how long a latency-sensitive call may run before a second,
+    # hedged copy is sent (0 disables hedging; every hedge costs tokens)
+    LLM_TIMEOUT_SECONDS: float = 60.0
+    LLM_RETRY_ATTEMPTS: int = 3
+    LLM_RETRY_BASE_DELAY_SECONDS: float = 0.5
+    LLM_RETRY_MAX_DELAY_SECONDS: float = 8.0
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 5
+    LLM_BREAKER_RESET_SECONDS: float = 30.0
+    LLM_HEDGE_AFTER_SECONDS: float = 0.0
     
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
@@ -30,6 +30,7 @@ def initialize_firebase():
             print("✅ Firebase initialized using default credentials.")
     except Exception as e:
         print(f"❌ Critical Error: Could not initialize Firebase. {e}")
+        raise
 # --- In your main application startup logic ---
 # You would call this function when your FastAPI app starts.
 # For example, in main.py:
@@ -0,0 +1,106 @@
+import os
+import threading
+import time
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.profiling import current_profile
+from app.core.resilience import Upstream
+
+GEMINI_MODEL = "gemini-1.5-flash"
+
+# Retries, circuit breaker and hedging for every LLM call; shared so all routers see one breaker
+llm_upstream = Upstream(
+    "gemini",
+    attempts=settings.LLM_RETRY_ATTEMPTS,
+    base_delay=settings.LLM_RETRY_BASE_DELAY_SECONDS,
+    max_delay=settings.LLM_RETRY_MAX_DELAY_SECONDS,
+    failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+    reset_seconds=settings.LLM_BREAKER_RESET_SECONDS,
+    hedge_after=settings.LLM_HEDGE_AFTER_SECONDS,
+)
+# Longest one invoke_chain() call can take with every retry, e.g. 3 x 60s + 1.5s of backoff
+LLM_CALL_BUDGET_SECONDS = llm_upstream.worst_case_seconds(settings.LLM_TIMEOUT_SECONDS)
+
+_chat_models = {}
+_chat_models_lock = threading.Lock()
+
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """
+    LangChain callback that records call counts, latency and token usage for
+    every chat model call into the Prometheus metrics, and the call time into
+    the request profile when one is active.
+    """
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self._started = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._started[run_id] = (time.perf_counter(), current_profile())
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._started[run_id] = (time.perf_counter(), current_profile())
+
+    def _record_latency(self, run_id) -> None:
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        started_at, profile = started
+        elapsed = time.perf_counter() - started_at
+        metrics.llm_latency.observe(elapsed, self.model_name)
+        if profile is not None:
+            profile.record("llm", elapsed)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._record_latency(run_id)
+        metrics.llm_calls.inc(self.model_name, "success")
+
+        usage = None
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                usage = getattr(message, "usage_metadata", None) or usage
+        if usage:
+            metrics.llm_tokens.inc(self.model_name, "input", amount=usage.get("input_tokens", 0))
+            metrics.llm_tokens.inc(self.model_name, "output", amount=usage.get("output_tokens", 0))
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._record_latency(run_id)
+        metrics.llm_calls.inc(self.model_name, "error")
+
+
+def get_chat_model(model_name: str = GEMINI_MODEL):
+    """
+    Returns the process-wide chat model client for `model_name`, creating it on
+    first use. All routers share one client (and its HTTP connection pool).
+    """
+    chat_model = _chat_models.get(model_name)
+    if chat_model is not None:
+        return chat_model
+    with _chat_models_lock:
+        if model_name not in _chat_models:
+            # Imported here: the Google GenAI SDK is slow to import and only needed once an LLM is used.
+            from langchain_google_genai import ChatGoogleGenerativeAI
+
+            _chat_models[model_name] = ChatGoogleGenerativeAI(
+                model=model_name,
+                google_api_key=os.getenv("GEMINI_API_KEY"),
+                callbacks=[LLMMetricsCallback(model_name)],
+                # A single, bounded attempt per call: retries are handled by llm_upstream
+                max_retries=1,
+                timeout=settings.LLM_TIMEOUT_SECONDS,
+            )
+        return _chat_models[model_name]
+
+
+def invoke_chain(chain, inputs: dict, hedge: bool = False):
+    """
+    Invokes a LangChain chain through llm_upstream: transient Gemini errors are
+    retried with backoff, and calls fail fast with CircuitOpenError while Gemini
+    is degraded. Pass `hedge=True` for calls a user is waiting on.
+    """
+    return llm_upstream.call(lambda: chain.invoke(inputs), hedge=hedge)
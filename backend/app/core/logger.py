@@ -1,18 +1,171 @@
-import inspect
+import atexit
+import json
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+import time
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from fastapi import Request
 from app.core.config import settings
 
 
+class BoundedQueueHandler(QueueHandler):
+    """
+    Queue handler for a bounded queue that never lets disk I/O block the caller.
+
+    Records are handed to a background QueueListener unformatted. When the queue
+    is full, records below WARNING are dropped immediately; WARNING and above
+    wait up to `block_timeout` seconds for space (backpressure) before being dropped.
+    """
+
+    def __init__(self, log_queue: queue.Queue, block_timeout: float = 0.05):
+        super().__init__(log_queue)
+        self.block_timeout = block_timeout
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record):
+        # The listener runs in this process, so the record can be passed as-is and
+        # formatted on the listener thread instead of the request thread.
+        return record
+
+    def enqueue(self, record):
+        try:
+            if record.levelno >= logging.WARNING:
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+
+# Values that cannot change after the call, so formatting them can wait for the listener thread
+_IMMUTABLE_TYPES = (str, bytes, int, float, bool)
+
+
+def _snapshot(value):
+    """Stringifies a mutable value (dict, list, model...) now, so later changes do not leak into the log."""
+    if value is None or isinstance(value, _IMMUTABLE_TYPES):
+        return value
+    return str(value)
+
+
+class LogParts:
+    """
+    The arguments of a `define_logger` call, used as the record's message.
+
+    Mutable arguments (the body, the response, the request's client) are
+    captured when the call is made, so the log line reflects that moment even
+    if the caller changes them afterwards. Formatting the immutable parts, such
+    as the request URL, waits for a handler on the listener thread; the
+    resulting fields are computed once and shared by all sinks.
+    """
+
+    __slots__ = ("client_host", "method", "url", "message", "pid", "loggName", "body", "response", "caller", "_fields")
+
+    def __init__(self, request, message, pid, loggName, body, response, caller):
+        self.client_host = request.client.host if request is not None and request.client else None
+        self.method = request.method if request is not None else None
+        self.url = request.url if request is not None else None
+        self.message = _snapshot(message)
+        self.pid = pid
+        self.loggName = loggName
+        self.body = _snapshot(body)
+        self.response = _snapshot(response)
+        self.caller = caller
+        self._fields = None
+
+    def fields(self, record: logging.LogRecord = None) -> dict:
+        """Builds the log_parts dict, caching it once a record is available."""
+        if self._fields is not None:
+            return self._fields
+        loggName = self.loggName
+        if loggName:
+            source = f"{loggName[1]}:{loggName[3]}"
+        elif self.caller and record is not None:
+            source = f"{record.pathname}:{record.funcName}"
+        else:
+            source = None
+        log_parts = {
+            "IP": self.client_host,
+            "URL": f"{self.method} {self.url}" if self.url is not None else None,
+            "MESSAGE": self.message,
+            "PID": str(self.pid) if self.pid is not None else None,
+            "FILE": source,
+            "BODY": str(self.body) if self.body is not None else None,
+            "RESPONSE": str(self.response) if self.response is not None else None,
+        }
+        fields = {key: value for key, value in log_parts.items() if value is not None}
+        if record is not None:
+            self._fields = fields
+        return fields
+
+    def __str__(self):
+        return " - ".join(f"{key}: {value}" for key, value in self.fields().items())
+
+
+class JsonLineFormatter(logging.Formatter):
+    """
+    Formats each record as one JSON object per line. The fields of a
+    `define_logger` call (see LogParts) become top-level keys; `severity`
+    uses the name Cloud Logging recognizes.
+    """
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "severity": record.levelname,
+            "logger": record.name,
+        }
+        if isinstance(record.msg, LogParts):
+            entry.update(record.msg.fields(record))
+        else:
+            entry["MESSAGE"] = record.getMessage()
+        if record.exc_info:
+            entry["EXCEPTION"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RequestLogSampler(logging.Filter):
+    """
+    Samples INFO-level request logs under load.
+
+    The first `burst_per_second` request logs in each second are kept; after
+    that only every `sample_every`-th one is. Other records always pass.
+    Counters are updated without a lock: under contention a few extra or
+    fewer records may be kept, which is fine for sampling.
+    """
+
+    def __init__(self, burst_per_second: int = 50, sample_every: int = 10):
+        super().__init__()
+        self.burst_per_second = burst_per_second
+        self.sample_every = max(1, sample_every)
+        self._second = 0
+        self._count = 0
+
+    def filter(self, record):
+        if record.levelno != logging.INFO or not getattr(record, "request_log", False):
+            return True
+        second = int(time.monotonic())
+        if second != self._second:
+            self._second = second
+            self._count = 0
+        self._count += 1
+        if self._count <= self.burst_per_second:
+            return True
+        return (self._count - self.burst_per_second) % self.sample_every == 0
+
+
 class LoggerConfig:
     """
     Logger configuration class to setup logging for the application.
     """
  
     def __init__(
-        self, env=20, logger_name="MyLogs", log_directory="polaris-be-logs", log_file="logs.log"
+        self, env=20, logger_name="MyLogs", log_directory="polaris-be-logs", log_file="logs.log",
+        queue_size=10000, block_timeout=0.05, request_log_burst=50, request_log_sample_every=10,
     ):
         """
         Initialize the logger configuration.
@@ -22,6 +175,10 @@ class LoggerConfig:
             logger_name (str): Name of the logger.
             log_directory (str): Directory to store log files.
             log_file (str): Name of the log file.
+            queue_size (int): Maximum records buffered before the drop policy applies.
+            block_timeout (float): Seconds a WARNING+ record may wait for queue space.
+            request_log_burst (int): INFO request logs kept per second before sampling starts.
+            request_log_sample_every (int): Once sampling, keep one in this many request logs.
  
         Raises:
             HTTPException: If there is an error creating the logger configuration.
@@ -31,7 +188,12 @@ class LoggerConfig:
             self.log_directory = os.path.abspath(log_directory)
             self.log_file_path = os.path.join(self.log_directory, log_file)
             self.env = env
-            self.log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+            self.queue_size = queue_size
+            self.block_timeout = block_timeout
+            self.request_log_burst = request_log_burst
+            self.request_log_sample_every = request_log_sample_every
+            self.queue_handler = None
+            self.listener = None
  
             self.logger = logging.getLogger(self.logger_name)
             self.root_logger = logging.getLogger()
@@ -61,7 +223,11 @@ class LoggerConfig:
  
     def setup_logger(self):
         """
-        Setup the logger with file and console handlers.
+        Setup one file sink and one console sink, shared by the app and root loggers.
+
+        The sinks run on a background QueueListener thread; both loggers only get
+        the same BoundedQueueHandler, so logging from a request never touches disk
+        and each destination has exactly one writer (and one rotation policy).
  
         Raises:
             HTTPException: If there is an error setting up the logger.
@@ -77,28 +243,39 @@ class LoggerConfig:
             console_handler = logging.StreamHandler()
             console_handler.setLevel(30)
  
-            formatter = logging.Formatter(self.log_format)
+            formatter = JsonLineFormatter()
             file_handler.setFormatter(formatter)
             console_handler.setFormatter(formatter)
  
-            self.logger.addHandler(file_handler)
-            self.logger.addHandler(console_handler)
- 
-            root_file_handler = RotatingFileHandler(
-                self.log_file_path, backupCount=21, maxBytes=1024 * 1024 * 20, encoding="utf-8"
+            log_queue = queue.Queue(maxsize=self.queue_size)
+            self.queue_handler = BoundedQueueHandler(log_queue, block_timeout=self.block_timeout)
+            self.queue_handler.addFilter(
+                RequestLogSampler(self.request_log_burst, self.request_log_sample_every)
             )
-            root_file_handler.setLevel(self.env)
- 
-            root_console_handler = logging.StreamHandler()
-            root_console_handler.setLevel(30)
+            self.listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
  
-            root_file_handler.setFormatter(formatter)
-            root_console_handler.setFormatter(formatter)
- 
-            self.root_logger.addHandler(root_file_handler)
-            self.root_logger.addHandler(root_console_handler)
+            # The app logger does not propagate, so attaching the same handler to
+            # both loggers still writes every record exactly once.
+            self.logger.addHandler(self.queue_handler)
+            self.root_logger.addHandler(self.queue_handler)
+            self.listener.start()
+            atexit.register(self.stop)
         except Exception as e:
             print(f"Failed to setup logger handlers: {str(e)}")
+
+    @property
+    def dropped_records(self) -> int:
+        """Number of records dropped because the log queue was full."""
+        return self.queue_handler.dropped if self.queue_handler else 0
+
+    def stop(self):
+        """Flushes queued records and stops the listener thread. Safe to call twice."""
+        listener, self.listener = self.listener, None
+        if listener is None:
+            return
+        listener.stop()
+        if self.dropped_records:
+            print(f"Logger dropped {self.dropped_records} records because the log queue was full.")
  
     def define_logger(
         self,
@@ -109,40 +286,38 @@ class LoggerConfig:
         message: str = None,
         body=None,
         response=None,
+        caller: bool = False,
     ):
         """
         Write logs with detailed information.
+
+        Returns immediately when `level` is disabled. Otherwise the arguments are
+        wrapped in a LogParts and only formatted when a handler emits the record.
  
         Args:
             level (int): Logging level.
             user (dict, optional): User information.
             request (Request, optional): Request data.
-            loggName (FrameInfo, optional): File and function name.
+            loggName (FrameInfo, optional): File and function name. Prefer `caller=True`,
+                which records the same information without walking the stack.
             pid (int, optional): Process ID.
             message (str, optional): Log message.
             body (dict, optional): Request body.
             response (optional): Response data.
+            caller (bool, optional): Include the calling file and function.
  
         Raises:
             HTTPException: If there is an error writing logs.
         """
+        if not self.logger.isEnabledFor(level):
+            return
         try:
-           
-            log_parts = {
-                "IP": f"{request.client.host}" if request else None,
-                "URL": f"{request.method} {request.url}" if request else None,
-                "MESSAGE": message,
-                "PID": str(pid) if pid is not None else None,
-                "FILE": f"{loggName[1]}:{loggName[3]}" if loggName else None,
-                "BODY": str(body) if body is not None else None,
-                "RESPONSE": str(response) if response is not None else None,
-            }
- 
-            txt = " - ".join(
-                [f"{key}: {value}" for key, value in log_parts.items() if value is not None]
+            self.logger.log(
+                level,
+                LogParts(request, message, pid, loggName, body, response, caller),
+                extra={"request_log": request is not None},
+                stacklevel=2,
             )
- 
-            self.logger.log(level=level, msg=txt)
         except Exception as e:
             print(f"Failed to write logs: {str(e)}")
  
@@ -151,5 +326,9 @@ logs = LoggerConfig(
     env=settings.LOGGER, 
     logger_name="APP-BE", 
     log_directory="logger", 
-    log_file="app.log"
+    log_file="app.log",
+    queue_size=settings.LOG_QUEUE_SIZE,
+    block_timeout=settings.LOG_QUEUE_BLOCK_SECONDS,
+    request_log_burst=settings.LOG_REQUEST_BURST_PER_SECOND,
+    request_log_sample_every=settings.LOG_REQUEST_SAMPLE_EVERY,
 )
\ No newline at end of file
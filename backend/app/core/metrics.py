@@ -0,0 +1,181 @@
+import threading
+from bisect import bisect_left
+from typing import Iterable, List, Tuple
+
+# Default latency buckets in seconds, from 5ms to 60s (LLM calls are slow).
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class _Metric:
+    """
+    Base class for metrics aggregated per thread.
+
+    Each thread writes to its own shard (a plain dict), so recording a value
+    takes no lock and never contends with other request threads. Shards are
+    only summed when /metrics is scraped. A scrape may miss an update that is
+    in progress, which Prometheus tolerates.
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._shards_lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def _label_str(self, label_values: Tuple, extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(self.labelnames, label_values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """A monotonically increasing count, e.g. requests or tokens."""
+
+    kind = "counter"
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        shard = self._shard()
+        shard[label_values] = shard.get(label_values, 0) + amount
+
+    def _totals(self) -> dict:
+        totals = {}
+        for shard in list(self._shards):
+            for key, value in list(shard.items()):
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{self._label_str(key)} {value}" for key, value in sorted(self._totals().items())]
+
+
+class Gauge(Counter):
+    """
+    A value that goes up and down, e.g. requests in flight. Increments and
+    decrements may happen on different threads; the shard sum is still exact.
+    """
+
+    kind = "gauge"
+
+    def dec(self, *label_values, amount: float = 1) -> None:
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram(_Metric):
+    """Bucketed observations, e.g. request latency in seconds."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *label_values) -> None:
+        shard = self._shard()
+        series = shard.get(label_values)
+        if series is None:
+            # [per-bucket counts..., +Inf count, sum]
+            series = shard[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> List[str]:
+        totals = {}
+        for shard in list(self._shards):
+            for key, series in list(shard.items()):
+                merged = totals.setdefault(key, [0] * len(series))
+                for i, value in enumerate(series):
+                    merged[i] += value
+
+        lines = []
+        for key, series in sorted(totals.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                le_label = f'le="{le}"'
+                lines.append(f"{self.name}_bucket{self._label_str(key, le_label)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_str(key)} {series[-1]}")
+            lines.append(f"{self.name}_count{self._label_str(key)} {cumulative}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+REGISTRY: List[_Metric] = []
+
+
+def render_prometheus() -> str:
+    """Renders every registered metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# --- Application metrics ---
+
+http_request_duration = Histogram(
+    "polaris_http_request_duration_seconds", "HTTP request latency by route and status.",
+    ("method", "route", "status"),
+)
+http_requests_in_flight = Gauge(
+    "polaris_http_requests_in_flight", "HTTP requests currently being served.",
+)
+firestore_operations = Counter(
+    "polaris_firestore_operations_total", "Firestore document reads and writes.",
+    ("op", "collection"),
+)
+llm_calls = Counter(
+    "polaris_llm_calls_total", "LLM calls by model and outcome.",
+    ("model", "status"),
+)
+llm_tokens = Counter(
+    "polaris_llm_tokens_total", "LLM tokens consumed, by direction.",
+    ("model", "kind"),
+)
+llm_latency = Histogram(
+    "polaris_llm_latency_seconds", "LLM call latency.",
+    ("model",),
+)
+cache_requests = Counter(
+    "polaris_cache_requests_total", "Cache lookups by cache and result.",
+    ("cache", "result"),
+)
+gcs_fetches = Counter(
+    "polaris_gcs_fetches_total", "Artifact fetches from Google Cloud Storage.",
+    ("artifact", "status"),
+)
+gcs_fetch_duration = Histogram(
+    "polaris_gcs_fetch_duration_seconds", "Time to fetch and parse an artifact from GCS.",
+    ("artifact",),
+)
+upstream_calls = Counter(
+    "polaris_upstream_calls_total",
+    "Calls to external upstreams by outcome (success, error, retry, rejected, hedged).",
+    ("upstream", "outcome"),
+)
+circuit_breaker_state = Gauge(
+    "polaris_circuit_breaker_state", "Circuit breaker state per upstream: 0 closed, 1 half-open, 2 open.",
+    ("upstream",),
+)
@@ -0,0 +1,162 @@
+import asyncio
+import functools
+import random
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi.routing import APIRoute
+
+from app.core import metrics
+from app.core.config import settings
+
+PROFILE_HEADER = "X-Polaris-Profile"
+
+_current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("polaris_request_profile", default=None)
+_NOOP = nullcontext()
+
+
+class RequestProfile:
+    """Time spent per category (Firestore, LLM, serialization, ...) for one request."""
+
+    def __init__(self, method: str, path: str, reason: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.reason = reason
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        # category -> [seconds, calls]
+        self.spans = {}
+
+    def record(self, category: str, seconds: float) -> None:
+        span = self.spans.get(category)
+        if span is None:
+            self.spans[category] = [seconds, 1]
+        else:
+            span[0] += seconds
+            span[1] += 1
+
+    def finish(self, route: Optional[str], status_code: int) -> dict:
+        total = time.perf_counter() - self._started
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": route,
+            "status": status_code,
+            "reason": self.reason,
+            "started_at": self.started_at,
+            "total_ms": round(total * 1000, 2),
+            # Categories can nest (e.g. serialization inside the endpoint), so they need not sum to total.
+            "breakdown_ms": {
+                category: {"ms": round(seconds * 1000, 2), "calls": calls}
+                for category, (seconds, calls) in sorted(self.spans.items())
+            },
+        }
+
+
+# Rolling store of the most recent profiles, viewable via the admin endpoint.
+recent_profiles: deque = deque(maxlen=settings.PROFILE_STORE_SIZE)
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _current_profile.get()
+
+
+def profile_span(category: str):
+    """
+    Times the enclosed block under `category` when the current request is being
+    profiled. Otherwise returns a shared no-op context manager.
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        return _NOOP
+    return _timed(profile, category)
+
+
+@contextmanager
+def _timed(profile: RequestProfile, category: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.record(category, time.perf_counter() - started)
+
+
+@contextmanager
+def firestore_op(op: str, collection: str, amount: int = 1):
+    """Counts a Firestore read/write in the metrics and times it when profiling."""
+    metrics.firestore_operations.inc(op, collection, amount=amount)
+    with profile_span("firestore"):
+        yield
+
+
+def should_profile(headers) -> Optional[str]:
+    """Returns why a request should be profiled (header or sampling), or None."""
+    if headers.get(PROFILE_HEADER) == "1":
+        return "header"
+    if settings.PROFILE_SAMPLE_RATE and random.random() < settings.PROFILE_SAMPLE_RATE:
+        return "sampled"
+    return None
+
+
+def start_profile(method: str, path: str, reason: str):
+    profile = RequestProfile(method, path, reason)
+    return profile, _current_profile.set(profile)
+
+
+def finish_profile(profile: RequestProfile, token, route: Optional[str], status_code: int) -> dict:
+    _current_profile.reset(token)
+    result = profile.finish(route, status_code)
+    recent_profiles.append(result)
+    return result
+
+
+class ProfiledAPIRoute(APIRoute):
+    """
+    APIRoute that, when profiling is enabled, splits a request into the time spent
+    in the endpoint function and in FastAPI's request handling around it (body
+    parsing, parameter and response-model validation, encoding), reported as
+    `endpoint` and `validation`.
+
+    With PROFILING_ENABLED off it behaves exactly like APIRoute.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not settings.PROFILING_ENABLED:
+            return
+        call = self.dependant.call
+        if asyncio.iscoroutinefunction(call):
+            @functools.wraps(call)
+            async def timed_call(*a, **kw):
+                with profile_span("endpoint"):
+                    return await call(*a, **kw)
+        else:
+            @functools.wraps(call)
+            def timed_call(*a, **kw):
+                with profile_span("endpoint"):
+                    return call(*a, **kw)
+        self.dependant.call = timed_call
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        if not settings.PROFILING_ENABLED:
+            return handler
+
+        async def profiled_handler(request):
+            profile = _current_profile.get()
+            if profile is None:
+                return await handler(request)
+            started = time.perf_counter()
+            try:
+                return await handler(request)
+            finally:
+                endpoint = profile.spans.get("endpoint", [0.0])[0]
+                profile.record("validation", max(0.0, time.perf_counter() - started - endpoint))
+
+        return profiled_handler
@@ -0,0 +1,133 @@
+from langchain_core.prompts import PromptTemplate
+
+
+class PromptSpec:
+    """
+    A named, versioned prompt template.
+
+    The version is part of every cache key derived from the prompt's output,
+    so bump it whenever the template text changes.
+    """
+
+    def __init__(self, name: str, version: str, template: str, input_variables: list):
+        self.name = name
+        self.version = version
+        self.template = template
+        self.input_variables = input_variables
+
+    @property
+    def key(self) -> str:
+        """Identifier combining name and version, e.g. `quiz_generation@v1`."""
+        return f"{self.name}@{self.version}"
+
+    def build(self, **partial_variables) -> PromptTemplate:
+        """Compiles the spec into a LangChain PromptTemplate."""
+        return PromptTemplate(
+            template=self.template,
+            input_variables=self.input_variables,
+            partial_variables=partial_variables,
+        )
+
+
+CAREER_MAP_PROMPT = PromptSpec(
+    name="career_map",
+    version="v1",
+    template="""
+    You are an expert career strategist. Your task is to generate a detailed, step-by-step career map for a user who wants to transition into a new role.
+
+    **User's Current Profile:**
+    - Current Role: {current_role}
+    - Years of Experience: {years_of_experience}
+    - Highest Education: {education_level}
+    - Financial Situation:
+        - Current Salary (USD): {current_salary}
+        - Household Income (USD): {household_income}
+        - Monthly Expenses (USD): {monthly_expenses}
+        - Risk Tolerance for career change: {risk_tolerance}
+        - Target Salary (USD): {target_salary}
+    - RIASEC Personality Profile (scores from 0 to 1): {personality}
+
+    **User's Skill Assessment for the Target Role:**
+    - Proficiency Level: {proficiency_level}
+    - Feedback Received: {proficiency_feedback}
+
+    **Target Role:** {target_job_title}
+
+    **Instructions:**
+    1.  Create a realistic, actionable career map starting from the user's current situation.
+    2.  The map should be a series of nested steps. The first step should be based on their current role or a very close starting point.
+    3.  For each step, define a clear title, a realistic duration, a description of the goal for that step, and a list of 2-3 concrete tasks to complete.
+    4.  At each step, generate multiple, diverse `next_steps` to create a branching, tree-like structure. These branches should represent different specializations, alternative paths (pivots), or levels of seniority.
+    5.  Consider the user's risk tolerance. A 'low' risk tolerance means suggesting smaller, more stable steps, while 'high' can include more ambitious pivots or starting a business.
+    6.  The entire output MUST be a single, minified JSON object that strictly follows this format: {format_instructions}
+
+    **Example of a single step object:**
+    {{
+      "step_number": 1,
+      "title": "Graduate Software Engineer",
+      "type": "EXPERIENCE",
+      "duration": "1-2 years",
+      "description": "Build a strong foundation...",
+      "tasks_to_complete": ["Contribute to 2-3 major features..."],
+      "next_steps": [ {{...another step object...}} ]
+    }}
+    """,
+    input_variables=["current_role", "years_of_experience", "education_level", "current_salary", "household_income", "monthly_expenses", "risk_tolerance", "personality", "target_job_title", "proficiency_level", "proficiency_feedback"],
+)
+
+QUIZ_GENERATION_PROMPT = PromptSpec(
+    name="quiz_generation",
+    version="v1",
+    template="""You are an expert technical assessor responsible for creating a skills quiz for a candidate interested in the role of a "{job_title}".
+
+Your task is to generate a 5-question multiple-choice quiz. The quiz should have a mix of difficulties:
+- 2 "Beginner" questions
+- 2 "Intermediate" questions
+- 1 "Advanced" question
+
+For each question, provide 4 options and clearly indicate the correct answer.
+
+You MUST return the output as a single, minified JSON object with no markdown formatting.
+The JSON object should have two keys: "title" and "questions".
+The "title" should be a string like "Technical Assessment: [Job Title]".
+The "questions" key should be an array of question objects. Each question object must have the following keys:
+- "question_text": The full text of the question.
+- "options": An array of 4 strings representing the possible answers.
+- "difficulty": A string, either "Beginner", "Intermediate", or "Advanced".
+- "correct_answer": The string that exactly matches the correct option.
+
+Example for a single question object:
+{{
+  "question_text": "What is the primary purpose of a 'key' prop in a list of React components?",
+  "options": ["To style the component", "To uniquely identify elements for efficient updates", "To pass data to child components", "To handle click events"],
+  "difficulty": "Beginner",
+  "correct_answer": "To uniquely identify elements for efficient updates"
+}}""",
+    input_variables=["job_title"],
+)
+
+QUIZ_EVALUATION_PROMPT = PromptSpec(
+    name="quiz_evaluation",
+    version="v2",
+    template="""
+            A user has completed a skill assessment for the role of "{job_title}".
+            Their overall score was {score_percentage}%. Their performance breakdown by difficulty was: {performance_breakdown}
+            Based on this, their proficiency level has been assessed as "{level}".
+
+            Provide brief, encouraging feedback for this level.
+            The feedback should be a short paragraph (2-3 sentences) acknowledging their effort and suggesting what to focus on next.
+
+            You MUST return the output as a single, minified JSON object with one key: "feedback".
+            """,
+    input_variables=["job_title", "score_percentage", "performance_breakdown", "level"],
+)
+
+PROMPT_REGISTRY = {
+    spec.name: spec
+    for spec in (CAREER_MAP_PROMPT, QUIZ_GENERATION_PROMPT, QUIZ_EVALUATION_PROMPT)
+}
+
+
+def get_prompt(name: str) -> PromptSpec:
+    """Looks up a prompt spec by name. Raises KeyError for unknown prompts."""
+    return PROMPT_REGISTRY[name]
@@ -0,0 +1,24 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces calls evenly to at most `rate_per_minute`.
+    Each call to `acquire` blocks until the caller's slot comes up.
+    """
+
+    def __init__(self, rate_per_minute: float):
+        self.interval = 60.0 / rate_per_minute if rate_per_minute > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
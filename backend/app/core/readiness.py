@@ -0,0 +1,63 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Union
+
+
+class Readiness:
+    """
+    Tracks the load state of the heavy subsystems initialized at startup
+    (Firebase, recommendation artifacts, LLM client) so the service can tell
+    whether it is ready for traffic.
+    """
+
+    def __init__(self):
+        self._subsystems = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, required: bool = True) -> None:
+        """Declares a subsystem; required ones must be ready before the service is."""
+        with self._lock:
+            self._subsystems.setdefault(name, {
+                "state": "pending",
+                "required": required,
+                "version": None,
+                "load_seconds": None,
+                "loaded_at": None,
+                "error": None,
+            })
+
+    @contextmanager
+    def track(self, name: str):
+        """Marks `name` as loading for the enclosed block, then ready or failed."""
+        self.register(name)
+        self._update(name, state="loading", error=None)
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self._update(name, state="failed", error=str(e), load_seconds=round(time.perf_counter() - started, 3))
+            raise
+        self._update(
+            name, state="ready", load_seconds=round(time.perf_counter() - started, 3), loaded_at=time.time()
+        )
+
+    def set_version(self, name: str, version: Optional[Union[str, dict]]) -> None:
+        """Records what was loaded, e.g. a project id or the artifact generations."""
+        self._update(name, version=version)
+
+    def _update(self, name: str, **fields) -> None:
+        with self._lock:
+            self._subsystems[name].update(fields)
+
+    @property
+    def is_ready(self) -> bool:
+        with self._lock:
+            return all(s["state"] == "ready" for s in self._subsystems.values() if s["required"])
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {name: dict(subsystem) for name, subsystem in self._subsystems.items()}
+
+
+readiness = Readiness()
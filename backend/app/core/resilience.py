@@ -0,0 +1,33 @@
+import logging
+
+from app.core import metrics
+from app.core import resilience_core
+from app.core.logger import logs
+from app.core.resilience_core import CircuitBreaker, CircuitOpenError  # re-exported for the routes
+
+# The retry/breaker/hedging logic lives in app/core/resilience_core.py, shared verbatim
+# with the scraper; this module reports it through the backend's metrics and logs.
+
+
+class Upstream(resilience_core.Upstream):
+    """
+    Resilient calls to one external service (see app/core/resilience_core.py).
+    Outcomes are counted in polaris_upstream_calls_total, the breaker state is
+    exported as polaris_circuit_breaker_state, and retries go to the structured log.
+    """
+
+    def __init__(self, name: str, **kwargs):
+        metrics.circuit_breaker_state.inc(name, amount=0)
+        super().__init__(name, **kwargs)
+
+    def report(self, outcome: str) -> None:
+        metrics.upstream_calls.inc(self.name, outcome)
+
+    def on_state_change(self, previous: int, state: int) -> None:
+        metrics.circuit_breaker_state.inc(self.name, amount=state - previous)
+
+    def on_retry(self, error: Exception, attempt: int, delay: float) -> None:
+        logs.define_logger(
+            level=logging.WARNING,
+            message=f"{self.name} call failed ({error}); retry {attempt}/{self.attempts - 1} in {delay:.2f}s",
+        )
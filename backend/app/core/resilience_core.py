@@ -0,0 +1,306 @@
+import asyncio
+import contextvars
+import math
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Optional
+
+# Retries, circuit breaking and hedging for calls to an external service.
+#
+# This file is shared verbatim by the backend (backend/app/core/resilience_core.py) and
+# the scraper (scraper/core/resilience_core.py): the services are deployed separately
+# and share no package, so each vendors a copy. Edit one copy and copy it over the
+# other; both test suites fail while the copies differ. It must not import service
+# code: configuration, metrics and logging come from each service's resilience.py,
+# which subclasses Upstream and overrides its hooks.
+
+# HTTP statuses and exception class names (httpx, google.api_core, grpc) that mean the
+# upstream is overloaded or briefly unavailable, so the same call may succeed later.
+TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+TRANSIENT_ERROR_NAMES = {
+    "ServiceUnavailable", "ResourceExhausted", "TooManyRequests", "DeadlineExceeded",
+    "InternalServerError", "BadGateway", "GatewayTimeout", "RequestTimeout",
+    "ConnectError", "ConnectTimeout", "ReadTimeout", "WriteTimeout", "PoolTimeout",
+    "ReadError", "RemoteProtocolError",
+}
+
+# Threads for hedged sync calls; the caller's thread waits on them
+_hedge_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="hedge")
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the upstream while its circuit breaker is open."""
+
+    def __init__(self, upstream: str, retry_in: float):
+        super().__init__(f"{upstream} is temporarily unavailable; retry in {math.ceil(retry_in)}s.")
+        self.upstream = upstream
+        self.retry_in = retry_in
+
+
+def is_transient(error: BaseException) -> bool:
+    """
+    Whether an error is worth retrying: timeouts, dropped connections, rate
+    limits and 5xx responses. Follows the exception chain, since SDKs and
+    LangChain often wrap the underlying error.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, (TimeoutError, ConnectionError)) or type(error).__name__ in TRANSIENT_ERROR_NAMES:
+            return True
+        response = getattr(error, "response", None)
+        for status in (getattr(error, "code", None), getattr(error, "status_code", None), getattr(response, "status_code", None)):
+            if isinstance(status, int) and status in TRANSIENT_STATUS_CODES:
+                return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class CircuitBreaker:
+    """
+    Fails fast while an upstream is degraded. After `failure_threshold`
+    consecutive transient failures the circuit opens and calls are rejected for
+    `reset_seconds`; then a single trial call is let through (half-open), which
+    closes the circuit on success or reopens it on failure. Thread-safe, and
+    shared by sync and async callers.
+    """
+
+    CLOSED, HALF_OPEN, OPEN = 0, 1, 2
+    STATE_NAMES = {CLOSED: "closed", HALF_OPEN: "half_open", OPEN: "open"}
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_seconds: float,
+        on_state_change: Optional[Callable[[int, int], None]] = None,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.on_state_change = on_state_change
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def consecutive_failures(self) -> int:
+        return self._failures
+
+    def _set_state(self, state: int) -> None:
+        if state != self.state:
+            previous, self.state = self.state, state
+            if self.on_state_change is not None:
+                self.on_state_change(previous, state)
+
+    def before_call(self) -> None:
+        """Raises CircuitOpenError if the call must not reach the upstream."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            retry_in = self._opened_at + self.reset_seconds - time.monotonic()
+            if self.state == self.OPEN and retry_in <= 0:
+                self._set_state(self.HALF_OPEN)
+            if self.state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return
+        raise CircuitOpenError(self.name, max(retry_in, 0))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._trial_running = False
+            self._set_state(self.CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._set_state(self.OPEN)
+
+    def release_trial(self) -> None:
+        """
+        Gives up a half-open trial without a verdict on the upstream (the call was
+        cancelled, or failed for reasons of its own), so the next caller can run
+        the trial instead of the circuit staying stuck.
+        """
+        with self._lock:
+            self._trial_running = False
+
+
+class Upstream:
+    """
+    Resilient calls to one external service, for threads and the event loop
+    alike: jittered exponential retries for transient errors, a circuit breaker
+    shared by every caller, and optional hedging.
+
+    Only errors for which `is_transient` holds are retried or count against the
+    breaker. Anything else (a bad request, an unparsable answer) is raised at
+    once, since repeating the call would not help, and gives the breaker no
+    verdict either way.
+
+    With a `limiter` (anything with acquire(), aacquire() and try_acquire()),
+    every attempt first waits for a rate limit slot. The wait happens before the
+    attempt starts, so time spent queueing never counts towards `hedge_after`,
+    and a hedge is only sent if the limiter has a slot free at that moment.
+
+    Services subclass this to report outcomes, state changes and retries
+    through their own metrics and logs (see the hooks below).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        failure_threshold: int = 5,
+        reset_seconds: float = 30.0,
+        hedge_after: float = 0.0,
+        limiter: Optional[Any] = None,
+    ):
+        self.name = name
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge_after = hedge_after
+        self.limiter = limiter
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_seconds, on_state_change=self.on_state_change)
+
+    # --- Hooks ---
+
+    def report(self, outcome: str) -> None:
+        """Called once per outcome: success, error, retry, rejected or hedged."""
+
+    def on_retry(self, error: Exception, attempt: int, delay: float) -> None:
+        """Called before waiting `delay` seconds ahead of retry number `attempt`."""
+
+    def on_state_change(self, previous: int, state: int) -> None:
+        """Called, under the breaker's lock, whenever the breaker changes state."""
+
+    # --- Calls ---
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before retry number `attempt` (1-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def worst_case_seconds(self, attempt_timeout: float) -> float:
+        """Longest one call can take: every attempt running into `attempt_timeout`, plus the longest backoffs."""
+        backoffs = sum(min(self.max_delay, self.base_delay * 2 ** (attempt - 1)) for attempt in range(1, self.attempts))
+        return self.attempts * attempt_timeout + backoffs
+
+    def _before_attempt(self) -> None:
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            self.report("rejected")
+            raise
+
+    def _after_failure(self, error: BaseException, attempt: int) -> float:
+        """Records a failed attempt. Returns the delay before retrying, or re-raises if there is no retry."""
+        if not isinstance(error, Exception):
+            # Cancelled or interrupted: no verdict on the upstream, but a half-open trial must not stay claimed
+            self.breaker.release_trial()
+            raise error
+        if not is_transient(error):
+            # The problem is the request or its output (e.g. an unparsable answer), which
+            # says nothing about the upstream's health: neither close nor open the circuit
+            self.breaker.release_trial()
+            self.report("error")
+            raise error
+        self.breaker.record_failure()
+        # Once this failure has opened the circuit, retrying would only be rejected
+        if attempt == self.attempts or self.breaker.state == CircuitBreaker.OPEN:
+            self.report("error")
+            raise error
+        delay = self.backoff(attempt)
+        self.on_retry(error, attempt, delay)
+        self.report("retry")
+        return delay
+
+    def _after_success(self) -> None:
+        self.breaker.record_success()
+        self.report("success")
+
+    def call(self, fn: Callable[[], Any], hedge: bool = False) -> Any:
+        """
+        Calls `fn` with retries and the circuit breaker. With `hedge`, an attempt
+        that takes longer than `hedge_after` seconds gets a duplicate sent in
+        parallel and the first success wins; only use it for idempotent calls.
+        """
+        for attempt in range(1, self.attempts + 1):
+            self._before_attempt()
+            try:
+                if self.limiter is not None:
+                    self.limiter.acquire()
+                result = self._hedged(fn) if hedge and self.hedge_after > 0 else fn()
+            except BaseException as e:
+                time.sleep(self._after_failure(e, attempt))
+                continue
+            self._after_success()
+            return result
+
+    async def acall(self, factory: Callable[[], Awaitable[Any]], hedge: bool = False) -> Any:
+        """Async variant of call(); `factory` returns a new awaitable for every attempt."""
+        for attempt in range(1, self.attempts + 1):
+            self._before_attempt()
+            try:
+                if self.limiter is not None:
+                    await self.limiter.aacquire()
+                result = await (self._ahedged(factory) if hedge and self.hedge_after > 0 else factory())
+            except BaseException as e:
+                # CancelledError included: _after_failure releases a half-open trial and re-raises it
+                await asyncio.sleep(self._after_failure(e, attempt))
+                continue
+            self._after_success()
+            return result
+
+    def _may_hedge(self) -> bool:
+        # A duplicate needs its own rate limit slot; without a free one, keep waiting on the first call
+        return self.limiter is None or self.limiter.try_acquire()
+
+    def _hedged(self, fn: Callable[[], Any]) -> Any:
+        # Each attempt runs in a copy of the caller's context, so context variables (e.g. a request profile) follow it
+        done, pending = wait({_hedge_executor.submit(contextvars.copy_context().run, fn)}, timeout=self.hedge_after)
+        if not done and self._may_hedge():
+            self.report("hedged")
+            pending.add(_hedge_executor.submit(contextvars.copy_context().run, fn))
+        error: Optional[BaseException] = None
+        while done or pending:
+            for future in done:
+                if future.exception() is None:
+                    # The slower copy is left to finish in the background
+                    return future.result()
+                error = future.exception()
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        raise error
+
+    async def _ahedged(self, factory: Callable[[], Awaitable[Any]]) -> Any:
+        pending = {asyncio.ensure_future(factory())}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=self.hedge_after)
+            if not done and self._may_hedge():
+                self.report("hedged")
+                pending.add(asyncio.ensure_future(factory()))
+            error: Optional[BaseException] = None
+            while done or pending:
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            raise error
+        finally:
+            # Cancel the slower copy, or both if the caller was cancelled
+            for task in pending:
+                task.cancel()
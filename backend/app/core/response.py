@@ -1,9 +1,77 @@
-from fastapi.responses import JSONResponse
+import hashlib
+
+import orjson
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response as PlainResponse
+
+from app.core.profiling import profile_span
+
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _orjson_default(obj):
+    """Fallback for types orjson does not serialize natively (non-contiguous arrays, sets)."""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content) -> bytes:
+    """Serializes content to JSON bytes, accepting NumPy arrays and scalars as-is."""
+    return orjson.dumps(content, default=_orjson_default, option=ORJSON_OPTIONS)
+
+
+class APIJSONResponse(JSONResponse):
+    """
+    Default response class: serializes with orjson (NumPy-aware) and records the
+    serialization time when the request is profiled.
+    """
+
+    def render(self, content) -> bytes:
+        with profile_span("serialization"):
+            return dumps(content)
+
+
+class PrerenderedJSONResponse(JSONResponse):
+    """Sends JSON bytes that were serialized ahead of time, e.g. static ML payloads."""
+
+    def render(self, content: bytes) -> bytes:
+        return content
+
+
+def make_etag(body: bytes) -> str:
+    """
+    Weak ETag for a response body. Weak because the compression middleware may
+    re-encode the body, so the validator cannot promise byte-for-byte equality.
+    """
+    return 'W/"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def conditional_json(request: Request, body: bytes, etag: str, cache_control: str):
+    """
+    Serves pre-rendered JSON with caching headers, answering 304 Not Modified when
+    the client's If-None-Match already holds this ETag.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return PlainResponse(status_code=304, headers=headers)
+    return PrerenderedJSONResponse(body, headers=headers)
+
 
 class Response:
     @staticmethod
     def success(data, message: str = "Request successful", status_code: int = 200):
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status_code,
             content={
                 "status": "success",
@@ -14,7 +82,7 @@ class Response:
 
     @staticmethod
     def failure(message: str, status_code: int = 400, error_details: str = None):
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status_code,
             content={"status": "failure", "message": message, "error_details": error_details}
         )
\ No newline at end of file
@@ -1,7 +1,10 @@
-from fastapi import Depends, HTTPException, status
+import secrets
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from firebase_admin import auth
 
+from app.core.config import settings
+
 # Import the User model and the user repository
 from app.models.user import User
 from app.repos.users_repo import users_repo
@@ -78,3 +81,16 @@ async def get_current_active_user(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="This user account is inactive.")
         
     return user
+
+
+
+def require_admin(x_admin_key: str = Header(None)) -> None:
+    """
+    Dependency for operational endpoints (cache warm-up, diagnostics).
+    Requires the `X-Admin-Key` header to match the ADMIN_API_KEY setting;
+    the endpoints are disabled entirely when no key is configured.
+    """
+    if not settings.ADMIN_API_KEY:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin endpoints are disabled.")
+    if not x_admin_key or not secrets.compare_digest(x_admin_key, settings.ADMIN_API_KEY):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid admin key.")
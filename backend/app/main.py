@@ -1,46 +1,101 @@
 # backend/app/main.py
 
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
+from brotli_asgi import BrotliMiddleware
+import asyncio
 import time
 import traceback
 import logging
-import inspect
+import firebase_admin
 
 # NEW: Import your logger instance
 from app.core.logger import logs
+from app.core import metrics
+from app.core import profiling
+from app.core.config import settings
+from app.core.response import APIJSONResponse
 from app.core.firebase import initialize_firebase
+from app.core.llm import GEMINI_MODEL, get_chat_model
+from app.core.readiness import readiness
+from app.repos.recommendation_stats_repo import recommendation_stats_repo
+from app.routes import kmeans
 from app.routes.auth import router as auth_router
 from app.routes.kmeans import router as kmeans_router
 from app.routes.level_test import router as level_test_router
 from app.routes.assessment import router as assessment_router
 from app.routes.career_map import router as career_map_router
+from app.routes.admin import router as admin_router
 
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    # MODIFIED: Use the new logger for startup events
-    logs.define_logger(level=logging.INFO, message="--- SERVER STARTING UP ---")
+def _warm_subsystem(name: str, load):
+    """Runs one startup loader under readiness tracking, logging rather than raising on failure."""
     try:
-        initialize_firebase()
-        logs.define_logger(level=logging.INFO, message="--- FIREBASE INITIALIZED SUCCESSFULLY ---")
+        with readiness.track(name):
+            load()
     except Exception as e:
         logs.define_logger(
-            level=logging.CRITICAL, 
-            message=f"!!! FATAL STARTUP ERROR: {str(e)}",
-            loggName=inspect.stack()[0]
+            level=logging.CRITICAL,
+            message=f"!!! STARTUP ERROR ({name}): {str(e)}",
+            caller=True
         )
+
+
+async def warm_up_subsystems():
+    """
+    Loads Firebase, the recommendation artifacts and the LLM client in parallel,
+    off the event loop, so none of them delays the server accepting connections.
+    """
+    started = time.perf_counter()
+    await asyncio.gather(
+        asyncio.to_thread(_warm_subsystem, "firebase", initialize_firebase),
+        asyncio.to_thread(_warm_subsystem, "recommendation_artifacts", kmeans.load_artifacts),
+        asyncio.to_thread(_warm_subsystem, "llm_client", get_chat_model),
+    )
+    try:
+        readiness.set_version("firebase", firebase_admin.get_app().project_id)
+    except ValueError:
+        # Firebase failed to initialize; /readyz already reports the error
+        pass
+    readiness.set_version("recommendation_artifacts", dict(kmeans.artifact_versions) or None)
+    readiness.set_version("llm_client", GEMINI_MODEL)
+    logs.define_logger(
+        level=logging.INFO,
+        message=f"--- STARTUP WARM-UP FINISHED in {time.perf_counter() - started:.2f}s - ready: {readiness.is_ready} ---",
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # MODIFIED: Use the new logger for startup events
+    logs.define_logger(level=logging.INFO, message="--- SERVER STARTING UP ---")
+    for name in ("firebase", "recommendation_artifacts", "llm_client"):
+        readiness.register(name)
+    warm_up = asyncio.create_task(warm_up_subsystems())
+    stats_flusher = asyncio.create_task(
+        recommendation_stats_repo.run_flusher(settings.RECOMMENDATION_STATS_FLUSH_SECONDS)
+    )
     yield
+    logs.define_logger(level=logging.INFO, message="--- SERVER SHUTTING DOWN ---")
+    if not warm_up.done():
+        warm_up.cancel()
+    stats_flusher.cancel()
+    # Write the counts gathered since the last flush
+    await asyncio.to_thread(recommendation_stats_repo.flush)
+    logs.stop()
 
 
+STARTED_AT = time.time()
+
 app = FastAPI(
     title="Polaris backend",
     description="This is the backend for my full-stack application.",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=APIJSONResponse,
 )
 
 #Middleware to log every request
@@ -51,7 +106,21 @@ async def log_requests(request: Request, call_next):
     # Log the incoming request
     logs.define_logger(level=logging.INFO, request=request, message="Request received")
     
-    response = await call_next(request)
+    metrics.http_requests_in_flight.inc()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        metrics.http_requests_in_flight.dec()
+        # Label by route template (e.g. /api/v1/ml/jobs/all) rather than raw path to bound cardinality
+        route = request.scope.get("route")
+        metrics.http_request_duration.observe(
+            time.time() - start_time,
+            request.method,
+            getattr(route, "path", "unmatched"),
+            str(status_code),
+        )
     
     process_time = (time.time() - start_time) * 1000
     formatted_process_time = f'{process_time:.2f}ms'
@@ -73,13 +142,31 @@ async def global_exception_handler(request: Request, exc: Exception):
         level=logging.CRITICAL,
         request=request,
         message=f"Unhandled exception: {str(exc)}\n{traceback.format_exc()}",
-        loggName=inspect.stack()[0]
+        caller=True
     )
     return JSONResponse(
         status_code=500,
         content={"message": "An internal server error occurred."},
     )
 
+# Opt-in request profiling, registered only when enabled so it costs nothing otherwise
+if settings.PROFILING_ENABLED:
+    @app.middleware("http")
+    async def profile_requests(request: Request, call_next):
+        reason = profiling.should_profile(request.headers)
+        if reason is None:
+            return await call_next(request)
+        profile, token = profiling.start_profile(request.method, request.url.path, reason)
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            response.headers["X-Profile-Id"] = profile.id
+            return response
+        finally:
+            route = request.scope.get("route")
+            profiling.finish_profile(profile, token, getattr(route, "path", None), status_code)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -89,11 +176,37 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON responses: brotli when the client accepts it, otherwise gzip
+app.add_middleware(BrotliMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE, gzip_fallback=True)
+
 app.include_router(auth_router, prefix="/api/v1/users")
 app.include_router(kmeans_router, prefix="/api/v1/ml")
 app.include_router(assessment_router, prefix="/api/v1/assessments")
 app.include_router(level_test_router, prefix="/api/v1/level-test")
 app.include_router(career_map_router, prefix="/api/v1/career-map")
+app.include_router(admin_router, prefix="/api/v1/admin")
+
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    """Prometheus scrape endpoint."""
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+# --- Health checks ---
+# Liveness: the process is up and serving. Never depends on downstream systems,
+# so a slow GCS or Firebase never gets a healthy instance restarted.
+@app.get("/healthz", include_in_schema=False)
+def healthz():
+    return {"status": "alive", "uptime_seconds": round(time.time() - STARTED_AT, 1)}
+
+# Readiness: every required subsystem has loaded. Returns 503 until then so the
+# load balancer only routes traffic to warm instances.
+@app.get("/readyz", include_in_schema=False)
+def readyz():
+    ready = readiness.is_ready
+    return APIJSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", "subsystems": readiness.snapshot()},
+    )
 
 @app.get("/")
 def read_root():
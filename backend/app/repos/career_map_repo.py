@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from app.core.cache import TTLCache, CacheStats
+from app.core.config import settings
+from app.core.profiling import firestore_op
+from app.core.db import get_firestore_client
+
+
+class CareerMapCacheRepository:
+    """
+    Caches generated career maps keyed by a normalized profile fingerprint.
+
+    Entries live in the `career_map_cache` Firestore collection so they are
+    shared by every instance, with a local TTL cache in front of it.
+    Path: /career_map_cache/{fingerprint}
+    """
+
+    collection = "career_map_cache"
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self.local = TTLCache(maxsize=512, ttl=ttl_seconds)
+        self.stats = CacheStats("career_map")
+
+    def get(self, fingerprint: str) -> Optional[dict]:
+        """Returns the cached entry for a fingerprint, or None if missing or expired."""
+        entry = self.local.get(fingerprint)
+        if entry is None:
+            db = get_firestore_client()
+            with firestore_op("read", self.collection):
+                doc = db.collection(self.collection).document(fingerprint).get()
+            if not doc.exists:
+                return None
+            entry = doc.to_dict()
+            ttl = self.ttl_seconds
+            expires_at = entry.get("expiresAt")
+            if expires_at:
+                remaining = (expires_at - datetime.now(timezone.utc)).total_seconds()
+                if remaining <= 0:
+                    return None
+                # Keep the local copy no longer than the Firestore entry itself lives
+                ttl = min(ttl, remaining)
+            self.local.set(fingerprint, entry, ttl=ttl)
+        return entry
+
+    def set(self, fingerprint: str, career_map: dict, estimated_tokens: int, prompt_version: str) -> None:
+        """Stores a generated career map along with the tokens it cost to generate."""
+        now = datetime.now(timezone.utc)
+        entry = {
+            "career_map": career_map,
+            "estimated_tokens": estimated_tokens,
+            "prompt_version": prompt_version,
+            "createdAt": now,
+            "expiresAt": now + timedelta(seconds=self.ttl_seconds),
+        }
+        self.local.set(fingerprint, entry)
+        db = get_firestore_client()
+        with firestore_op("write", self.collection):
+            db.collection(self.collection).document(fingerprint).set(entry)
+
+
+career_map_cache_repo = CareerMapCacheRepository(ttl_seconds=settings.CAREER_MAP_CACHE_TTL_SECONDS)
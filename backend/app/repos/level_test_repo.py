@@ -0,0 +1,251 @@
+import hashlib
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List
+
+from firebase_admin import firestore
+from google.api_core.exceptions import AlreadyExists, FailedPrecondition, NotFound
+
+from app.core.cache import TTLCache
+from app.core import metrics
+from app.core.profiling import firestore_op
+from app.core.db import get_firestore_client
+
+
+def quiz_role_id(job_title: str) -> str:
+    """Document id used for a role's quizzes and assessments."""
+    return job_title.lower().replace(" ", "_")
+
+
+def question_id(question_text: str) -> str:
+    """Stable id for a question, derived from its normalized text."""
+    normalized = " ".join(question_text.lower().split())
+    return "q_" + hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12]
+
+
+class ParsedQuiz:
+    """
+    A quiz variant with its answers pre-indexed by question id, so scoring a
+    submission is a dictionary lookup per answer.
+    """
+
+    def __init__(self, role_id: str, variant_id: str, data: dict):
+        self.role_id = role_id
+        self.variant_id = variant_id
+        self.title = data.get("title")
+        self.prompt_version = data.get("prompt_version", "v1")
+        self.questions = []
+        # question_id -> (difficulty, correct_answer)
+        self.answer_index = {}
+        # question_text -> question_id, for clients that still submit full text
+        self.text_index = {}
+        for question in data.get("questions", []):
+            qid = question.get("question_id") or question_id(question["question_text"])
+            question = {**question, "question_id": qid}
+            self.questions.append(question)
+            self.answer_index[qid] = (question["difficulty"], question["correct_answer"])
+            self.text_index[question["question_text"]] = qid
+
+    def to_response(self) -> dict:
+        return {
+            "quiz_id": self.role_id,
+            "variant_id": self.variant_id,
+            "title": self.title,
+            "questions": self.questions,
+        }
+
+
+class QuizBankRepository:
+    """
+    Stores several generated quiz variants per role.
+
+    Paths:
+        /quizzes/{role_id}                         role document, `variants` maps variant_id -> prompt version
+        /quizzes/{role_id}/variants/{variant_id}   one generated quiz
+    Role documents written before the bank existed hold a single quiz inline;
+    they are served as the `legacy` variant.
+    """
+
+    LEGACY_VARIANT_ID = "legacy"
+    LEASE_COLLECTION = "quiz_generation_leases"
+
+    def __init__(self, cache_size: int = 256):
+        self.parsed_quizzes = TTLCache(maxsize=cache_size)
+        # Identifies this process as the holder of generation leases.
+        self.instance_id = uuid.uuid4().hex
+
+    def _role_ref(self, role_id: str):
+        return get_firestore_client().collection("quizzes").document(role_id)
+
+    def list_variant_ids(self, role_id: str, prompt_version: str) -> List[str]:
+        """Returns the ids of a role's variants generated by the given prompt version."""
+        with firestore_op("read", "quizzes"):
+            role_doc = self._role_ref(role_id).get()
+        if not role_doc.exists:
+            return []
+        role_data = role_doc.to_dict()
+        variant_ids = [vid for vid, version in role_data.get("variants", {}).items() if version == prompt_version]
+        if role_data.get("questions") and role_data.get("prompt_version", "v1") == prompt_version:
+            variant_ids.append(self.LEGACY_VARIANT_ID)
+            if self.parsed_quizzes.get((role_id, self.LEGACY_VARIANT_ID)) is None:
+                self.parsed_quizzes.set(
+                    (role_id, self.LEGACY_VARIANT_ID), ParsedQuiz(role_id, self.LEGACY_VARIANT_ID, role_data)
+                )
+        return variant_ids
+
+    def get_variant(self, role_id: str, variant_id: str) -> Optional[ParsedQuiz]:
+        """Returns a parsed quiz variant, from the in-memory LRU when possible."""
+        parsed = self.parsed_quizzes.get((role_id, variant_id))
+        if parsed is not None:
+            metrics.cache_requests.inc("quiz_bank", "hit")
+            return parsed
+        metrics.cache_requests.inc("quiz_bank", "miss")
+        with firestore_op("read", "quizzes"):
+            if variant_id == self.LEGACY_VARIANT_ID:
+                doc = self._role_ref(role_id).get()
+            else:
+                doc = self._role_ref(role_id).collection("variants").document(variant_id).get()
+        if not doc.exists or not doc.to_dict().get("questions"):
+            return None
+        parsed = ParsedQuiz(role_id, variant_id, doc.to_dict())
+        self.parsed_quizzes.set((role_id, variant_id), parsed)
+        return parsed
+
+    def pick_variant(self, role_id: str, variant_ids: List[str]) -> Optional[ParsedQuiz]:
+        """Returns one of the given variants at random, or None if none can be loaded."""
+        variant_ids = list(variant_ids)
+        random.shuffle(variant_ids)
+        for variant_id in variant_ids:
+            parsed = self.get_variant(role_id, variant_id)
+            if parsed is not None:
+                return parsed
+        return None
+
+    def add_variant(self, role_id: str, quiz_data: dict, prompt_version: str) -> ParsedQuiz:
+        """Stores a newly generated quiz as a variant of the role, assigning question ids."""
+        variant_id = uuid.uuid4().hex[:8]
+        parsed = ParsedQuiz(role_id, variant_id, {**quiz_data, "prompt_version": prompt_version})
+        role_ref = self._role_ref(role_id)
+        with firestore_op("write", "quizzes", amount=2):
+            role_ref.collection("variants").document(variant_id).set({
+                "title": parsed.title,
+                "questions": parsed.questions,
+                "prompt_version": prompt_version,
+                "createdAt": firestore.SERVER_TIMESTAMP,
+            })
+            role_ref.set({"title": parsed.title, "variants": {variant_id: prompt_version}}, merge=True)
+        self.parsed_quizzes.set((role_id, variant_id), parsed)
+        return parsed
+
+    def acquire_generation_lease(self, lease_key: str, ttl_seconds: int) -> bool:
+        """
+        Tries to become the only instance generating a quiz for `lease_key`.
+
+        Uses create-if-absent on /quiz_generation_leases/{lease_key}. An expired
+        lease left behind by a crashed instance is deleted (guarded by its update
+        time, so two instances cannot both take it over) and the create is retried once.
+
+        Returns:
+            True if this instance now holds the lease.
+        """
+        lease_ref = get_firestore_client().collection(self.LEASE_COLLECTION).document(lease_key)
+        lease = {
+            "owner": self.instance_id,
+            "expiresAt": datetime.now(timezone.utc) + timedelta(seconds=ttl_seconds),
+        }
+        for _ in range(2):
+            try:
+                with firestore_op("write", self.LEASE_COLLECTION):
+                    lease_ref.create(lease)
+                return True
+            except AlreadyExists:
+                with firestore_op("read", self.LEASE_COLLECTION):
+                    snapshot = lease_ref.get()
+                if not snapshot.exists:
+                    continue
+                expires_at = snapshot.to_dict().get("expiresAt")
+                if expires_at and expires_at > datetime.now(timezone.utc):
+                    return False
+                try:
+                    db = get_firestore_client()
+                    lease_ref.delete(option=db.write_option(last_update_time=snapshot.update_time))
+                except (FailedPrecondition, NotFound):
+                    return False
+        return False
+
+    def release_generation_lease(self, lease_key: str) -> None:
+        """Deletes the lease if this instance still holds it."""
+        db = get_firestore_client()
+        lease_ref = db.collection(self.LEASE_COLLECTION).document(lease_key)
+        with firestore_op("read", self.LEASE_COLLECTION):
+            snapshot = lease_ref.get()
+        if snapshot.exists and snapshot.to_dict().get("owner") == self.instance_id:
+            try:
+                lease_ref.delete(option=db.write_option(last_update_time=snapshot.update_time))
+            except (FailedPrecondition, NotFound):
+                pass
+
+    def find_variant_by_question_texts(self, role_id: str, question_texts: List[str], prompt_version: str) -> Optional[ParsedQuiz]:
+        """
+        Locates the variant a text-only submission was answered against. A
+        submission without any question text matches nothing (None), rather
+        than whichever variant happens to be listed first.
+        """
+        if not question_texts:
+            return None
+        for variant_id in self.list_variant_ids(role_id, prompt_version):
+            parsed = self.get_variant(role_id, variant_id)
+            if parsed is not None and all(text in parsed.text_index for text in question_texts):
+                return parsed
+        return None
+
+
+class AssessmentRepository:
+    """Handles database operations for user assessments."""
+    def save_assessment(self, user_id: str, quiz_id: str, assessment_data: dict):
+        """
+        Saves an assessment result as a document in a subcollection
+        under the corresponding user.
+        Path: /users/{user_id}/assessments/{quiz_id}
+        """
+        try:
+            print(f"Attempting to save assessment for user: {user_id}, quiz: {quiz_id}")
+            db = get_firestore_client()
+            # We will use the quiz_id as the document ID for the assessment to prevent duplicates
+            assessment_ref = db.collection('users').document(user_id).collection('assessments').document(quiz_id)
+            with firestore_op("write", "assessments"):
+                assessment_ref.set(assessment_data)
+            print(f"✅ Successfully saved assessment for user: {user_id}")
+        except Exception as e:
+            print(f"🔥🔥🔥 DATABASE ERROR: Failed to save assessment for user {user_id}. Error: {e}")
+            # Re-raise the exception to be caught by the route's main error handler
+            raise
+
+    def update_assessment_if_current(self, user_id: str, quiz_id: str, submission_id: str, fields: dict) -> bool:
+        """
+        Merges fields into an assessment only if it still belongs to the given
+        submission. A resubmission replaces the document with a new
+        `submissionId`, so late background writes for the old one are dropped;
+        the update is guarded by the read's update time, so a resubmission
+        landing between the read and the write is not overwritten either.
+
+        Returns:
+            True if the fields were written.
+        """
+        db = get_firestore_client()
+        assessment_ref = db.collection('users').document(user_id).collection('assessments').document(quiz_id)
+        with firestore_op("read", "assessments"):
+            snapshot = assessment_ref.get()
+        if not snapshot.exists or snapshot.to_dict().get("submissionId") != submission_id:
+            return False
+        try:
+            with firestore_op("write", "assessments"):
+                assessment_ref.update(fields, option=db.write_option(last_update_time=snapshot.update_time))
+        except (FailedPrecondition, NotFound):
+            return False
+        return True
+
+
+quiz_bank_repo = QuizBankRepository()
+assessment_repo = AssessmentRepository()
@@ -0,0 +1,78 @@
+import asyncio
+import threading
+from collections import Counter
+
+from firebase_admin import firestore
+
+from app.core.profiling import firestore_op
+from app.core.db import get_firestore_client
+
+
+class RecommendationStatsRepository:
+    """
+    Counts how often each job cluster has been recommended, across every
+    instance and restart, so the quiz warm-up can prioritize popular roles.
+
+    One document holds a counter per cluster label. Recommendations are
+    counted in memory and flushed periodically as a single write of atomic
+    increments, so /recommend never waits on (or pays for) a Firestore write
+    and concurrent instances never lose a count. Counts not yet flushed are
+    lost if the process dies, which is fine for ranking the warm-up.
+    Path: /recommendation_stats/clusters
+    """
+
+    collection = "recommendation_stats"
+    document = "clusters"
+
+    def __init__(self):
+        self._pending = Counter()
+        self._lock = threading.Lock()
+
+    def record_recommendation(self, cluster_id: int) -> None:
+        """Adds one recommendation of a cluster, in memory until the next flush."""
+        with self._lock:
+            self._pending[cluster_id] += 1
+
+    def flush(self) -> int:
+        """
+        Writes the pending counts as one batch of increments. Best effort: on a
+        failed write the counts are kept for the next flush and the error is logged.
+
+        Returns:
+            The number of recommendations written.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        if not pending:
+            return 0
+        try:
+            ref = get_firestore_client().collection(self.collection).document(self.document)
+            with firestore_op("write", self.collection):
+                ref.set({str(cluster_id): firestore.Increment(count) for cluster_id, count in pending.items()}, merge=True)
+        except Exception as e:
+            print(f"⚠️ Failed to flush {sum(pending.values())} recommendation counts: {e}")
+            with self._lock:
+                self._pending.update(pending)
+            return 0
+        return sum(pending.values())
+
+    async def run_flusher(self, interval_seconds: float) -> None:
+        """Flushes every `interval_seconds` until cancelled, off the event loop."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            await asyncio.to_thread(self.flush)
+
+    def cluster_counts(self) -> Counter:
+        """Returns cluster label -> number of recommendations so far, including this instance's unflushed ones."""
+        ref = get_firestore_client().collection(self.collection).document(self.document)
+        with firestore_op("read", self.collection):
+            snapshot = ref.get()
+        counts = Counter()
+        if snapshot.exists:
+            counts.update({int(label): count for label, count in snapshot.to_dict().items()})
+        with self._lock:
+            counts.update(self._pending)
+        return counts
+
+
+recommendation_stats_repo = RecommendationStatsRepository()
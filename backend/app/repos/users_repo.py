@@ -1,6 +1,7 @@
 from typing import Optional
 from app.models.user import UserCreate, User
 from app.core.db import get_firestore_client
+from app.core.profiling import firestore_op
 
 class UserRepository:
     
@@ -11,7 +12,8 @@ class UserRepository:
         """
         db = get_firestore_client()
         user_doc_ref = db.collection("users").document(uid)
-        user_doc = user_doc_ref.get()
+        with firestore_op("read", "users"):
+            user_doc = user_doc_ref.get()
 
         if user_doc.exists:
             # Pass the UID into the model since it's the document's ID
@@ -33,7 +35,8 @@ class UserRepository:
         uid = user_data.pop("uid")
         
         # set() creates or overwrites a document
-        db.collection("users").document(uid).set(user_data)
+        with firestore_op("write", "users"):
+            db.collection("users").document(uid).set(user_data)
         
         # Re-fetch the created user to return a consistent object
         created_user = await self.get(uid)
@@ -47,7 +50,8 @@ class UserRepository:
         user_doc_ref = db.collection("users").document(uid)
         
         # update() merges data into an existing document
-        user_doc_ref.update(data_to_update)
+        with firestore_op("write", "users"):
+            user_doc_ref.update(data_to_update)
         
         updated_user = await self.get(uid)
         return updated_user
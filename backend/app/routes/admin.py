@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends
+
+from app.core.config import settings
+from app.core.profiling import ProfiledAPIRoute, recent_profiles
+from app.core.response import Response
+from app.core.security import require_admin
+
+router = APIRouter(tags=["Admin"], route_class=ProfiledAPIRoute, dependencies=[Depends(require_admin)])
+
+
+@router.get("/profiles")
+def list_request_profiles(limit: int = 50, route: str = None):
+    """
+    Returns the most recent request profiles, newest first, with the time each
+    request spent in Firestore, LLM calls, validation, the endpoint and serialization.
+    """
+    profiles = [p for p in reversed(recent_profiles) if route is None or p["route"] == route]
+    return Response.success(
+        {"enabled": settings.PROFILING_ENABLED, "profiles": profiles[:max(0, limit)]},
+        "Recent request profiles.",
+    )
@@ -1,13 +1,14 @@
 from fastapi import APIRouter, Depends, status
 
 from app.core.security import get_current_active_user
+from app.core.profiling import ProfiledAPIRoute
 from app.models.assessment import AssessmentAnswers
 from app.models.user import User
 from app.repos.users_repo import users_repo
 # Import the new service
 from app.services.assessment_service import calculate_riasec_vector
 
-router = APIRouter(tags=["Assessments"])
+router = APIRouter(tags=["Assessments"], route_class=ProfiledAPIRoute)
 
 @router.post("", status_code=status.HTTP_200_OK)
 async def submit_assessment(
@@ -4,13 +4,14 @@ from typing import Optional
 
 # Import the correct dependencies from your updated security.py
 from app.core.security import get_current_user_token, get_current_active_user
+from app.core.profiling import ProfiledAPIRoute
 
 # Import the models and the repository
 from app.models.user import User, UserCreate
 from app.models.user_details import UserDetailsUpdate
 from app.repos.users_repo import users_repo
 
-router = APIRouter(tags=["Users"])
+router = APIRouter(tags=["Users"], route_class=ProfiledAPIRoute)
 
 class UserRegistrationData(BaseModel):
     name: Optional[str] = None
@@ -1,20 +1,26 @@
-import os
+import asyncio
+import json
+from functools import lru_cache
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, Field
 from firebase_admin import firestore
 from typing import List, Literal
 
-from app.core.security import get_current_active_user
+from app.core.security import get_current_active_user, require_admin
 from app.models.user import User
 from app.core.response import Response
-
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import PromptTemplate
+from app.core.profiling import ProfiledAPIRoute, firestore_op
+from app.core.cache import estimate_tokens
+from app.core.prompts import CAREER_MAP_PROMPT
+from app.repos.career_map_repo import career_map_cache_repo
+from app.services.career_map_service import build_profile_fingerprint
+
+from app.core.llm import get_chat_model, invoke_chain
+from app.core.resilience import CircuitOpenError
 from langchain_core.output_parsers import JsonOutputParser
 
 # --- Initialization ---
-model = ChatGoogleGenerativeAI(model="gemini-1.5-flash", google_api_key=os.getenv("GEMINI_API_KEY"))
-router = APIRouter(tags=["Career Map Generation"])
+router = APIRouter(tags=["Career Map Generation"], route_class=ProfiledAPIRoute)
 
 # --- Pydantic Models for Career Map ---
 
@@ -36,57 +42,19 @@ class CareerMapData(BaseModel):
 
 class CareerMapRequest(BaseModel):
     target_job_title: str = Field(..., description="The job title the user wants a career map for.")
+    regenerate: bool = Field(False, description="Bypass the cache and generate a fresh career map.")
 
 # --- LLM Prompt and Chain ---
 
 json_parser = JsonOutputParser(pydantic_object=CareerMapData)
 
-prompt_template = PromptTemplate(
-    template="""
-    You are an expert career strategist. Your task is to generate a detailed, step-by-step career map for a user who wants to transition into a new role.
-
-    **User's Current Profile:**
-    - Current Role: {current_role}
-    - Years of Experience: {years_of_experience}
-    - Highest Education: {education_level}
-    - Financial Situation:
-        - Current Salary (USD): {current_salary}
-        - Household Income (USD): {household_income}
-        - Monthly Expenses (USD): {monthly_expenses}
-        - Risk Tolerance for career change: {risk_tolerance}
-        - Target Salary (USD): {target_salary}
-    - RIASEC Personality Profile (scores from 0 to 1): {personality}
-
-    **User's Skill Assessment for the Target Role:**
-    - Proficiency Level: {proficiency_level}
-    - Feedback Received: {proficiency_feedback}
-
-    **Target Role:** {target_job_title}
-
-    **Instructions:**
-    1.  Create a realistic, actionable career map starting from the user's current situation.
-    2.  The map should be a series of nested steps. The first step should be based on their current role or a very close starting point.
-    3.  For each step, define a clear title, a realistic duration, a description of the goal for that step, and a list of 2-3 concrete tasks to complete.
-    4.  At each step, generate multiple, diverse `next_steps` to create a branching, tree-like structure. These branches should represent different specializations, alternative paths (pivots), or levels of seniority.
-    5.  Consider the user's risk tolerance. A 'low' risk tolerance means suggesting smaller, more stable steps, while 'high' can include more ambitious pivots or starting a business.
-    6.  The entire output MUST be a single, minified JSON object that strictly follows this format: {format_instructions}
-
-    **Example of a single step object:**
-    {{
-      "step_number": 1,
-      "title": "Graduate Software Engineer",
-      "type": "EXPERIENCE",
-      "duration": "1-2 years",
-      "description": "Build a strong foundation...",
-      "tasks_to_complete": ["Contribute to 2-3 major features..."],
-      "next_steps": [ {{...another step object...}} ]
-    }}
-    """,
-    input_variables=["current_role", "years_of_experience", "education_level", "current_salary", "household_income", "monthly_expenses", "risk_tolerance", "personality", "target_job_title", "proficiency_level", "proficiency_feedback"],
-    partial_variables={"format_instructions": json_parser.get_format_instructions()}
-)
-
-chain = prompt_template | model | json_parser
+prompt_template = CAREER_MAP_PROMPT.build(format_instructions=json_parser.get_format_instructions())
+
+
+@lru_cache(maxsize=1)
+def get_career_map_chain():
+    """Builds the career map chain on first use, on the shared chat model."""
+    return prompt_template | get_chat_model() | json_parser
 
 # --- API Endpoint ---
 
@@ -112,7 +80,8 @@ async def generate_career_map(
         db = firestore.client()
         quiz_id = request.target_job_title.lower().replace(" ", "_")
         assessment_ref = db.collection('users').document(current_user.uid).collection('assessments').document(quiz_id)
-        assessment_doc = assessment_ref.get()
+        with firestore_op("read", "assessments"):
+            assessment_doc = assessment_ref.get()
         if assessment_doc.exists:
             assessment_data = assessment_doc.to_dict()
             proficiency_level = assessment_data.get("level", "Not Assessed")
@@ -120,21 +89,42 @@ async def generate_career_map(
     except Exception as e:
         print(f"⚠️  Could not fetch skill assessment for user {current_user.uid}: {e}")
 
+    prompt_inputs = {
+        "current_role": current_user.current_role,
+        "years_of_experience": current_user.years_of_experience,
+        "education_level": current_user.education_level,
+        "current_salary": current_user.financial_status.current_salary,
+        "household_income": current_user.financial_status.household_income,
+        "monthly_expenses": current_user.financial_status.monthly_expenses,
+        "risk_tolerance": current_user.financial_status.risk_tolerance,
+        "target_salary": current_user.financial_status.target_salary,
+        "personality": current_user.personality,
+        "target_job_title": request.target_job_title,
+        "proficiency_level": proficiency_level,
+        "proficiency_feedback": proficiency_feedback
+    }
+
+    # --- Serve from cache when a matching profile was already mapped ---
+    fingerprint = build_profile_fingerprint(
+        current_user, request.target_job_title, proficiency_level, CAREER_MAP_PROMPT.version
+    )
+    if request.regenerate:
+        career_map_cache_repo.stats.record_bypass()
+    else:
+        try:
+            # Firestore round-trips block, so they run on a worker thread like the LLM call
+            cached = await asyncio.to_thread(career_map_cache_repo.get, fingerprint)
+        except Exception as e:
+            print(f"⚠️  Career map cache lookup failed: {e}")
+            cached = None
+        if cached:
+            career_map_cache_repo.stats.record_hit(cached.get("estimated_tokens", 0))
+            return cached["career_map"]
+        career_map_cache_repo.stats.record_miss()
+
     try:
-        career_map_data = chain.invoke({
-            "current_role": current_user.current_role,
-            "years_of_experience": current_user.years_of_experience,
-            "education_level": current_user.education_level,
-            "current_salary": current_user.financial_status.current_salary,
-            "household_income": current_user.financial_status.household_income,
-            "monthly_expenses": current_user.financial_status.monthly_expenses,
-            "risk_tolerance": current_user.financial_status.risk_tolerance,
-            "target_salary": current_user.financial_status.target_salary,
-            "personality": current_user.personality,
-            "target_job_title": request.target_job_title,
-            "proficiency_level": proficiency_level,
-            "proficiency_feedback": proficiency_feedback
-        })
+        # On a worker thread: the LLM call and its retry backoff must not block the event loop
+        career_map_data = await asyncio.to_thread(invoke_chain, get_career_map_chain(), prompt_inputs, hedge=True)
 
         if not career_map_data:
             raise HTTPException(
@@ -142,10 +132,34 @@ async def generate_career_map(
                 detail="The AI model failed to generate a valid career map. This might be a temporary issue. Please try again."
             )
 
+        try:
+            estimated_tokens = estimate_tokens(prompt_template.format(**prompt_inputs)) + estimate_tokens(json.dumps(career_map_data))
+            await asyncio.to_thread(
+                career_map_cache_repo.set, fingerprint, career_map_data, estimated_tokens, CAREER_MAP_PROMPT.version
+            )
+        except Exception as e:
+            print(f"⚠️  Could not cache career map for user {current_user.uid}: {e}")
+
         return career_map_data
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     except Exception as e:
         print(f"🔥🔥🔥 LLM CAREER MAP ERROR: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to generate career map from LLM. Error: {e}"
-        )
\ No newline at end of file
+        )
+
+
+@router.get("/cache-stats", dependencies=[Depends(require_admin)])
+def get_career_map_cache_stats():
+    """
+    Reports the career map cache hit rate and the estimated LLM tokens saved
+    on this instance since startup. The counters are kept in process memory,
+    so they are not aggregated across instances and reset on restart; use the
+    polaris_cache_requests_total metric for a fleet-wide hit rate.
+    """
+    return Response.success(
+        {**career_map_cache_repo.stats.snapshot(), "scope": "process"},
+        "Career map cache statistics for this instance since startup (per process, not fleet-wide).",
+    )
@@ -1,11 +1,16 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel, Field, TypeAdapter
 from typing import List
-import joblib
-import gcsfs
 import numpy as np
 import json
 import os
+import time
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.profiling import ProfiledAPIRoute
+from app.core.response import PrerenderedJSONResponse, conditional_json, dumps, make_etag
+from app.repos.recommendation_stats_repo import recommendation_stats_repo
 
 # --- Pydantic Models for this specific router ---
 class RiascScore(BaseModel):
@@ -38,42 +43,133 @@ class RiascProfile(BaseModel):
 class ClusterProfile(BaseModel):
     cluster_label: int
     riasec_profile: RiascProfile
+
+_jobs_adapter = TypeAdapter(List[Job])
+_cluster_profiles_adapter = TypeAdapter(List[ClusterProfile])
     
 # --- Router Setup ---
 router = APIRouter(
     prefix="/jobs",
-    tags=["Job Recommendations"]
+    tags=["Job Recommendations"],
+    route_class=ProfiledAPIRoute,
 )
 
 # --- Load Artifacts for this router ---
-# This data is loaded once when the application starts
+# Loaded once per process by load_artifacts(), which the app lifespan runs in the background
 GCS_BUCKET = os.getenv("GCS_BUCKET", "job-rec-pipeline-artifacts")
 PROCESSED_DATA_PATH = f"gs://{GCS_BUCKET}/data/processed/jobs_with_vectors_and_pca.json"
 CLUSTER_PROFILES_PATH = f"gs://{GCS_BUCKET}/models/cluster_profiles.json"
 KMEANS_MODEL_PATH = f"gs://{GCS_BUCKET}/models/kmeans_model.joblib" # Needed for pre-calculating labels
 
+RIASEC_ORDER = ['R', 'I', 'A', 'S', 'E', 'C']
+
 all_jobs_data = []
 cluster_profiles = []
+# Cluster profile vectors as one matrix (rows follow cluster_profiles), for a vectorized nearest-cluster lookup
+cluster_profile_matrix = np.empty((0, len(RIASEC_ORDER)))
+cluster_profile_labels = np.empty(0, dtype=int)
+# Response bodies serialized once at load time; the data never changes while the process runs
+all_jobs_json = b"[]"
+cluster_profiles_json = b"[]"
+# Cluster id -> complete /recommend response body
+recommendations_json = {}
+all_jobs_etag = make_etag(all_jobs_json)
+cluster_profiles_etag = make_etag(cluster_profiles_json)
+# Static ML data only changes with a new deployment, so shared caches may hold it too
+STATIC_DATA_CACHE_CONTROL = (
+    f"public, max-age={settings.STATIC_DATA_MAX_AGE_SECONDS}, "
+    f"stale-while-revalidate={settings.STATIC_DATA_MAX_AGE_SECONDS}"
+)
+# GCS object generation of each loaded artifact, reported by /readyz
+artifact_versions = {}
+
+def fetch_artifact(fs, name: str, path: str, mode: str, loader):
+    """Opens and parses one artifact from GCS, recording fetch count, duration and object generation."""
+    started = time.perf_counter()
+    try:
+        with fs.open(path, mode) as f:
+            artifact = loader(f)
+            artifact_versions[name] = getattr(f, "details", {}).get("generation")
+    except Exception:
+        metrics.gcs_fetches.inc(name, "error")
+        raise
+    metrics.gcs_fetches.inc(name, "success")
+    metrics.gcs_fetch_duration.observe(time.perf_counter() - started, name)
+    return artifact
+
+def prerender_payloads(jobs_data: list, profiles: list):
+    """
+    Validates the static responses against their response models and serializes
+    them once, so requests only send bytes instead of re-validating and
+    re-encoding every job. Raises pydantic.ValidationError if an artifact does
+    not match the schema the endpoints document.
+    """
+    global all_jobs_json, cluster_profiles_json, recommendations_json, all_jobs_etag, cluster_profiles_etag
+    jobs = _jobs_adapter.validate_python(jobs_data)
+    validated_profiles = _cluster_profiles_adapter.validate_python(profiles)
+    jobs_by_cluster = {}
+    for job in jobs:
+        jobs_by_cluster.setdefault(job.cluster_label, []).append(job)
+
+    all_jobs_json = dumps(_jobs_adapter.dump_python(jobs, mode="json"))
+    cluster_profiles_json = dumps(_cluster_profiles_adapter.dump_python(validated_profiles, mode="json"))
+    # One complete /recommend body per cluster, plus -1 for "no cluster profiles loaded"
+    cluster_ids = set(jobs_by_cluster) | {profile.cluster_label for profile in validated_profiles} | {-1}
+    recommendations_json = {
+        cluster_id: dumps(
+            RecommendationResponse(
+                best_cluster_id=cluster_id, recommendations=jobs_by_cluster.get(cluster_id, [])
+            ).model_dump(mode="json")
+        )
+        for cluster_id in cluster_ids
+    }
+    all_jobs_etag = make_etag(all_jobs_json)
+    cluster_profiles_etag = make_etag(cluster_profiles_json)
+
+def load_artifacts():
+    """
+    Fetches the job corpus, cluster profiles and KMeans model from GCS, labels
+    every job with its cluster and pre-renders the static responses. Until this
+    finishes the recommendation endpoints answer 503. Raises if any artifact fails to load.
+    """
+    global all_jobs_data, cluster_profiles, cluster_profile_matrix, cluster_profile_labels
+    # Imported here: gcsfs and joblib are slow to import and only needed for this one-off load.
+    import gcsfs
+    import joblib
 
-try:
     fs = gcsfs.GCSFileSystem()
-    with fs.open(PROCESSED_DATA_PATH, 'r') as f:
-        all_jobs_data = json.load(f)
-    with fs.open(CLUSTER_PROFILES_PATH, 'r') as f:
-        cluster_profiles = json.load(f)
-    with fs.open(KMEANS_MODEL_PATH, 'rb') as f:
-        kmeans_model = joblib.load(f)
-
-    # Pre-calculate cluster labels for fast lookups
-    for job in all_jobs_data:
-        combined_vec = np.array(job['reduced_content_vector'] + [job['job_riasec_vector'].get(k, 0) for k in ['R', 'I', 'A', 'S', 'E', 'C']]).reshape(1, -1)
-        job['cluster_label'] = int(kmeans_model.predict(combined_vec)[0])
+    jobs = fetch_artifact(fs, "jobs", PROCESSED_DATA_PATH, 'r', json.load)
+    profiles = fetch_artifact(fs, "cluster_profiles", CLUSTER_PROFILES_PATH, 'r', json.load)
+    kmeans_model = fetch_artifact(fs, "kmeans_model", KMEANS_MODEL_PATH, 'rb', joblib.load)
+
+    # Pre-calculate cluster labels for fast lookups, predicting all jobs in one call
+    if jobs:
+        combined_vectors = np.array([
+            job['reduced_content_vector'] + [job['job_riasec_vector'].get(k, 0) for k in RIASEC_ORDER]
+            for job in jobs
+        ])
+        for job, label in zip(jobs, kmeans_model.predict(combined_vectors)):
+            job['cluster_label'] = int(label)
+
+    cluster_profile_matrix = np.array(
+        [[profile['riasec_profile'].get(k, 0) for k in RIASEC_ORDER] for profile in profiles]
+    ).reshape(-1, len(RIASEC_ORDER))
+    cluster_profile_labels = np.array([profile['cluster_label'] for profile in profiles], dtype=int)
+    prerender_payloads(jobs, profiles)
+    # Publish the data last: the endpoints treat a non-empty all_jobs_data as "loaded"
+    all_jobs_data, cluster_profiles = jobs, profiles
     print("✅ Job recommendation models loaded successfully.")
-except Exception as e:
-    print(f"❌ Error loading job recommendation models: {e}")
+
+# The responses below are validated and serialized once by prerender_payloads(), so the
+# routes send bytes (response_class) and only document their schema (responses=)
+NOT_MODIFIED_RESPONSE = {304: {"description": "The client's cached copy (If-None-Match) is current."}}
 
 # --- API Endpoint ---
-@router.post("/recommend", response_model=RecommendationResponse)
+@router.post(
+    "/recommend",
+    response_class=PrerenderedJSONResponse,
+    responses={200: {"model": RecommendationResponse}},
+)
 def recommend_jobs_for_user(user_scores: RiascScore):
     """
     Accepts a user's RIASEC personality vector and returns a list of recommended jobs.
@@ -81,44 +177,45 @@ def recommend_jobs_for_user(user_scores: RiascScore):
     if not all_jobs_data:
         raise HTTPException(status_code=503, detail="Service unavailable: Job models not loaded.")
 
-    riasec_order = ['R', 'I', 'A', 'S', 'E', 'C']
-    user_vec_np = np.array([getattr(user_scores, k) for k in riasec_order])
+    user_vec_np = np.array([getattr(user_scores, k) for k in RIASEC_ORDER])
 
-    smallest_distance = float('inf')
     best_cluster_id = -1
-    for profile in cluster_profiles:
-        profile_vec_np = np.array([profile['riasec_profile'].get(k, 0) for k in riasec_order])
-        distance = np.linalg.norm(user_vec_np - profile_vec_np)
-        if distance < smallest_distance:
-            smallest_distance = distance
-            best_cluster_id = profile['cluster_label']
+    if len(cluster_profile_labels):
+        distances = np.linalg.norm(cluster_profile_matrix - user_vec_np, axis=1)
+        best_cluster_id = int(cluster_profile_labels[np.argmin(distances)])
 
-    recommended_jobs = [
-        job for job in all_jobs_data 
-        if job.get('cluster_label') == best_cluster_id
-    ]
+    # Counted in memory and flushed to Firestore in batches; the quiz warm-up ranks roles by it
+    recommendation_stats_repo.record_recommendation(best_cluster_id)
 
-    return RecommendationResponse(best_cluster_id=best_cluster_id, recommendations=recommended_jobs)
+    return PrerenderedJSONResponse(recommendations_json[best_cluster_id])
 
 
 # --- API Endpoint to Get Cluster Profiles ---
 
-@router.get("/cluster-profiles", response_model=List[ClusterProfile])
-def get_cluster_profiles():
+@router.get(
+    "/cluster-profiles",
+    response_class=PrerenderedJSONResponse,
+    responses={200: {"model": List[ClusterProfile]}, **NOT_MODIFIED_RESPONSE},
+)
+def get_cluster_profiles(request: Request):
     """
     Returns the average RIASEC personality profile for each job cluster.
     """
     if not cluster_profiles:
         raise HTTPException(status_code=503, detail="Service unavailable: Cluster profiles not loaded.")
     
-    return cluster_profiles
+    return conditional_json(request, cluster_profiles_json, cluster_profiles_etag, STATIC_DATA_CACHE_CONTROL)
 
-@router.get("/all", response_model=List[Job])
-def get_all_jobs():
+@router.get(
+    "/all",
+    response_class=PrerenderedJSONResponse,
+    responses={200: {"model": List[Job]}, **NOT_MODIFIED_RESPONSE},
+)
+def get_all_jobs(request: Request):
     """
     Returns all jobs with their assigned cluster labels.
     """
     if not all_jobs_data:
         raise HTTPException(status_code=503, detail="Service unavailable: Job models not loaded.")
     
-    return all_jobs_data
\ No newline at end of file
+    return conditional_json(request, all_jobs_json, all_jobs_etag, STATIC_DATA_CACHE_CONTROL)
\ No newline at end of file
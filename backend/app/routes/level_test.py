@@ -1,147 +1,216 @@
-import os
 import json
+import logging
+import math
+import time
 import traceback
+import uuid
+from collections import Counter
+from functools import lru_cache
 from firebase_admin import firestore
-from fastapi import APIRouter
+from fastapi import APIRouter, BackgroundTasks, Depends
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 from dotenv import load_dotenv
 
+from app.core.config import settings
+from app.core.logger import logs
 from app.core.response import Response
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import PromptTemplate
+from app.core.singleflight import SingleFlight
+from app.core.security import require_admin
+from app.core.profiling import ProfiledAPIRoute
+from app.core.prompts import QUIZ_GENERATION_PROMPT, QUIZ_EVALUATION_PROMPT
+from app.repos.level_test_repo import quiz_bank_repo, assessment_repo, quiz_role_id
+from app.repos.recommendation_stats_repo import recommendation_stats_repo
+from app.services.level_test_service import score_answers, classify_level, default_feedback
+from app.services.quiz_warmup import quiz_warmup_job, rank_job_titles
+from app.routes import kmeans
+from app.core.llm import LLM_CALL_BUDGET_SECONDS, get_chat_model, invoke_chain
 from langchain_core.output_parsers import JsonOutputParser
 
 load_dotenv()
 
 # --- Initialization ---
-model = ChatGoogleGenerativeAI(model="gemini-1.5-flash", google_api_key=os.getenv("GEMINI_API_KEY"))
 json_parser = JsonOutputParser()
-router = APIRouter(tags=["Skill Assessment"])
+router = APIRouter(tags=["Skill Assessment"], route_class=ProfiledAPIRoute)
+# Collapses concurrent generations of the same role's quiz within this process.
+quiz_generation_flight = SingleFlight()
 
 
-# --- Pydantic Models (Unchanged) ---
+# --- Pydantic Models ---
 class QuizRequest(BaseModel):
     job_title: str
 
 class UserAnswer(BaseModel):
-    question_text: str
+    # Clients should send question_id; question_text is still accepted from older clients.
+    question_id: Optional[str] = None
+    question_text: Optional[str] = None
     selected_answer: str
 
 class SubmissionRequest(BaseModel):
     user_id: str
     job_title: str
+    variant_id: Optional[str] = None
     answers: List[UserAnswer]
 
+class WarmupRequest(BaseModel):
+    # Defaults to every role in the recommendation corpus, most recommended first.
+    job_titles: Optional[List[str]] = None
+    limit: Optional[int] = None
 
-# --- NEW: Assessment Repository ---
-class AssessmentRepository:
-    """Handles database operations for user assessments."""
-    def save_assessment(self, user_id: str, quiz_id: str, assessment_data: dict):
-        """
-        Saves an assessment result as a document in a subcollection
-        under the corresponding user.
-        Path: /users/{user_id}/assessments/{quiz_id}
-        """
-        try:
-            print(f"Attempting to save assessment for user: {user_id}, quiz: {quiz_id}")
-            db = firestore.client()
-            # We will use the quiz_id as the document ID for the assessment to prevent duplicates
-            assessment_ref = db.collection('users').document(user_id).collection('assessments').document(quiz_id)
-            assessment_ref.set(assessment_data)
-            print(f"✅ Successfully saved assessment for user: {user_id}")
-        except Exception as e:
-            print(f"🔥🔥🔥 DATABASE ERROR: Failed to save assessment for user {user_id}. Error: {e}")
-            # Re-raise the exception to be caught by the route's main error handler
-            raise
 
-assessment_repo = AssessmentRepository()
+# A generation lease must outlive the slowest generation, including every LLM retry,
+# or a second instance takes it over and generates a duplicate quiz (plus a margin to store it)
+QUIZ_GENERATION_LEASE_SECONDS = max(settings.QUIZ_GENERATION_LEASE_SECONDS, math.ceil(LLM_CALL_BUDGET_SECONDS) + 10)
+
+
+# --- LLM Prompts and Chains ---
+# Built once, on first use, on the shared chat model; the prompt text lives in the versioned registry.
+@lru_cache(maxsize=1)
+def get_quiz_chain():
+    return QUIZ_GENERATION_PROMPT.build() | get_chat_model() | json_parser
+
+@lru_cache(maxsize=1)
+def get_evaluation_chain():
+    return QUIZ_EVALUATION_PROMPT.build() | get_chat_model() | json_parser
 
 
-# --- Helper Functions (Unchanged from previous version) ---
+# --- Helper Functions ---
 def generate_quiz_from_llm(job_title: str):
     """Generates a quiz using the Gemini model on Vertex AI."""
-    # Your prompt is good, no changes needed here.
-    prompt_template = PromptTemplate(
-        template="""You are an expert technical assessor responsible for creating a skills quiz for a candidate interested in the role of a "{job_title}".
-
-Your task is to generate a 5-question multiple-choice quiz. The quiz should have a mix of difficulties:
-- 2 "Beginner" questions
-- 2 "Intermediate" questions
-- 1 "Advanced" question
-
-For each question, provide 4 options and clearly indicate the correct answer.
-
-You MUST return the output as a single, minified JSON object with no markdown formatting.
-The JSON object should have two keys: "title" and "questions".
-The "title" should be a string like "Technical Assessment: [Job Title]".
-The "questions" key should be an array of question objects. Each question object must have the following keys:
-- "question_text": The full text of the question.
-- "options": An array of 4 strings representing the possible answers.
-- "difficulty": A string, either "Beginner", "Intermediate", or "Advanced".
-- "correct_answer": The string that exactly matches the correct option.
-
-Example for a single question object:
-{{
-  "question_text": "What is the primary purpose of a 'key' prop in a list of React components?",
-  "options": ["To style the component", "To uniquely identify elements for efficient updates", "To pass data to child components", "To handle click events"],
-  "difficulty": "Beginner",
-  "correct_answer": "To uniquely identify elements for efficient updates"
-}}""",
-        input_variables=["job_title"],
-    )
-    chain = prompt_template | model | json_parser
-    return chain.invoke({"job_title": job_title})
-
-def evaluate_score_with_llm(job_title: str, score_percentage: int, performance_breakdown: dict):
+    return invoke_chain(get_quiz_chain(), {"job_title": job_title})
+
+def generate_feedback_with_llm(job_title: str, score_percentage: int, performance_breakdown: dict, level: str) -> str:
+    """Asks the LLM for a short feedback paragraph for an already-classified level."""
+    result = invoke_chain(get_evaluation_chain(), {
+        "job_title": job_title,
+        "score_percentage": score_percentage,
+        "performance_breakdown": json.dumps(performance_breakdown),
+        "level": level,
+    })
+    return result["feedback"]
+
+def write_llm_feedback(user_id: str, quiz_id: str, submission_id: str, job_title: str, score_percentage: int, performance_breakdown: dict, level: str):
     """
-    Uses the LLM to provide qualitative feedback, with robust error handling.
-    Returns a dictionary on success, or a default error dictionary on failure.
+    Background task: replaces the templated feedback on a saved assessment with
+    LLM-written feedback. Failures leave the templated feedback in place, and
+    nothing is written if the user has resubmitted the quiz in the meantime.
     """
     try:
-        prompt_template = PromptTemplate(
-            template="""
-            A user has completed a skill assessment for the role of "{job_title}".
-            Their overall score was {score_percentage}%. Their performance breakdown by difficulty was: {performance_breakdown}
-
-            Based on this, determine their proficiency level and provide brief, encouraging feedback.
-            The level should be one of: "Beginner", "Intermediate", "Advanced".
-            The feedback should be a short paragraph (2-3 sentences) acknowledging their effort and suggesting what to focus on next.
-
-            You MUST return the output as a single, minified JSON object with two keys: "level" and "feedback".
-            """,
-            input_variables=["job_title", "score_percentage", "performance_breakdown"],
+        feedback = generate_feedback_with_llm(job_title, score_percentage, performance_breakdown, level)
+        written = assessment_repo.update_assessment_if_current(user_id, quiz_id, submission_id, {
+            "feedback": feedback,
+            "feedbackStatus": "complete",
+            "feedbackPromptVersion": QUIZ_EVALUATION_PROMPT.version,
+        })
+        if not written:
+            print(f"⚠️  Dropped LLM feedback for user {user_id}, quiz {quiz_id}: the assessment was resubmitted.")
+    except Exception as e:
+        logs.define_logger(
+            level=logging.ERROR,
+            message=f"LLM feedback failed for user {user_id}, quiz {quiz_id}, submission {submission_id}: {e}",
+            caller=True,
         )
+        try:
+            assessment_repo.update_assessment_if_current(user_id, quiz_id, submission_id, {"feedbackStatus": "failed"})
+        except Exception as write_error:
+            # The assessment stays "pending"; leave a trace so it can be found and repaired
+            logs.define_logger(
+                level=logging.ERROR,
+                message=(
+                    f"Could not mark feedback as failed for user {user_id}, quiz {quiz_id}, "
+                    f"submission {submission_id}; the assessment stays pending: {write_error}\n"
+                    f"{traceback.format_exc()}"
+                ),
+                caller=True,
+            )
+
+def generate_quiz_variant(role_id: str, job_title: str):
+    """Generates a new quiz with the LLM and stores it as a variant in the quiz bank."""
+    quiz_data = generate_quiz_from_llm(job_title)
+    return quiz_bank_repo.add_variant(role_id, quiz_data, QUIZ_GENERATION_PROMPT.version)
+
+def _generate_first_variant(role_id: str, job_title: str):
+    """
+    Produces the first quiz for a role exactly once across all instances.
 
-        chain = prompt_template | model | json_parser
-        return chain.invoke({
-            "job_title": job_title, 
-            "score_percentage": score_percentage, 
-            "performance_breakdown": json.dumps(performance_breakdown)
-        })
+    The instance holding the role's Firestore lease generates the quiz; every
+    other instance polls the quiz bank until the quiz appears or the lease
+    expires, at which point it tries to take the lease over.
+    """
+    version = QUIZ_GENERATION_PROMPT.version
+    deadline = time.monotonic() + QUIZ_GENERATION_LEASE_SECONDS * 2
+    while True:
+        quiz = quiz_bank_repo.pick_variant(role_id, quiz_bank_repo.list_variant_ids(role_id, version))
+        if quiz is not None:
+            return quiz
+        if quiz_bank_repo.acquire_generation_lease(role_id, QUIZ_GENERATION_LEASE_SECONDS):
+            try:
+                # Another instance may have finished between our check and taking the lease.
+                quiz = quiz_bank_repo.pick_variant(role_id, quiz_bank_repo.list_variant_ids(role_id, version))
+                return quiz if quiz is not None else generate_quiz_variant(role_id, job_title)
+            finally:
+                quiz_bank_repo.release_generation_lease(role_id)
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Timed out waiting for another instance to generate the quiz for {role_id}.")
+        time.sleep(settings.QUIZ_GENERATION_POLL_SECONDS)
+
+def get_or_generate_first_variant(role_id: str, job_title: str):
+    """Single-flight wrapper so concurrent requests in this process share one generation."""
+    return quiz_generation_flight.do(role_id, lambda: _generate_first_variant(role_id, job_title))
+
+def generate_quiz_variant_in_background(role_id: str, job_title: str):
+    """
+    Background task: tops up a role's quiz bank without failing the request.
+    Skipped when another request or instance is already topping up the same role.
+    """
+    lease_key = f"{role_id}__topup"
+
+    def top_up():
+        if not quiz_bank_repo.acquire_generation_lease(lease_key, QUIZ_GENERATION_LEASE_SECONDS):
+            return
+        try:
+            variant_ids = quiz_bank_repo.list_variant_ids(role_id, QUIZ_GENERATION_PROMPT.version)
+            if len(variant_ids) < settings.QUIZ_VARIANTS_PER_ROLE:
+                generate_quiz_variant(role_id, job_title)
+        finally:
+            quiz_bank_repo.release_generation_lease(lease_key)
+
+    try:
+        quiz_generation_flight.do(lease_key, top_up)
     except Exception as e:
-        print(f"🔥🔥🔥 LLM EVALUATION FAILED: {e}")
-        return {
-            "level": "Evaluation Error",
-            "feedback": "There was an issue generating your feedback, but your score has been saved."
-        }
+        print(f"⚠️  Could not generate an extra quiz variant for {role_id}: {e}")
+
+def run_quiz_warmup(job_titles: List[str]):
+    """Background task: generates missing quizzes for the given roles."""
+    version = QUIZ_GENERATION_PROMPT.version
+    try:
+        quiz_warmup_job.run(
+            job_titles,
+            has_quiz=lambda title: bool(quiz_bank_repo.list_variant_ids(quiz_role_id(title), version)),
+            generate=lambda title: get_or_generate_first_variant(quiz_role_id(title), title),
+            concurrency=settings.QUIZ_WARMUP_CONCURRENCY,
+            rate_per_minute=settings.QUIZ_WARMUP_RATE_PER_MINUTE,
+        )
+    except Exception as e:
+        print(f"🔥🔥🔥 QUIZ WARM-UP FAILED: {e}")
 
 # --- API Routes ---
 @router.post("/generate-quiz")
-def generate_quiz_route(request: QuizRequest):
+def generate_quiz_route(request: QuizRequest, background_tasks: BackgroundTasks):
     try:
         job_title = request.job_title
-        db = firestore.client()
-        quiz_id = job_title.lower().replace(" ", "_")
-        quiz_ref = db.collection('quizzes').document(quiz_id)
-        quiz_doc = quiz_ref.get()
-
-        if quiz_doc.exists:
-            return Response.success(quiz_doc.to_dict(), "Quiz retrieved from cache.")
+        role_id = quiz_role_id(job_title)
+        variant_ids = quiz_bank_repo.list_variant_ids(role_id, QUIZ_GENERATION_PROMPT.version)
+        quiz = quiz_bank_repo.pick_variant(role_id, variant_ids)
+
+        if quiz is not None:
+            # Grow the bank towards the configured number of variants off the request path.
+            if len(variant_ids) < settings.QUIZ_VARIANTS_PER_ROLE:
+                background_tasks.add_task(generate_quiz_variant_in_background, role_id, job_title)
+            return Response.success(quiz.to_response(), "Quiz retrieved from cache.")
         else:
-            quiz_data = generate_quiz_from_llm(job_title)
-            quiz_ref.set(quiz_data)
-            return Response.success(quiz_data, "Quiz generated successfully.")
+            quiz = get_or_generate_first_variant(role_id, job_title)
+            return Response.success(quiz.to_response(), "Quiz generated successfully.")
     except Exception as e:
         print(f"🔥🔥🔥 UNHANDLED EXCEPTION in /generate-quiz: {type(e).__name__}: {e}")
         traceback.print_exc()
@@ -149,48 +218,40 @@ def generate_quiz_route(request: QuizRequest):
 
 
 @router.post("/submit-quiz")
-def submit_quiz_route(submission: SubmissionRequest):
+def submit_quiz_route(submission: SubmissionRequest, background_tasks: BackgroundTasks):
     try:
-        db = firestore.client()
-        quiz_id = submission.job_title.lower().replace(" ", "_")
-        quiz_ref = db.collection('quizzes').document(quiz_id)
-        quiz_doc = quiz_ref.get()
+        quiz_id = quiz_role_id(submission.job_title)
+        if submission.variant_id:
+            quiz = quiz_bank_repo.get_variant(quiz_id, submission.variant_id)
+        else:
+            question_texts = [a.question_text for a in submission.answers if a.question_text]
+            quiz = quiz_bank_repo.find_variant_by_question_texts(quiz_id, question_texts, QUIZ_GENERATION_PROMPT.version)
 
-        if not quiz_doc.exists:
+        if quiz is None:
             return Response.failure(message=f"Quiz for {submission.job_title} not found.", status_code=404)
 
-        questions = quiz_doc.to_dict().get('questions', [])
-        
-        # --- Scoring Logic (This is solid, no changes needed) ---
-        total_score, max_score = 0, 0
-        performance = {
-            "Beginner": {"correct": 0, "total": 0},
-            "Intermediate": {"correct": 0, "total": 0},
-            "Advanced": {"correct": 0, "total": 0}
+        # --- Scoring Logic ---
+        answers = [
+            (answer.question_id or quiz.text_index.get(answer.question_text), answer.selected_answer)
+            for answer in submission.answers
+        ]
+        score_percentage, performance = score_answers(quiz.answer_index, answers)
+
+        # --- Rule-based level; LLM feedback is written to the assessment afterwards ---
+        level = classify_level(performance)
+        evaluation_data = {
+            "level": level,
+            "feedback": default_feedback(submission.job_title, level, performance),
+            "feedbackStatus": "pending",
         }
-        score_weights = {"Beginner": 1, "Intermediate": 3, "Advanced": 5}
-        correct_answers_map = {q['question_text']: q for q in questions}
-
-        for answer in submission.answers:
-            q_text = answer.question_text
-            if q_text in correct_answers_map:
-                details = correct_answers_map[q_text]
-                difficulty = details['difficulty']
-                weight = score_weights[difficulty]
-                performance[difficulty]['total'] += 1
-                max_score += weight
-                if answer.selected_answer == details['correct_answer']:
-                    total_score += weight
-                    performance[difficulty]['correct'] += 1
-
-        score_percentage = int((total_score / max_score) * 100) if max_score > 0 else 0
-
-        # --- Get Qualitative Evaluation ---
-        evaluation_data = evaluate_score_with_llm(submission.job_title, score_percentage, performance)
 
         # --- REVISED: Save result using the new repository ---
+        # Identifies this submission, so background feedback never lands on a later resubmission
+        submission_id = uuid.uuid4().hex
         assessment_for_db = {
             "quizId": quiz_id,
+            "variantId": quiz.variant_id,
+            "submissionId": submission_id,
             "score": score_percentage,
             "submittedAt": firestore.SERVER_TIMESTAMP
         }
@@ -202,6 +263,10 @@ def submit_quiz_route(submission: SubmissionRequest):
             quiz_id=quiz_id,
             assessment_data=assessment_for_db
         )
+        background_tasks.add_task(
+            write_llm_feedback,
+            submission.user_id, quiz_id, submission_id, submission.job_title, score_percentage, performance, level
+        )
 
         # --- THIS IS THE FIX ---
         # Create a separate, clean dictionary to send back to the user.
@@ -215,3 +280,38 @@ def submit_quiz_route(submission: SubmissionRequest):
         print(f"🔥🔥🔥 UNHANDLED EXCEPTION in /submit-quiz: {type(e).__name__}: {e}")
         traceback.print_exc()
         return Response.failure(message="Failed to submit quiz.", status_code=500, error_details=str(e))
+
+
+
+@router.post("/warmup", dependencies=[Depends(require_admin)])
+def start_quiz_warmup_route(request: WarmupRequest, background_tasks: BackgroundTasks):
+    """
+    Starts a background job that pre-generates quizzes for popular roles so the
+    first user for a role does not wait on the LLM. Safe to rerun: roles that
+    already have a quiz are skipped.
+
+    Without explicit job_titles, roles are ordered by how often their cluster
+    has been recommended, as counted in Firestore by every instance. If the
+    counts cannot be read, roles keep the recommendation corpus order.
+    """
+    if quiz_warmup_job.running:
+        return Response.failure(message="A quiz warm-up is already running.", status_code=409)
+
+    job_titles = request.job_titles
+    if not job_titles:
+        try:
+            counts = recommendation_stats_repo.cluster_counts()
+        except Exception as e:
+            print(f"⚠️ Could not read recommendation counts, warming up in corpus order: {e}")
+            counts = Counter()
+        job_titles = rank_job_titles(kmeans.all_jobs_data, counts)
+    if request.limit is not None:
+        job_titles = job_titles[:request.limit]
+    background_tasks.add_task(run_quiz_warmup, job_titles)
+    return Response.success({"queued": len(job_titles)}, "Quiz warm-up started.", status_code=202)
+
+
+@router.get("/warmup", dependencies=[Depends(require_admin)])
+def get_quiz_warmup_status_route():
+    """Reports progress of the current or most recent quiz warm-up."""
+    return Response.success(quiz_warmup_job.report, "Quiz warm-up status.")
@@ -0,0 +1,72 @@
+import hashlib
+import json
+import re
+from typing import Optional
+
+from app.models.user import User
+
+RIASEC_ORDER = ['R', 'I', 'A', 'S', 'E', 'C']
+
+# Salaries and other money fields are bucketed so profiles that differ by a few
+# hundred dollars share a cached career map.
+SALARY_BUCKET_SIZE = 10000
+# RIASEC scores (0-1) are rounded to this step before fingerprinting.
+RIASEC_QUANTUM = 0.1
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """Lower-cases, strips punctuation and collapses whitespace."""
+    if not value:
+        return ""
+    value = re.sub(r"[^\w\s+#]", " ", value.lower())
+    return " ".join(value.split())
+
+
+def bucket_amount(value: Optional[int], bucket_size: int = SALARY_BUCKET_SIZE) -> Optional[int]:
+    """Rounds a money amount down to the start of its bucket."""
+    if value is None:
+        return None
+    return (int(value) // bucket_size) * bucket_size
+
+
+def quantize_riasec(personality: Optional[dict], quantum: float = RIASEC_QUANTUM) -> list:
+    """Rounds each RIASEC score to the nearest quantum, in a fixed R-I-A-S-E-C order."""
+    personality = personality or {}
+    return [round(round(float(personality.get(k, 0)) / quantum) * quantum, 2) for k in RIASEC_ORDER]
+
+
+def build_profile_fingerprint(
+    user: User,
+    target_job_title: str,
+    proficiency_level: str,
+    prompt_version: str,
+) -> str:
+    """
+    Builds a stable cache key from the inputs that shape a generated career map.
+
+    Args:
+        user: The user whose profile feeds the prompt.
+        target_job_title: The role the map is generated for.
+        proficiency_level: The level from the user's skill assessment for that role.
+        prompt_version: Version of the career map prompt, so prompt changes invalidate old entries.
+
+    Returns:
+        A hex digest identifying the normalized profile.
+    """
+    financial = user.financial_status
+    key_parts = {
+        "prompt_version": prompt_version,
+        "target_job_title": normalize_text(target_job_title),
+        "current_role": normalize_text(user.current_role),
+        "years_of_experience": user.years_of_experience,
+        "education_level": normalize_text(user.education_level),
+        "current_salary": bucket_amount(financial.current_salary) if financial else None,
+        "target_salary": bucket_amount(financial.target_salary) if financial else None,
+        "household_income": bucket_amount(financial.household_income) if financial else None,
+        "monthly_expenses": bucket_amount(financial.monthly_expenses, bucket_size=500) if financial else None,
+        "risk_tolerance": normalize_text(financial.risk_tolerance) if financial else "",
+        "personality": quantize_riasec(user.personality),
+        "proficiency_level": normalize_text(proficiency_level),
+    }
+    encoded = json.dumps(key_parts, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
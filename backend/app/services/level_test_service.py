@@ -0,0 +1,103 @@
+from typing import Optional
+
+# Points awarded per correct answer, by question difficulty.
+SCORE_WEIGHTS = {"Beginner": 1, "Intermediate": 3, "Advanced": 5}
+DIFFICULTIES = ["Beginner", "Intermediate", "Advanced"]
+
+# Minimum weighted score (percent) required for each level, checked from the top down.
+ADVANCED_THRESHOLD = 75
+INTERMEDIATE_THRESHOLD = 45
+
+
+def empty_performance() -> dict:
+    """Returns a zeroed per-difficulty performance breakdown."""
+    return {difficulty: {"correct": 0, "total": 0} for difficulty in DIFFICULTIES}
+
+
+def _accuracy(performance: dict, difficulty: str) -> Optional[float]:
+    bucket = performance.get(difficulty, {})
+    total = bucket.get("total", 0)
+    return bucket.get("correct", 0) / total if total else None
+
+
+def weighted_score_percentage(performance: dict, score_weights: dict = SCORE_WEIGHTS) -> int:
+    """Computes the weighted score (0-100) from a performance breakdown."""
+    total_score, max_score = 0, 0
+    for difficulty, bucket in performance.items():
+        weight = score_weights.get(difficulty, 0)
+        total_score += bucket.get("correct", 0) * weight
+        max_score += bucket.get("total", 0) * weight
+    return int((total_score / max_score) * 100) if max_score > 0 else 0
+
+
+def score_answers(answer_index: dict, answers, score_weights: dict = SCORE_WEIGHTS) -> tuple:
+    """
+    Scores a submission against a quiz's precomputed answer index.
+
+    Args:
+        answer_index: question_id -> (difficulty, correct_answer).
+        answers: Iterable of (question_id, selected_answer) pairs. Unknown ids are ignored.
+        score_weights: Points per correct answer, by difficulty.
+
+    Returns:
+        (score_percentage, performance) where performance is the per-difficulty breakdown.
+    """
+    performance = empty_performance()
+    for qid, selected_answer in answers:
+        details = answer_index.get(qid)
+        if details is None:
+            continue
+        difficulty, correct_answer = details
+        performance[difficulty]["total"] += 1
+        if selected_answer == correct_answer:
+            performance[difficulty]["correct"] += 1
+    return weighted_score_percentage(performance, score_weights), performance
+
+
+def classify_level(performance: dict, score_weights: dict = SCORE_WEIGHTS) -> str:
+    """
+    Maps a quiz performance breakdown to a proficiency level without an LLM call.
+
+    A user is "Advanced" if their weighted score clears ADVANCED_THRESHOLD and they
+    answered at least half of the Advanced and Intermediate questions correctly;
+    "Intermediate" if the weighted score clears INTERMEDIATE_THRESHOLD and they got at
+    least half of the Beginner questions right; otherwise "Beginner". A difficulty with
+    no questions does not block a level.
+
+    Args:
+        performance: Per-difficulty {"correct": int, "total": int} counts.
+        score_weights: Points per correct answer, by difficulty.
+
+    Returns:
+        One of "Beginner", "Intermediate" or "Advanced".
+    """
+    score = weighted_score_percentage(performance, score_weights)
+
+    def at_least_half(difficulty: str) -> bool:
+        accuracy = _accuracy(performance, difficulty)
+        return accuracy is None or accuracy >= 0.5
+
+    if score >= ADVANCED_THRESHOLD and at_least_half("Advanced") and at_least_half("Intermediate"):
+        return "Advanced"
+    if score >= INTERMEDIATE_THRESHOLD and at_least_half("Beginner"):
+        return "Intermediate"
+    return "Beginner"
+
+
+def default_feedback(job_title: str, level: str, performance: dict) -> str:
+    """
+    Builds a short templated feedback paragraph, returned immediately while the
+    LLM-written feedback is generated in the background.
+    """
+    weakest = None
+    for difficulty in DIFFICULTIES:
+        accuracy = _accuracy(performance, difficulty)
+        if accuracy is not None and accuracy < 1 and (weakest is None or accuracy < weakest[1]):
+            weakest = (difficulty, accuracy)
+
+    feedback = f"Thanks for completing the {job_title} assessment - your current level is {level}."
+    if weakest:
+        feedback += f" Focus next on strengthening your {weakest[0].lower()}-level concepts."
+    else:
+        feedback += " You answered every question correctly, so try tackling more advanced material next."
+    return feedback
@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional
+
+from app.core.ratelimit import RateLimiter
+
+
+def rank_job_titles(jobs: Iterable[dict], cluster_recommendation_counts: Counter) -> List[str]:
+    """
+    Orders unique job titles by how often they have been recommended, most
+    recommended first. Every job in a cluster is recommended together, so a
+    job's frequency is its cluster's. Ties keep corpus order.
+
+    Args:
+        jobs: Job records from the recommendation corpus (need `title` and `cluster_label`).
+        cluster_recommendation_counts: Cluster label -> number of times it was recommended.
+    """
+    frequency = {}
+    for job in jobs:
+        title = (job.get("title") or "").strip()
+        if title and title not in frequency:
+            frequency[title] = cluster_recommendation_counts.get(job.get("cluster_label"), 0)
+    return sorted(frequency, key=lambda t: -frequency[t])
+
+
+class QuizWarmupJob:
+    """
+    Generates missing quizzes for a list of roles with bounded parallelism and a
+    global rate limit on LLM generations.
+
+    The job is resumable: roles that already have a quiz in the bank are
+    skipped, so rerunning after an interruption only generates what is missing.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.running = False
+        self.report: Optional[dict] = None
+
+    def run(
+        self,
+        job_titles: List[str],
+        has_quiz: Callable[[str], bool],
+        generate: Callable[[str], object],
+        concurrency: int = 4,
+        rate_per_minute: float = 30,
+    ) -> dict:
+        """
+        Args:
+            job_titles: Roles to warm, in priority order.
+            has_quiz: Returns True if the role already has a quiz.
+            generate: Generates and stores a quiz for the role.
+            concurrency: Maximum generations in flight.
+            rate_per_minute: Maximum generations started per minute.
+
+        Returns:
+            A report with counts of generated, skipped and failed roles and the elapsed time.
+        """
+        with self._lock:
+            if self.running:
+                raise RuntimeError("A quiz warm-up is already running.")
+            self.running = True
+
+        limiter = RateLimiter(rate_per_minute)
+        report = {
+            "status": "running",
+            "total": len(job_titles),
+            "generated": 0,
+            "skipped": 0,
+            "failed": 0,
+            "errors": {},
+            "elapsed_seconds": 0.0,
+        }
+        self.report = report
+        started = time.monotonic()
+
+        def warm(title: str):
+            try:
+                if has_quiz(title):
+                    outcome = "skipped"
+                else:
+                    limiter.acquire()
+                    generate(title)
+                    outcome = "generated"
+            except Exception as e:
+                outcome = "failed"
+                report["errors"][title] = str(e)
+            with self._lock:
+                report[outcome] += 1
+                report["elapsed_seconds"] = round(time.monotonic() - started, 2)
+
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+                list(pool.map(warm, job_titles))
+            report["status"] = "completed"
+        finally:
+            if report["status"] == "running":
+                report["status"] = "failed"
+            report["elapsed_seconds"] = round(time.monotonic() - started, 2)
+            with self._lock:
+                self.running = False
+        print(
+            f"✅ Quiz warm-up finished: {report['generated']} generated, {report['skipped']} already cached, "
+            f"{report['failed']} failed in {report['elapsed_seconds']}s."
+        )
+        return report
+
+
+quiz_warmup_job = QuizWarmupJob()
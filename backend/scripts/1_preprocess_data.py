@@ -1,25 +1,38 @@
+import argparse
 import json
 import os
 import re
+import urllib.request
 import joblib
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from sklearn.decomposition import PCA
 import gcsfs
+# SentenceTransformer and PCA are imported where they are used: they are slow to
+# import, and merging scraper changes does not need them
 
 # --- Configuration with GCS and Local Fallback ---
 # Set GCS_BUCKET as an environment variable, or it will default and use local paths.
 GCS_BUCKET_NAME = os.getenv("GCS_BUCKET", "your-gcs-bucket-name-here")
 
 # Define Local Paths
-LOCAL_INPUT_FILE = 'scrapped_job.json'
+# The job corpus: a JSON array, or a .jsonl file with one job per line. Every job needs the
+# fields the app serves (title, description, ...). The scraper's batch output and results
+# export are not corpora: they only hold per-title ratings, which --incremental applies to
+# existing jobs from the scraper's change log.
+LOCAL_INPUT_FILE = os.getenv('PREPROCESS_INPUT_FILE', 'scrapped_job.json')
 LOCAL_OUTPUT_FILE = 'jobs_with_vectors_and_pca.json'
 LOCAL_PCA_MODEL_PATH = 'pca_model.joblib'
+# Last scraper change log sequence number applied by an incremental run
+LOCAL_CHECKPOINT_FILE = 'preprocess_checkpoint.json'
 
 # Define GCS Paths
 GCS_INPUT_FILE = f"gs://{GCS_BUCKET_NAME}/{LOCAL_INPUT_FILE}"
 GCS_OUTPUT_FILE = f"gs://{GCS_BUCKET_NAME}/{LOCAL_OUTPUT_FILE}"
 GCS_PCA_MODEL_PATH = f"gs://{GCS_BUCKET_NAME}/{LOCAL_PCA_MODEL_PATH}"
+GCS_CHECKPOINT_FILE = f"gs://{GCS_BUCKET_NAME}/{LOCAL_CHECKPOINT_FILE}"
+
+# Incremental runs read the scraper's change log: its base URL (GET /results/changes),
+# or a JSON Lines file exported with `python -m core.results --changes-since SEQ`
+SCRAPER_CHANGES_SOURCE = os.getenv('SCRAPER_CHANGES_SOURCE', 'http://localhost:8000')
 
 # Model Configuration
 MODEL_NAME = 'all-MiniLM-L6-v2'
@@ -35,26 +48,46 @@ RIASEC_KEYWORDS = {
     'C': ['conventional', 'organize', 'process', 'structure', 'detail', 'rules', 'compliance', 'financial', 'record-keeping', 'clerical', 'audit', 'database', 'routine', 'accurate', 'analyst']
 }
 
+def read_jobs(f, path):
+    """Parses a JSON array of jobs, or JSON Lines with one job per line."""
+    if path.endswith('.jsonl'):
+        return [json.loads(line) for line in f if line.strip()]
+    return json.load(f)
+
 def load_data():
     """Tries to load data from GCS, falls back to local file."""
     try:
         print(f"Attempting to load data from GCS path: {GCS_INPUT_FILE}")
         fs = gcsfs.GCSFileSystem()
         with fs.open(GCS_INPUT_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+            data = read_jobs(f, GCS_INPUT_FILE)
         print("Successfully loaded data from GCS.")
         return data
     except Exception as e:
         print(f"GCS load failed: {e}. Falling back to local file: {LOCAL_INPUT_FILE}")
         try:
             with open(LOCAL_INPUT_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+                data = read_jobs(f, LOCAL_INPUT_FILE)
             print("Successfully loaded data from local file.")
             return data
         except FileNotFoundError:
             print(f"Error: Local file '{LOCAL_INPUT_FILE}' not found. Aborting.")
             return None
 
+def load_optional(local_path, gcs_path, mode, reader):
+    """Loads an earlier run's artifact from GCS, falling back to the local copy. Returns None if neither exists."""
+    try:
+        fs = gcsfs.GCSFileSystem()
+        with fs.open(gcs_path, mode) as f:
+            return reader(f)
+    except Exception as e:
+        print(f"Could not load '{gcs_path}' from GCS: {e}. Trying local file '{local_path}'.")
+    try:
+        with open(local_path, mode) as f:
+            return reader(f)
+    except FileNotFoundError:
+        return None
+
 def save_json(data, local_path, gcs_path):
     """Saves a JSON file locally and attempts to save to GCS."""
     # Always save locally
@@ -98,8 +131,27 @@ def calculate_riasec_scores(text_blob):
         return {code: 0 for code in RIASEC_KEYWORDS}
     return {code: round(score / total_score, 4) for code, score in scores.items()}
 
+def job_text(job):
+    """The text a job's content vector is computed from."""
+    text_fields = [
+        job.get('title', ''),
+        job.get('description', ''),
+        ' '.join(job.get('required_skills', {}).get('technical', [])),
+        ' '.join(job.get('required_skills', {}).get('soft', [])),
+        ' '.join(job.get('side_hobbies', [])),
+        job.get('work_pressure', '')
+    ]
+    return ' '.join(filter(None, text_fields))
+
+def job_key(job):
+    """Matches scraper change records to existing jobs by case- and whitespace-insensitive title."""
+    return ' '.join(job.get('title', '').lower().split())
+
 def main():
     """Main function to load jobs, generate vectors, apply PCA, and save the updated data."""
+    from sentence_transformers import SentenceTransformer
+    from sklearn.decomposition import PCA
+
     jobs_data = load_data()
     if not jobs_data:
         return
@@ -111,15 +163,7 @@ def main():
     print("\n--- Pass 1: Generating full-dimensional vectors ---")
     full_content_vectors = []
     for i, job in enumerate(jobs_data):
-        text_fields = [
-            job.get('title', ''),
-            job.get('description', ''),
-            ' '.join(job.get('required_skills', {}).get('technical', [])),
-            ' '.join(job.get('required_skills', {}).get('soft', [])),
-            ' '.join(job.get('side_hobbies', [])),
-            job.get('work_pressure', '')
-        ]
-        combined_text = ' '.join(filter(None, text_fields))
+        combined_text = job_text(job)
         
         content_vector = model.encode(combined_text)
         full_content_vectors.append(content_vector)
@@ -149,5 +193,102 @@ def main():
     
     print("\nProcessing complete.")
 
+# --- Incremental Sync ---
+
+def fetch_changes(since_seq):
+    """Reads the scraper's change log entries after `since_seq`, oldest first."""
+    if SCRAPER_CHANGES_SOURCE.startswith(('http://', 'https://')):
+        url = f"{SCRAPER_CHANGES_SOURCE.rstrip('/')}/results/changes?since_seq={since_seq}"
+        print(f"Fetching scraper changes after seq {since_seq} from {url}")
+        with urllib.request.urlopen(url, timeout=60) as response:
+            return [json.loads(line) for line in response if line.strip()]
+    print(f"Reading scraper changes after seq {since_seq} from {SCRAPER_CHANGES_SOURCE}")
+    with open(SCRAPER_CHANGES_SOURCE, 'r', encoding='utf-8') as f:
+        return [change for change in read_jobs(f, SCRAPER_CHANGES_SOURCE) if change['seq'] > since_seq]
+
+def merge_changes(jobs_data, changes):
+    """
+    Applies change records to the processed jobs in seq order. A record only
+    carries a title and its ratings, so it updates the job with the same title;
+    titles with no job in the corpus are skipped, since a job needs a
+    description and skills to be served and embedded. Every field except the
+    title is overwritten.
+
+    Returns:
+        (jobs whose vectors must be recomputed, skipped titles). Only jobs whose
+        text changed, or that have no vectors yet, are re-embedded; a
+        ratings-only change keeps its vectors.
+    """
+    jobs_by_key = {job_key(job): job for job in jobs_data}
+    stale = {}
+    skipped = []
+    for change in changes:
+        record = {k: v for k, v in change.items() if k not in ('seq', 'changed_at')}
+        job = jobs_by_key.get(job_key(record))
+        if job is None:
+            skipped.append(record.get('title', ''))
+            continue
+        previous_text = job_text(job)
+        # Keep the existing title's spelling; it only matched case-insensitively
+        job.update({k: v for k, v in record.items() if k != 'title'})
+        if job_text(job) != previous_text or 'reduced_content_vector' not in job:
+            stale[id(job)] = job
+    return list(stale.values()), skipped
+
+def run_incremental():
+    """
+    Applies only the scraper changes since the last checkpoint to the existing
+    output: ratings are merged into the jobs they name, jobs whose text changed
+    are re-embedded and projected with the existing PCA model, everything else
+    is left as is. New roles and the PCA model need a full preprocessing run.
+    """
+    checkpoint = load_optional(LOCAL_CHECKPOINT_FILE, GCS_CHECKPOINT_FILE, 'r', json.load) or {'last_seq': 0}
+    changes = fetch_changes(checkpoint['last_seq'])
+    if not changes:
+        print(f"No scraper changes after seq {checkpoint['last_seq']}. Output is up to date.")
+        return
+
+    jobs_data = load_optional(LOCAL_OUTPUT_FILE, GCS_OUTPUT_FILE, 'r', json.load)
+    pca = load_optional(LOCAL_PCA_MODEL_PATH, GCS_PCA_MODEL_PATH, 'rb', joblib.load)
+    if jobs_data is None or pca is None:
+        print("Error: No earlier output or PCA model found. Run a full preprocessing first. Aborting.")
+        return
+
+    stale_jobs, skipped = merge_changes(jobs_data, changes)
+    print(
+        f"Merged {len(changes) - len(skipped)} of {len(changes)} changes: "
+        f"{len(stale_jobs)} jobs to re-embed out of {len(jobs_data)}."
+    )
+    if skipped:
+        print(
+            f"Warning: Skipped {len(skipped)} changes for titles not in the corpus "
+            f"(add them with a full preprocessing run): {', '.join(sorted(set(skipped)))}"
+        )
+
+    if stale_jobs:
+        from sentence_transformers import SentenceTransformer
+
+        print(f"\nLoading sentence transformer model: '{MODEL_NAME}'...")
+        model = SentenceTransformer(MODEL_NAME)
+        texts = [job_text(job) for job in stale_jobs]
+        full_vectors = model.encode(texts)
+        reduced_vectors = pca.transform(np.asarray(full_vectors))
+        for job, text, full_vector, reduced_vector in zip(stale_jobs, texts, full_vectors, reduced_vectors):
+            job['job_riasec_vector'] = calculate_riasec_scores(text)
+            job['job_content_vector'] = full_vector.tolist()
+            job['reduced_content_vector'] = reduced_vector.tolist()
+
+    save_json(jobs_data, LOCAL_OUTPUT_FILE, GCS_OUTPUT_FILE)
+    # Only advance the checkpoint once the merged output is saved
+    save_json({'last_seq': max(change['seq'] for change in changes)}, LOCAL_CHECKPOINT_FILE, GCS_CHECKPOINT_FILE)
+    print("\nIncremental processing complete.")
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate job vectors and the PCA model.")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Apply only the scraper changes since the last checkpoint to the existing output.")
+    args = parser.parse_args()
+    if args.incremental:
+        run_incremental()
+    else:
+        main()
\ No newline at end of file
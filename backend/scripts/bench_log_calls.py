@@ -0,0 +1,84 @@
+"""
+Micro-benchmark: cost of one define_logger call on the calling thread, before
+and after deferring formatting to the log listener.
+
+"before" reproduces the previous define_logger: the caller passed
+inspect.stack()[0] and the log_parts dict and message text were built eagerly,
+even for a disabled level. "after" is the current define_logger with
+caller=True. Records go through the bounded queue to a rotating file in a
+temporary directory, as in production.
+
+Run from backend/:  python scripts/bench_log_calls.py
+"""
+import inspect
+import logging
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from starlette.requests import Request
+
+from app.core.logger import LoggerConfig
+
+ITERATIONS = 20000
+REQUEST = Request({
+    "type": "http", "method": "POST", "scheme": "http", "path": "/api/v1/level-test/submit-quiz",
+    "query_string": b"", "headers": [], "client": ("203.0.113.7", 50000), "server": ("polaris", 80),
+})
+
+
+def eager_define_logger(logs, level, request=None, loggName=None, pid=None, message=None, body=None, response=None):
+    """The define_logger body before formatting was deferred."""
+    log_parts = {
+        "IP": f"{request.client.host}" if request else None,
+        "URL": f"{request.method} {request.url}" if request else None,
+        "MESSAGE": message,
+        "PID": str(pid) if pid is not None else None,
+        "FILE": f"{loggName[1]}:{loggName[3]}" if loggName else None,
+        "BODY": str(body) if body is not None else None,
+        "RESPONSE": str(response) if response is not None else None,
+    }
+    txt = " - ".join([f"{key}: {value}" for key, value in log_parts.items() if value is not None])
+    logs.logger.log(level=level, msg=txt, extra={"fields": log_parts, "request_log": request is not None})
+
+
+def main():
+    body = {"user_id": "u1", "answers": [{"question_id": i, "answer": "B"} for i in range(10)]}
+    with tempfile.TemporaryDirectory() as log_directory:
+        logs = LoggerConfig(
+            env=logging.INFO, logger_name="BENCH", log_directory=log_directory, log_file="bench.log",
+            queue_size=10 ** 6, request_log_burst=10 ** 9,
+        )
+        logs.root_logger.removeHandler(logs.queue_handler)
+
+        cases = {
+            "before, INFO": lambda: eager_define_logger(
+                logs, logging.INFO, request=REQUEST, loggName=inspect.stack()[0], message="Quiz submitted", body=body
+            ),
+            "before, no stack": lambda: eager_define_logger(
+                logs, logging.INFO, request=REQUEST, message="Quiz submitted", body=body
+            ),
+            "after, INFO": lambda: logs.define_logger(
+                logging.INFO, request=REQUEST, message="Quiz submitted", body=body, caller=True
+            ),
+            "before, DEBUG off": lambda: eager_define_logger(
+                logs, logging.DEBUG, request=REQUEST, loggName=inspect.stack()[0], message="Quiz submitted", body=body
+            ),
+            "after, DEBUG off": lambda: logs.define_logger(
+                logging.DEBUG, request=REQUEST, message="Quiz submitted", body=body, caller=True
+            ),
+        }
+        # inspect.stack() reads source for every frame, so those cases get fewer iterations
+        slow = {"before, INFO", "before, DEBUG off"}
+        for name, fn in cases.items():
+            number = ITERATIONS // 20 if name in slow else ITERATIONS
+            seconds = min(timeit.repeat(fn, number=number, repeat=3)) / number
+            print(f"{name:<18} {seconds * 1e6:8.2f} us/call")
+        logs.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark: request throughput of an app that logs every request twice, like
+the log_requests middleware, with the file and console sinks called directly
+on the request path versus behind the bounded log queue.
+
+Both variants use the same JSON formatter and sinks (a rotating file in a
+temporary directory), and request log sampling is disabled, so the only
+difference is who does the formatting and the write.
+
+Run from backend/:  python scripts/bench_log_throughput.py
+"""
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+from fastapi import FastAPI, Request
+
+from app.core.logger import LoggerConfig
+
+REQUESTS = 3000
+CONCURRENCY = 50
+
+
+def make_logger(log_directory: str, queued: bool) -> LoggerConfig:
+    config = LoggerConfig(
+        env=logging.INFO, logger_name=f"BENCH-{'queued' if queued else 'direct'}",
+        log_directory=log_directory, log_file="bench.log", request_log_burst=10 ** 9,
+    )
+    # LoggerConfig also takes over the root logger; nothing else logs here
+    config.root_logger.removeHandler(config.queue_handler)
+    if not queued:
+        # What every request did before: format and write on the calling thread
+        config.logger.removeHandler(config.queue_handler)
+        handlers = config.listener.handlers
+        config.stop()
+        for handler in handlers:
+            config.logger.addHandler(handler)
+    return config
+
+
+def make_app(logs: LoggerConfig) -> FastAPI:
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def log_requests(request: Request, call_next):
+        start_time = time.time()
+        logs.define_logger(level=logging.INFO, request=request, message="Request received")
+        response = await call_next(request)
+        process_time = (time.time() - start_time) * 1000
+        logs.define_logger(
+            level=logging.INFO,
+            request=request,
+            message=f"Request completed in {process_time:.2f}ms - Status: {response.status_code}",
+        )
+        return response
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+async def run(app: FastAPI) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        semaphore = asyncio.Semaphore(CONCURRENCY)
+
+        async def one():
+            async with semaphore:
+                (await client.get("/ping")).raise_for_status()
+
+        await asyncio.gather(*(one() for _ in range(100)))
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(REQUESTS)))
+        return time.perf_counter() - started
+
+
+def main():
+    for queued in (False, True):
+        with tempfile.TemporaryDirectory() as log_directory:
+            logs = make_logger(log_directory, queued)
+            elapsed = asyncio.run(run(make_app(logs)))
+            if queued:
+                logs.stop()
+        name = "queued sinks" if queued else "direct sinks"
+        print(f"{name:<14} {REQUESTS / elapsed:8.0f} requests/s  {elapsed / REQUESTS * 1e6:8.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
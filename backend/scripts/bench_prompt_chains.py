@@ -0,0 +1,50 @@
+"""
+Micro-benchmark: per-request cost of building the level test prompt and chain
+versus reusing the chain compiled once from the prompt registry.
+
+The LLM is replaced by LangChain's fake chat model, so only the prompt
+compilation, chain construction and output parsing are measured.
+
+Run from backend/:  python scripts/bench_prompt_chains.py
+"""
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.output_parsers import JsonOutputParser
+
+from app.core.prompts import QUIZ_GENERATION_PROMPT
+
+ITERATIONS = 2000
+ANSWER = json.dumps({"title": "Technical Assessment: Data Analyst", "questions": []})
+
+
+def main():
+    model = FakeListChatModel(responses=[ANSWER])
+    inputs = {"job_title": "Data Analyst"}
+
+    def per_request():
+        # What every request did before: compile the template and the chain, then invoke
+        chain = QUIZ_GENERATION_PROMPT.build() | model | JsonOutputParser()
+        return chain.invoke(inputs)
+
+    compiled_chain = QUIZ_GENERATION_PROMPT.build() | model | JsonOutputParser()
+
+    def compiled_once():
+        return compiled_chain.invoke(inputs)
+
+    def build_only():
+        return QUIZ_GENERATION_PROMPT.build() | model | JsonOutputParser()
+
+    for name, fn in (("build per request", per_request), ("compiled once", compiled_once), ("build only", build_only)):
+        fn()
+        seconds = min(timeit.repeat(fn, number=ITERATIONS, repeat=3)) / ITERATIONS
+        print(f"{name:<18} {seconds * 1e6:8.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
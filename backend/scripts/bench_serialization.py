@@ -0,0 +1,105 @@
+"""
+Benchmark: response serialization time and size for /jobs/all and
+/generate-quiz, before and after orjson and the pre-rendered ML payloads.
+
+"before" reproduces the previous path: /jobs/all validated every corpus record
+against the List[Job] response model and encoded it with the stdlib json
+module, and Response.success used Starlette's JSONResponse. The corpus is
+synthetic but shaped like the real one (full and reduced content vectors,
+RIASEC vector, a description of a few hundred characters).
+
+Run from backend/:  python scripts/bench_serialization.py
+"""
+import os
+import random
+import sys
+import timeit
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import brotli
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from starlette.requests import Request
+
+from app.core.response import APIJSONResponse, conditional_json
+from app.routes import kmeans
+from app.routes.kmeans import Job, RIASEC_ORDER
+
+JOBS = 1000
+REQUEST = Request({
+    "type": "http", "method": "GET", "scheme": "http", "path": "/api/v1/ml/jobs/all",
+    "query_string": b"", "headers": [], "client": ("203.0.113.7", 50000), "server": ("polaris", 80),
+})
+
+
+def make_corpus(rng: random.Random) -> list:
+    words = ["data", "analysis", "systems", "design", "clients", "reports", "teams", "models", "safety", "budget"]
+    return [
+        {
+            "title": f"Occupation {i}",
+            "description": " ".join(rng.choice(words) for _ in range(80)),
+            "required_skills": [rng.choice(words) for _ in range(8)],
+            "job_content_vector": [rng.random() for _ in range(384)],
+            "reduced_content_vector": [rng.random() for _ in range(120)],
+            "job_riasec_vector": {k: rng.random() for k in RIASEC_ORDER},
+            "cluster_label": rng.randrange(8),
+        }
+        for i in range(JOBS)
+    ]
+
+
+def make_quiz(rng: random.Random) -> dict:
+    return {
+        "quiz_id": "data_analyst",
+        "variant_id": "3f2a9c1e",
+        "title": "Technical Assessment: Data Analyst",
+        "questions": [
+            {
+                "question_id": f"q{i:02d}",
+                "question_text": f"Question {i}: which approach best handles a skewed distribution in a sales dataset?",
+                "options": [f"Option {c}: a plausible sounding answer" for c in "ABCD"],
+                "correct_answer": "B",
+                "difficulty": rng.choice(["Beginner", "Intermediate", "Advanced"]),
+            }
+            for i in range(10)
+        ],
+    }
+
+
+def measure(fn, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number
+
+
+def report(name: str, seconds: float, body: bytes):
+    print(f"{name:<34} {seconds * 1e3:9.3f} ms  {len(body):>9} bytes  {len(brotli.compress(body)):>8} bytes brotli")
+
+
+def main():
+    rng = random.Random(0)
+    jobs = make_corpus(rng)
+    jobs_adapter = TypeAdapter(List[Job])
+
+    def jobs_before():
+        # response_model validation and encoding, then the stdlib JSONResponse
+        content = jobs_adapter.dump_python(jobs_adapter.validate_python(jobs), mode="json")
+        return JSONResponse(content).body
+
+    prerender_seconds = measure(lambda: kmeans.prerender_payloads(jobs, []), 5)
+
+    def jobs_after():
+        return conditional_json(REQUEST, kmeans.all_jobs_json, kmeans.all_jobs_etag, kmeans.STATIC_DATA_CACHE_CONTROL).body
+
+    report("/jobs/all before", measure(jobs_before, 10), jobs_before())
+    report("/jobs/all after, per request", measure(jobs_after, 1000), jobs_after())
+    report("/jobs/all after, once at load", prerender_seconds, kmeans.all_jobs_json)
+
+    quiz = make_quiz(rng)
+    payload = {"status": "success", "message": "Quiz generated successfully.", "data": quiz}
+    report("/generate-quiz before", measure(lambda: JSONResponse(payload).body, 5000), JSONResponse(payload).body)
+    report("/generate-quiz after", measure(lambda: APIJSONResponse(payload).body, 5000), APIJSONResponse(payload).body)
+
+
+if __name__ == "__main__":
+    main()
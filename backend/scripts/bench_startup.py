@@ -0,0 +1,70 @@
+"""
+Benchmark: how long the app takes to import, and what the deferred imports
+would cost if they were still on the import path.
+
+Each measurement runs in a fresh interpreter so nothing is already cached in
+sys.modules. The import profile comes from `python -X importtime`: the
+heaviest third-party packages and app modules by cumulative time.
+
+Before startup work moved into the lifespan, importing app.main also imported
+gcsfs, joblib and langchain_google_genai and fetched the GCS artifacts. The
+fetch needs credentials and the network, so it is not measured here; the
+deferred imports are timed with the app and on their own instead.
+
+Run from backend/:  python scripts/bench_startup.py
+"""
+import os
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFERRED_IMPORTS = ["gcsfs", "joblib", "langchain_google_genai"]
+RUNS = 5
+TOP = 12
+
+
+def timed_import(module: str) -> float:
+    """Best wall time of `import module` in a fresh interpreter, minus the bare interpreter start."""
+    def run(code):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, check=True, capture_output=True)
+        return time.perf_counter() - started
+
+    baseline = min(run("pass") for _ in range(RUNS))
+    return min(run(f"import {module}") for _ in range(RUNS)) - baseline
+
+
+def import_profile(module: str):
+    """(cumulative seconds, package) for the top-level imports of `module`, heaviest first."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, check=True, capture_output=True, text=True,
+    )
+    totals = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line.removeprefix("import time:").split("|"))
+        # Nesting is shown by indentation: keep top-level packages and the app's own modules
+        if (name == name.lstrip() and name != "app") or name.lstrip().startswith("app."):
+            name = name.strip()
+            package = name if name.startswith("app.") else name.split(".")[0]
+            totals[package] = max(totals.get(package, 0), int(cumulative) / 1e6)
+    return sorted(((seconds, package) for package, seconds in totals.items()), reverse=True)
+
+
+def main():
+    print(f"import app.main                          {timed_import('app.main'):6.2f} s")
+    # Shared dependencies are only imported once, so time them together with the app
+    print(f"import app.main + deferred imports       {timed_import(', '.join(['app.main'] + DEFERRED_IMPORTS)):6.2f} s")
+    for module in DEFERRED_IMPORTS:
+        print(f"  {module:<38} {timed_import(module):6.2f} s alone")
+
+    print("\nHeaviest imports of app.main (cumulative, -X importtime):")
+    for seconds, package in import_profile("app.main")[:TOP]:
+        print(f"  {package:<38} {seconds:6.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,8 @@
 set -e # Exit immediately if a command exits with a non-zero status.
 
 echo "Starting Step 1: Data Preprocessing..."
-python 1_preprocess_data.py
+# Set PREPROCESS_INCREMENTAL=1 to apply only the scraper changes since the last run
+python 1_preprocess_data.py ${PREPROCESS_INCREMENTAL:+--incremental}
 
 echo "Starting Step 2: Model Training..."
 python 2_train_model.py
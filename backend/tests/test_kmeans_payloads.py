@@ -0,0 +1,57 @@
+from typing import List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter, ValidationError
+
+from app.routes import kmeans
+from app.routes.kmeans import ClusterProfile, Job, RecommendationResponse, RIASEC_ORDER
+
+JOBS = [
+    {"title": "Data Analyst", "description": "Analyzes data.", "cluster_label": 0, "reduced_content_vector": [0.1]},
+    {"title": "Carpenter", "description": "Builds things.", "cluster_label": 1, "reduced_content_vector": [0.2]},
+]
+PROFILES = [
+    {"cluster_label": 0, "riasec_profile": {k: 0.2 for k in RIASEC_ORDER}},
+    {"cluster_label": 1, "riasec_profile": {k: 0.8 for k in RIASEC_ORDER}},
+]
+
+
+@pytest.fixture(autouse=True)
+def restore_payloads(monkeypatch):
+    for name in ("all_jobs_json", "cluster_profiles_json", "recommendations_json", "all_jobs_etag",
+                 "cluster_profiles_etag"):
+        monkeypatch.setattr(kmeans, name, getattr(kmeans, name))
+
+
+def test_prerendered_payloads_match_their_response_models():
+    kmeans.prerender_payloads(JOBS, PROFILES)
+
+    jobs = TypeAdapter(List[Job]).validate_json(kmeans.all_jobs_json)
+    assert [job.title for job in jobs] == ["Data Analyst", "Carpenter"]
+    profiles = TypeAdapter(List[ClusterProfile]).validate_json(kmeans.cluster_profiles_json)
+    assert [profile.cluster_label for profile in profiles] == [0, 1]
+    # Artifact-only fields are projected away
+    assert b"reduced_content_vector" not in kmeans.all_jobs_json
+
+    for cluster_id in (0, 1, -1):
+        body = RecommendationResponse.model_validate_json(kmeans.recommendations_json[cluster_id])
+        assert body.best_cluster_id == cluster_id
+        assert all(job.cluster_label == cluster_id for job in body.recommendations)
+
+
+def test_artifact_that_does_not_match_the_schema_fails_the_load():
+    with pytest.raises(ValidationError):
+        kmeans.prerender_payloads([{"title": "Data Analyst", "cluster_label": 0}], PROFILES)
+
+
+def test_openapi_documents_the_prerendered_schemas():
+    app = FastAPI()
+    app.include_router(kmeans.router)
+    paths = TestClient(app).get("/openapi.json").json()["paths"]
+
+    recommend = paths["/jobs/recommend"]["post"]["responses"]["200"]["content"]["application/json"]["schema"]
+    assert recommend == {"$ref": "#/components/schemas/RecommendationResponse"}
+    all_jobs = paths["/jobs/all"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+    assert all_jobs["items"] == {"$ref": "#/components/schemas/Job"}
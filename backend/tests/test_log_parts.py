@@ -0,0 +1,26 @@
+import logging
+
+from starlette.requests import Request
+
+from app.core.logger import LogParts
+
+
+def make_request():
+    return Request({
+        "type": "http", "method": "POST", "path": "/api/v1/quiz", "query_string": b"", "headers": [],
+        "client": ("10.0.0.1", 1234), "server": ("testserver", 80), "scheme": "http",
+    })
+
+
+def test_mutable_arguments_are_captured_at_the_call():
+    body = {"answers": ["A"]}
+    parts = LogParts(make_request(), "Quiz submitted", None, None, body, None, False)
+
+    # The caller keeps using the body after logging; the record must not change
+    body["answers"].append("B")
+    fields = parts.fields(logging.makeLogRecord({}))
+
+    assert fields["BODY"] == "{'answers': ['A']}"
+    assert fields["IP"] == "10.0.0.1"
+    assert fields["URL"] == "POST http://testserver/api/v1/quiz"
+    assert fields["MESSAGE"] == "Quiz submitted"
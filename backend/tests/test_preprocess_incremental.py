@@ -0,0 +1,92 @@
+import importlib.util
+import json
+import os
+from typing import List
+
+import gcsfs
+import numpy as np
+import pytest
+from pydantic import TypeAdapter
+
+from app.routes import kmeans
+from app.routes.kmeans import Job, RIASEC_ORDER
+
+SCRIPT = os.path.join(os.path.dirname(__file__), "..", "scripts", "1_preprocess_data.py")
+
+
+@pytest.fixture(scope="module")
+def preprocess():
+    spec = importlib.util.spec_from_file_location("preprocess_data", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def processed_job(title, description):
+    return {
+        "title": title,
+        "description": description,
+        "required_skills": {"technical": ["SQL"], "soft": ["communication"]},
+        "job_ratings": {"career_growth": 3},
+        "job_content_vector": [0.1, 0.2, 0.3],
+        "reduced_content_vector": [0.1, 0.2],
+        "job_riasec_vector": {k: 0.1 for k in RIASEC_ORDER},
+    }
+
+
+def test_merge_updates_known_titles_and_skips_unknown_ones(preprocess):
+    jobs = [processed_job("Data Analyst", "Analyzes data."), processed_job("Nurse", "Cares for patients.")]
+    changes = [
+        {"seq": 1, "title": "  data   ANALYST ", "job_ratings": {"career_growth": 5}, "changed_at": 1.0},
+        {"seq": 2, "title": "Prompt Engineer", "job_ratings": {"career_growth": 4}, "changed_at": 2.0},
+    ]
+
+    stale, skipped = preprocess.merge_changes(jobs, changes)
+
+    assert [job["title"] for job in jobs] == ["Data Analyst", "Nurse"]
+    assert jobs[0]["job_ratings"] == {"career_growth": 5}
+    # Ratings do not change the embedded text, so nothing is re-embedded
+    assert stale == []
+    assert skipped == ["Prompt Engineer"]
+
+
+def test_merge_reembeds_only_jobs_whose_text_changed(preprocess):
+    jobs = [processed_job("Data Analyst", "Analyzes data."), processed_job("Nurse", "Cares for patients.")]
+    changes = [
+        {"seq": 1, "title": "Nurse", "description": "Cares for patients in hospitals.", "changed_at": 1.0},
+        {"seq": 2, "title": "Data Analyst", "job_ratings": {"career_growth": 2}, "changed_at": 2.0},
+    ]
+
+    stale, _ = preprocess.merge_changes(jobs, changes)
+
+    assert [job["title"] for job in stale] == ["Nurse"]
+
+
+class FakeKMeans:
+    def predict(self, vectors):
+        return np.zeros(len(vectors), dtype=int)
+
+
+def test_merged_output_loads_in_the_backend(preprocess, monkeypatch):
+    jobs = [processed_job("Data Analyst", "Analyzes data.")]
+    preprocess.merge_changes(jobs, [
+        {"seq": 1, "title": "Data Analyst", "job_ratings": {"career_growth": 5}, "changed_at": 1.0},
+        {"seq": 2, "title": "Prompt Engineer", "job_ratings": {"career_growth": 4}, "changed_at": 2.0},
+    ])
+    artifacts = {
+        # Round trip through JSON, as the output is saved and fetched from GCS
+        "jobs": json.loads(json.dumps(jobs)),
+        "cluster_profiles": [{"cluster_label": 0, "riasec_profile": {k: 0.5 for k in RIASEC_ORDER}}],
+        "kmeans_model": FakeKMeans(),
+    }
+    for name in ("all_jobs_data", "cluster_profiles", "cluster_profile_matrix", "cluster_profile_labels",
+                 "all_jobs_json", "cluster_profiles_json", "recommendations_json", "all_jobs_etag",
+                 "cluster_profiles_etag"):
+        monkeypatch.setattr(kmeans, name, getattr(kmeans, name))
+    monkeypatch.setattr(gcsfs, "GCSFileSystem", lambda: None)
+    monkeypatch.setattr(kmeans, "fetch_artifact", lambda fs, name, path, mode, loader: artifacts[name])
+
+    kmeans.load_artifacts()
+
+    served = TypeAdapter(List[Job]).validate_json(kmeans.all_jobs_json)
+    assert [(job.title, job.cluster_label) for job in served] == [("Data Analyst", 0)]
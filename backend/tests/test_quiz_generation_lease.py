@@ -0,0 +1,298 @@
+import threading
+import time
+
+import pytest
+from google.api_core.exceptions import AlreadyExists, FailedPrecondition, NotFound
+
+from app.repos import level_test_repo
+from app.repos.level_test_repo import QuizBankRepository
+from app.routes import level_test
+
+
+class FakeQuiz:
+    def __init__(self, variant_id):
+        self.variant_id = variant_id
+
+
+class FakeQuizBank:
+    """
+    In-memory stand-in for QuizBankRepository's variant listing and generation
+    leases. Several FakeInstance views share one bank, like instances share Firestore.
+    """
+
+    def __init__(self):
+        self.variants = {}
+        self.leases = {}
+        self.lock = threading.Lock()
+
+    def view(self, instance_id):
+        return FakeInstance(self, instance_id)
+
+
+class FakeInstance:
+    def __init__(self, bank, instance_id):
+        self.bank = bank
+        self.instance_id = instance_id
+
+    def list_variant_ids(self, role_id, prompt_version):
+        with self.bank.lock:
+            return list(self.bank.variants.get(role_id, {}))
+
+    def pick_variant(self, role_id, variant_ids):
+        with self.bank.lock:
+            variants = self.bank.variants.get(role_id, {})
+            return next((variants[vid] for vid in variant_ids if vid in variants), None)
+
+    def acquire_generation_lease(self, lease_key, ttl_seconds):
+        with self.bank.lock:
+            lease = self.bank.leases.get(lease_key)
+            if lease is not None and lease[1] > time.monotonic():
+                return False
+            self.bank.leases[lease_key] = (self.instance_id, time.monotonic() + ttl_seconds)
+            return True
+
+    def release_generation_lease(self, lease_key):
+        with self.bank.lock:
+            lease = self.bank.leases.get(lease_key)
+            if lease is not None and lease[0] == self.instance_id:
+                del self.bank.leases[lease_key]
+
+    def add_variant(self, role_id, variant_id):
+        with self.bank.lock:
+            quiz = FakeQuiz(variant_id)
+            self.bank.variants.setdefault(role_id, {})[variant_id] = quiz
+            return quiz
+
+
+@pytest.fixture
+def bank(monkeypatch):
+    bank = FakeQuizBank()
+    monkeypatch.setattr(level_test, "quiz_bank_repo", bank.view("this-instance"))
+    monkeypatch.setattr(level_test.settings, "QUIZ_GENERATION_POLL_SECONDS", 0.01)
+    monkeypatch.setattr(level_test, "QUIZ_GENERATION_LEASE_SECONDS", 5)
+    return bank
+
+
+def test_lease_holder_generates_once_and_releases(bank, monkeypatch):
+    generated = []
+
+    def generate(role_id, job_title):
+        generated.append(role_id)
+        return level_test.quiz_bank_repo.add_variant(role_id, "v1")
+
+    monkeypatch.setattr(level_test, "generate_quiz_variant", generate)
+
+    quiz = level_test._generate_first_variant("data_analyst", "Data Analyst")
+
+    assert quiz.variant_id == "v1"
+    assert generated == ["data_analyst"]
+    assert bank.leases == {}
+    # The next request is served from the bank
+    assert level_test._generate_first_variant("data_analyst", "Data Analyst").variant_id == "v1"
+    assert generated == ["data_analyst"]
+
+
+def test_waiter_polls_until_the_other_instance_stores_the_quiz(bank, monkeypatch):
+    other = bank.view("other-instance")
+    assert other.acquire_generation_lease("data_analyst", 5)
+    monkeypatch.setattr(level_test, "generate_quiz_variant", lambda *a: pytest.fail("waiter must not generate"))
+
+    def finish_elsewhere():
+        time.sleep(0.1)
+        other.add_variant("data_analyst", "from-other")
+        other.release_generation_lease("data_analyst")
+
+    threading.Thread(target=finish_elsewhere).start()
+    quiz = level_test._generate_first_variant("data_analyst", "Data Analyst")
+
+    assert quiz.variant_id == "from-other"
+
+
+def test_waiter_takes_over_an_expired_lease(bank, monkeypatch):
+    # A crashed instance left a lease that expires shortly
+    assert bank.view("crashed-instance").acquire_generation_lease("data_analyst", 0.05)
+    monkeypatch.setattr(
+        level_test, "generate_quiz_variant",
+        lambda role_id, job_title: level_test.quiz_bank_repo.add_variant(role_id, "takeover"),
+    )
+
+    quiz = level_test._generate_first_variant("data_analyst", "Data Analyst")
+
+    assert quiz.variant_id == "takeover"
+
+
+def test_waiter_times_out_while_the_lease_is_held(bank, monkeypatch):
+    holder = bank.view("slow-instance")
+    monkeypatch.setattr(level_test, "QUIZ_GENERATION_LEASE_SECONDS", 0.05)
+    monkeypatch.setattr(level_test, "generate_quiz_variant", lambda *a: pytest.fail("waiter must not generate"))
+
+    # Keep renewing the lease, as a live holder's lease never lapses
+    stop = threading.Event()
+
+    def hold():
+        while not stop.is_set():
+            with bank.lock:
+                bank.leases["data_analyst"] = (holder.instance_id, time.monotonic() + 10)
+            time.sleep(0.01)
+
+    threading.Thread(target=hold, daemon=True).start()
+    try:
+        time.sleep(0.02)
+        started = time.monotonic()
+        with pytest.raises(TimeoutError):
+            level_test._generate_first_variant("data_analyst", "Data Analyst")
+        # Gives up after twice the lease duration
+        assert time.monotonic() - started < 1
+    finally:
+        stop.set()
+
+
+def test_concurrent_requests_in_one_process_generate_once(bank, monkeypatch):
+    generated = []
+    release = threading.Event()
+
+    def generate(role_id, job_title):
+        generated.append(role_id)
+        release.wait(5)
+        return level_test.quiz_bank_repo.add_variant(role_id, "v1")
+
+    monkeypatch.setattr(level_test, "generate_quiz_variant", generate)
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(
+            level_test.get_or_generate_first_variant("data_analyst", "Data Analyst")
+        ))
+        for _ in range(6)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert generated == ["data_analyst"]
+    assert [quiz.variant_id for quiz in results] == ["v1"] * 6
+
+
+# --- The real lease protocol in QuizBankRepository, against an in-memory Firestore ---
+
+class FakeWriteOption:
+    def __init__(self, last_update_time):
+        self.last_update_time = last_update_time
+
+
+class FakeSnapshot:
+    def __init__(self, data, update_time):
+        self.exists = data is not None
+        self._data = data
+        self.update_time = update_time
+
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+
+class FakeDocument:
+    """Supports create, get and a delete guarded by a last-update-time precondition."""
+
+    def __init__(self, db, key):
+        self.db = db
+        self.key = key
+
+    def create(self, data):
+        with self.db.lock:
+            if self.key in self.db.docs:
+                raise AlreadyExists(f"{self.key} already exists")
+            self.db.version += 1
+            self.db.docs[self.key] = (dict(data), self.db.version)
+
+    def get(self):
+        with self.db.lock:
+            data, update_time = self.db.docs.get(self.key, (None, None))
+            snapshot = FakeSnapshot(data, update_time)
+        if self.db.before_get_returns:
+            self.db.before_get_returns()
+        return snapshot
+
+    def delete(self, option=None):
+        with self.db.lock:
+            if self.key not in self.db.docs:
+                raise NotFound(f"{self.key} not found")
+            if option is not None and self.db.docs[self.key][1] != option.last_update_time:
+                raise FailedPrecondition(f"{self.key} was updated since it was read")
+            del self.db.docs[self.key]
+
+
+class FakeFirestore:
+    def __init__(self):
+        self.docs = {}
+        self.version = 0
+        self.lock = threading.Lock()
+        self.before_get_returns = None
+
+    def collection(self, name):
+        assert name == QuizBankRepository.LEASE_COLLECTION
+        return self
+
+    def document(self, key):
+        return FakeDocument(self, key)
+
+    def write_option(self, last_update_time):
+        return FakeWriteOption(last_update_time)
+
+    def owner(self, key):
+        return self.docs[key][0]["owner"] if key in self.docs else None
+
+
+@pytest.fixture
+def firestore_db(monkeypatch):
+    db = FakeFirestore()
+    monkeypatch.setattr(level_test_repo, "get_firestore_client", lambda: db)
+    return db
+
+
+def test_expired_lease_is_taken_over_exactly_once(firestore_db):
+    crashed = QuizBankRepository()
+    assert crashed.acquire_generation_lease("data_analyst", ttl_seconds=-1)
+
+    # Every contender reads the expired lease before any of them deletes it
+    contenders = [QuizBankRepository() for _ in range(6)]
+    all_read = threading.Barrier(len(contenders))
+    firestore_db.before_get_returns = lambda: all_read.wait(5)
+
+    results = {}
+    threads = [
+        threading.Thread(target=lambda r=repo: results.setdefault(r.instance_id, r.acquire_generation_lease("data_analyst", 60)))
+        for repo in contenders
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    winners = [instance_id for instance_id, acquired in results.items() if acquired]
+    assert len(results) == len(contenders)
+    assert len(winners) == 1
+    assert firestore_db.owner("data_analyst") == winners[0]
+
+
+def test_live_lease_is_not_stolen(firestore_db):
+    holder, other = QuizBankRepository(), QuizBankRepository()
+    assert holder.acquire_generation_lease("data_analyst", ttl_seconds=60)
+
+    assert not other.acquire_generation_lease("data_analyst", ttl_seconds=60)
+    assert firestore_db.owner("data_analyst") == holder.instance_id
+
+
+def test_release_only_deletes_the_callers_own_lease(firestore_db):
+    stale, current = QuizBankRepository(), QuizBankRepository()
+    assert stale.acquire_generation_lease("data_analyst", ttl_seconds=-1)
+    # The stale holder's lease expired and was taken over
+    assert current.acquire_generation_lease("data_analyst", ttl_seconds=60)
+
+    stale.release_generation_lease("data_analyst")
+    assert firestore_db.owner("data_analyst") == current.instance_id
+
+    current.release_generation_lease("data_analyst")
+    assert "data_analyst" not in firestore_db.docs
@@ -0,0 +1,78 @@
+import pytest
+
+from app.repos import recommendation_stats_repo as stats_module
+from app.repos.recommendation_stats_repo import RecommendationStatsRepository
+
+
+class FakeStatsDocument:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.writes = []
+        self.counts = {}
+
+    def collection(self, name):
+        return self
+
+    def document(self, name):
+        return self
+
+    def set(self, data, merge=False):
+        if self.fail:
+            raise ConnectionError("firestore unavailable")
+        assert merge
+        self.writes.append(data)
+        for label, increment in data.items():
+            self.counts[label] = self.counts.get(label, 0) + increment.value
+
+    def get(self):
+        return self
+
+    @property
+    def exists(self):
+        return bool(self.counts)
+
+    def to_dict(self):
+        return dict(self.counts)
+
+
+@pytest.fixture
+def document(monkeypatch):
+    doc = FakeStatsDocument()
+    monkeypatch.setattr(stats_module, "get_firestore_client", lambda: doc)
+    return doc
+
+
+def test_recommendations_are_flushed_as_one_write(document):
+    repo = RecommendationStatsRepository()
+    for cluster_id in (0, 0, 1, 0, -1):
+        repo.record_recommendation(cluster_id)
+    assert document.writes == []
+
+    assert repo.flush() == 5
+    assert len(document.writes) == 1
+    assert document.counts == {"0": 3, "1": 1, "-1": 1}
+    # Nothing left to write
+    assert repo.flush() == 0
+    assert len(document.writes) == 1
+
+
+def test_failed_flush_keeps_the_counts_for_the_next_one(document):
+    repo = RecommendationStatsRepository()
+    repo.record_recommendation(2)
+    document.fail = True
+    assert repo.flush() == 0
+
+    repo.record_recommendation(2)
+    document.fail = False
+    assert repo.flush() == 2
+    assert document.counts == {"2": 2}
+
+
+def test_cluster_counts_include_unflushed_recommendations(document):
+    repo = RecommendationStatsRepository()
+    repo.record_recommendation(0)
+    repo.flush()
+    repo.record_recommendation(0)
+    repo.record_recommendation(3)
+
+    assert repo.cluster_counts() == {0: 2, 3: 1}
@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def work():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "quiz"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("role", work))) for _ in range(8)]
+    threads[0].start()
+    assert started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    # Let the followers reach the wait before the leader finishes
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == ["quiz"] * 8
+
+
+def test_exception_propagates_to_every_waiter():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def work():
+        started.set()
+        release.wait(5)
+        raise ValueError("LLM failed")
+
+    errors = []
+
+    def call():
+        try:
+            flight.do("role", work)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(4)]
+    threads[0].start()
+    assert started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(errors) == 4
+    assert all(str(e) == "LLM failed" for e in errors)
+
+
+def test_key_is_released_after_success_and_failure():
+    flight = SingleFlight()
+    assert flight.do("role", lambda: 1) == 1
+    assert flight.do("role", lambda: 2) == 2
+
+    with pytest.raises(RuntimeError):
+        flight.do("role", lambda: (_ for _ in ()).throw(RuntimeError("boom")))
+    # A failed call does not poison the key for later callers
+    assert flight.do("role", lambda: 3) == 3
+    assert flight._calls == {}
+
+
+def test_different_keys_run_independently():
+    flight = SingleFlight()
+    inside = threading.Barrier(2, timeout=5)
+
+    def work(value):
+        # Both keys must be in flight at the same time to pass the barrier
+        inside.wait()
+        return value
+
+    results = {}
+    threads = [
+        threading.Thread(target=lambda key=key: results.__setitem__(key, flight.do(key, lambda: work(key))))
+        for key in ("a", "b")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert results == {"a": "a", "b": "b"}
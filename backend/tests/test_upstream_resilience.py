@@ -0,0 +1,153 @@
+import threading
+from pathlib import Path
+
+import pytest
+
+from app.core import resilience, resilience_core
+from app.core.resilience import CircuitBreaker, CircuitOpenError, Upstream
+
+SCRAPER_COPY = Path(__file__).resolve().parents[2] / "scraper" / "core" / "resilience_core.py"
+
+
+class FakeClock:
+    """Stands in for the time module in app.core.resilience_core: sleeping just moves the clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(resilience_core, "time", fake)
+    return fake
+
+
+def flaky(failures, error=ConnectionError, result="ok"):
+    """A callable that raises `error` for its first `failures` calls, then returns `result`."""
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise error("upstream down")
+        return result
+
+    fn.calls = calls
+    return fn
+
+
+def test_transient_errors_are_retried_with_capped_backoff(clock):
+    upstream = Upstream("test-retry", attempts=3, base_delay=1, max_delay=1.5, failure_threshold=10)
+    fn = flaky(2)
+
+    assert upstream.call(fn) == "ok"
+    assert len(fn.calls) == 3
+    assert len(clock.sleeps) == 2
+    assert 0 <= clock.sleeps[0] <= 1 and 0 <= clock.sleeps[1] <= 1.5
+
+
+def test_non_transient_errors_are_not_retried(clock):
+    upstream = Upstream("test-permanent", attempts=3, failure_threshold=1)
+    fn = flaky(1, error=ValueError)
+
+    with pytest.raises(ValueError):
+        upstream.call(fn)
+    assert len(fn.calls) == 1
+    assert upstream.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_opens_then_closes_after_a_successful_trial(clock):
+    upstream = Upstream("test-breaker", attempts=1, failure_threshold=2, reset_seconds=30)
+    failing = flaky(100)
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            upstream.call(failing)
+    assert upstream.breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        upstream.call(failing)
+    assert len(failing.calls) == 2
+
+    clock.now += 30
+    assert upstream.call(lambda: "ok") == "ok"
+    assert upstream.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_interrupted_trial_releases_the_half_open_breaker(clock):
+    upstream = Upstream("test-interrupt", attempts=1, failure_threshold=1, reset_seconds=30)
+    with pytest.raises(ConnectionError):
+        upstream.call(flaky(1))
+    clock.now += 30
+
+    def interrupted():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        upstream.call(interrupted)
+
+    # No verdict on the upstream, and the next caller gets to run the trial
+    assert upstream.breaker.state == CircuitBreaker.HALF_OPEN
+    assert upstream.call(lambda: "ok") == "ok"
+
+
+def test_non_transient_error_gives_the_breaker_no_verdict(clock):
+    upstream = Upstream("test-verdict", attempts=1, failure_threshold=1, reset_seconds=30)
+    with pytest.raises(ConnectionError):
+        upstream.call(flaky(1))
+    clock.now += 30
+
+    # An unparsable answer during the half-open trial neither closes nor reopens the circuit
+    with pytest.raises(ValueError):
+        upstream.call(flaky(1, error=ValueError))
+    assert upstream.breaker.state == CircuitBreaker.HALF_OPEN
+    assert upstream.breaker.consecutive_failures == 1
+
+    # The next caller runs the trial
+    assert upstream.call(lambda: "ok") == "ok"
+    assert upstream.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_retries_are_logged_through_the_structured_logger(clock, monkeypatch):
+    logged = []
+    monkeypatch.setattr(resilience.logs, "define_logger", lambda **kwargs: logged.append(kwargs))
+
+    Upstream("test-log", attempts=2, failure_threshold=10).call(flaky(1))
+
+    assert len(logged) == 1
+    assert logged[0]["message"].startswith("test-log call failed (upstream down); retry 1/1")
+
+
+def test_slow_call_is_hedged_and_the_first_success_wins():
+    upstream = Upstream("test-hedge", hedge_after=0.05)
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) == 1:
+            release.wait(5)
+            return "slow"
+        return "fast"
+
+    try:
+        assert upstream.call(fn, hedge=True) == "fast"
+    finally:
+        release.set()
+    assert len(calls) == 2
+
+
+def test_shared_core_matches_the_scraper_copy():
+    if not SCRAPER_COPY.exists():
+        pytest.skip("the scraper is not checked out next to the backend")
+    assert Path(resilience_core.__file__).read_bytes() == SCRAPER_COPY.read_bytes(), (
+        "app/core/resilience_core.py and scraper/core/resilience_core.py differ; copy the edited one over the other"
+    )
@@ -5,12 +5,15 @@ import { toast } from 'sonner';
 import { apiConfig } from '@/lib/api-config';
 
 interface QuizQuestion {
+  question_id: string;
   question_text: string;
   options: string[];
   difficulty: 'Beginner' | 'Intermediate' | 'Advanced';
 }
 
 interface QuizData {
+  quiz_id: string;
+  variant_id: string;
   title: string;
   questions: QuizQuestion[];
 }
@@ -23,7 +26,7 @@ interface ApiResponse<T> {
 }
 
 interface UserAnswer {
-  question_text: string;
+  question_id: string;
   selected_answer: string;
 }
 
@@ -76,15 +79,15 @@ export const useLevelAssessment = (mapId: string | undefined) => {
     }
   }, [jobTitle, user, authLoading, navigate]);
 
-  const handleAnswerChange = useCallback((questionText: string, value: string) => {
-    setAnswers(prev => ({ ...prev, [questionText]: value }));
+  const handleAnswerChange = useCallback((questionId: string, value: string) => {
+    setAnswers(prev => ({ ...prev, [questionId]: value }));
   }, []);
 
   const handleSubmit = useCallback(async () => {
     if (!user || !quizData) return;
 
-    const userAnswers: UserAnswer[] = Object.entries(answers).map(([question_text, selected_answer]) => ({
-      question_text,
+    const userAnswers: UserAnswer[] = Object.entries(answers).map(([question_id, selected_answer]) => ({
+      question_id,
       selected_answer,
     }));
 
@@ -99,7 +102,7 @@ export const useLevelAssessment = (mapId: string | undefined) => {
       const response = await fetch(apiConfig.endpoints.levelTest.submitQuiz, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json', 'Authorization': `Bearer ${idToken}` },
-        body: JSON.stringify({ user_id: user.uid, job_title: jobTitle, answers: userAnswers }),
+        body: JSON.stringify({ user_id: user.uid, job_title: jobTitle, variant_id: quizData.variant_id, answers: userAnswers }),
       });
 
       const result: ApiResponse<any> = await response.json();
@@ -63,8 +63,8 @@ export const LevelAssessment = () => {
             <div key={index}>
               <p className="font-semibold mb-4">{index + 1}. {q.question_text}</p>
               <RadioGroup
-                value={answers[q.question_text] || ''}
-                onValueChange={(value) => handleAnswerChange(q.question_text, value)}
+                value={answers[q.question_id] || ''}
+                onValueChange={(value) => handleAnswerChange(q.question_id, value)}
               >
                 {q.options.map((option, i) => (
                   <div key={i} className="flex items-center space-x-2">
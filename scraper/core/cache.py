@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from core.db import connect
+
+# --- Configuration ---
+TAVILY_CACHE_TTL_SECONDS = float(os.getenv("TAVILY_CACHE_TTL_SECONDS", str(7 * 24 * 60 * 60)))
+QUERY_CACHE_TTL_SECONDS = float(os.getenv("QUERY_CACHE_TTL_SECONDS", str(30 * 24 * 60 * 60)))
+
+_conn = None
+_conn_lock = threading.Lock()
+
+
+def _shared_connection():
+    """Opens the cache table on first use, so importing this module touches no files."""
+    global _conn
+    with _conn_lock:
+        if _conn is None:
+            _conn = connect()
+            with _conn:
+                _conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS cache (
+                        namespace TEXT NOT NULL,
+                        key TEXT NOT NULL,
+                        value TEXT NOT NULL,
+                        expires_at REAL NOT NULL,
+                        PRIMARY KEY (namespace, key)
+                    )
+                    """
+                )
+        return _conn
+
+
+def normalize_text(text: str) -> str:
+    """Lowercases and collapses whitespace, so trivially different inputs share an entry."""
+    return re.sub(r"\s+", " ", (text or "").strip().lower())
+
+
+def make_key(params: Dict[str, Any]) -> str:
+    """
+    Stable key for a request: unset options are dropped, text is normalized and
+    lists are sorted, so equivalent requests hash the same.
+    """
+    normalized = {}
+    for name, value in params.items():
+        if value is None:
+            continue
+        if isinstance(value, str):
+            value = normalize_text(value)
+        elif isinstance(value, (list, tuple)):
+            value = sorted(normalize_text(v) if isinstance(v, str) else v for v in value)
+        normalized[name] = value
+    encoded = json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class SQLiteTTLCache:
+    """
+    A persistent cache of JSON values whose entries expire after a fixed TTL,
+    stored in the scraper's SQLite file so it survives restarts and is shared by
+    every route and script. Each namespace keeps its own hit/miss counts; every
+    hit is one upstream call saved.
+    """
+
+    def __init__(self, namespace: str, ttl_seconds: float):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        conn = _shared_connection()
+        with _conn_lock:
+            row = conn.execute(
+                "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+        hit = row is not None and row["expires_at"] > time.time()
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return json.loads(row["value"]) if hit else None
+
+    def set(self, key: str, value: Any) -> None:
+        conn = _shared_connection()
+        with _conn_lock, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (self.namespace, key, json.dumps(value), time.time() + self.ttl_seconds),
+            )
+
+    def purge_expired(self) -> int:
+        """Deletes this namespace's expired entries. Returns how many were removed."""
+        conn = _shared_connection()
+        with _conn_lock, conn:
+            cursor = conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND expires_at <= ?", (self.namespace, time.time())
+            )
+        return cursor.rowcount
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "cache": self.namespace,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "upstream_calls_saved": self.hits,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+# --- Shared caches ---
+# Tavily responses, keyed by the normalized search parameters
+tavily_cache = SQLiteTTLCache("tavily_search", TAVILY_CACHE_TTL_SECONDS)
+# Gemini-generated search queries, keyed by the normalized job title
+search_query_cache = SQLiteTTLCache("search_query", QUERY_CACHE_TTL_SECONDS)
@@ -0,0 +1,79 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from fastapi import HTTPException
+
+# --- Configuration ---
+BLOCKING_IO_WORKERS = int(os.getenv("BLOCKING_IO_WORKERS", "8"))
+
+# Shared, bounded pool for the synchronous Gemini/Tavily calls made by the routes,
+# so they never run on (and freeze) the event loop.
+blocking_executor = ThreadPoolExecutor(max_workers=BLOCKING_IO_WORKERS, thread_name_prefix="scraper-io")
+
+
+class RouteLimiter:
+    """
+    Caps how many requests of one route run at once and how long each may take,
+    including time spent waiting for a free slot. Excess requests queue on the
+    semaphore rather than piling more work onto Tavily or Gemini.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, timeout_seconds: float):
+        self.name = name
+        self.timeout_seconds = timeout_seconds
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def _run(self, coro):
+        async with self._semaphore:
+            return await coro
+
+    async def _with_timeout(self, awaitable):
+        try:
+            return await asyncio.wait_for(awaitable, timeout=self.timeout_seconds)
+        except asyncio.TimeoutError:
+            raise HTTPException(
+                status_code=504,
+                detail=f"{self.name} did not complete within {self.timeout_seconds:g} seconds.",
+            )
+
+    async def run(self, coro):
+        """Awaits a coroutine under the limit, raising 504 if it exceeds the timeout."""
+        return await self._with_timeout(self._run(coro))
+
+    async def run_blocking(self, fn, *args, **kwargs):
+        """
+        Runs a synchronous function on the shared executor under the limit. The
+        work is only submitted once a slot is free. On timeout the request fails
+        fast, but the slot stays taken until the worker thread finishes, so
+        abandoned calls still count against the limit.
+        """
+        loop = asyncio.get_running_loop()
+
+        def release(_future):
+            try:
+                loop.call_soon_threadsafe(self._semaphore.release)
+            except RuntimeError:
+                # The event loop is already closed (shutdown); nobody is left waiting
+                pass
+
+        async def start():
+            await self._semaphore.acquire()
+            future = blocking_executor.submit(partial(fn, *args, **kwargs))
+            future.add_done_callback(release)
+            return await asyncio.wrap_future(future)
+
+        return await self._with_timeout(start())
+
+
+search_limiter = RouteLimiter(
+    "Search",
+    max_concurrent=int(os.getenv("SEARCH_MAX_CONCURRENCY", "16")),
+    timeout_seconds=float(os.getenv("SEARCH_TIMEOUT_SECONDS", "30")),
+)
+analysis_limiter = RouteLimiter(
+    "Job role analysis",
+    max_concurrent=int(os.getenv("ANALYSIS_MAX_CONCURRENCY", "4")),
+    timeout_seconds=float(os.getenv("ANALYSIS_TIMEOUT_SECONDS", "180")),
+)
@@ -0,0 +1,21 @@
+import os
+import sqlite3
+
+# --- Configuration ---
+# One local SQLite file holds the scraper's persistent state (job queue, caches, results).
+SCRAPER_DB_PATH = os.getenv("SCRAPER_DB_PATH", os.path.join("data", "scraper.db"))
+
+
+def connect(path: str = SCRAPER_DB_PATH) -> sqlite3.Connection:
+    """
+    Opens a SQLite connection shared across threads (callers serialize access
+    with their own lock), in WAL mode so readers never block the writer.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
@@ -0,0 +1,251 @@
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from core.concurrency import blocking_executor
+from core.db import connect
+
+# --- Configuration ---
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BACKOFF_SECONDS = float(os.getenv("JOB_RETRY_BACKOFF_SECONDS", "10"))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "2"))
+# A running job whose worker has not renewed its lease for this long is reclaimed by another worker
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+
+class JobFailed(Exception):
+    """Raised by a job handler for a failure worth retrying."""
+
+
+class JobStore:
+    """
+    Persists jobs in SQLite so queued and in-progress work survives a restart.
+
+    A job moves queued -> running -> succeeded | failed. A failed attempt goes
+    back to queued (with a delay) until it runs out of attempts.
+
+    Several worker processes may share the database. A claimed job carries its
+    worker's id and a lease the worker keeps renewing; once the lease runs out
+    (the worker died or hung) the job can be claimed again by any worker.
+    """
+
+    def __init__(self, conn=None):
+        self._conn = conn or connect()
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    available_at REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    claimed_by TEXT,
+                    lease_expires_at REAL
+                )
+                """
+            )
+            # Databases created before leases existed lack their columns
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            for name, kind in (("claimed_by", "TEXT"), ("lease_expires_at", "REAL")):
+                if name not in columns:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {kind}")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, available_at)")
+
+    def submit(self, kind: str, payload: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, payload, status, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+                (job_id, kind, json.dumps(payload), now, now, now),
+            )
+        return job_id
+
+    def claim_next(self, worker_id: str, lease_seconds: float = JOB_LEASE_SECONDS) -> Optional[Dict[str, Any]]:
+        """
+        Atomically moves the oldest due job to running under `worker_id` and
+        returns it, or None. Due means queued and past its retry delay, or
+        running with an expired lease (its worker stopped renewing it).
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE (status = 'queued' AND available_at <= ?) "
+                "OR (status = 'running' AND (lease_expires_at IS NULL OR lease_expires_at < ?)) "
+                "ORDER BY created_at LIMIT 1",
+                (now, now),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, claimed_by = ?, "
+                "lease_expires_at = ?, updated_at = ? WHERE id = ?",
+                (worker_id, now + lease_seconds, now, row["id"]),
+            )
+        job = self._to_dict(row)
+        job["status"] = "running"
+        job["attempts"] += 1
+        job["claimed_by"] = worker_id
+        return job
+
+    def renew_lease(self, job_id: str, worker_id: str, lease_seconds: float = JOB_LEASE_SECONDS) -> bool:
+        """Extends the lease on a running job. False if the worker no longer holds it."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE id = ? AND status = 'running' AND claimed_by = ?",
+                (time.time() + lease_seconds, job_id, worker_id),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, result: Any) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'succeeded', result = ?, error = NULL, updated_at = ? WHERE id = ?",
+                (json.dumps(result), time.time(), job_id),
+            )
+
+    def fail(self, job_id: str, error: str, retry_in: Optional[float] = None) -> None:
+        """Records a failed attempt; requeues it after `retry_in` seconds, or fails it for good."""
+        now = time.time()
+        with self._lock, self._conn:
+            if retry_in is None:
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? WHERE id = ?",
+                    (error, now, job_id),
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'queued', error = ?, available_at = ?, updated_at = ? WHERE id = ?",
+                    (error, now + retry_in, now, job_id),
+                )
+
+    def release(self, worker_id: str) -> int:
+        """Puts the jobs a stopping worker is still running back on the queue. Returns how many."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'queued', claimed_by = NULL, lease_expires_at = NULL, updated_at = ? "
+                "WHERE status = 'running' AND claimed_by = ?",
+                (time.time(), worker_id),
+            )
+        return cursor.rowcount
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    @staticmethod
+    def _to_dict(row) -> Dict[str, Any]:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+
+class JobWorkerPool:
+    """
+    Runs queued jobs on a fixed number of asyncio workers. Handlers are plain
+    synchronous functions executed on the shared blocking I/O pool; raising
+    marks the attempt as failed and schedules a retry with linear backoff.
+
+    The pool claims jobs under its own worker id and renews their leases while
+    they run, so other processes sharing the store leave them alone. Jobs of a
+    process that died are picked up once their lease expires.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        handlers: Dict[str, Callable[..., Any]],
+        workers: int = JOB_WORKERS,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+        retry_backoff_seconds: float = JOB_RETRY_BACKOFF_SECONDS,
+        poll_seconds: float = JOB_POLL_SECONDS,
+        lease_seconds: float = JOB_LEASE_SECONDS,
+    ):
+        self.store = store
+        self.handlers = handlers
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.worker_id = uuid.uuid4().hex
+        self._tasks = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Hand unfinished jobs back now rather than making others wait out their leases
+        released = await asyncio.get_running_loop().run_in_executor(blocking_executor, self.store.release, self.worker_id)
+        if released:
+            print(f"Requeued {released} job(s) interrupted by shutdown.")
+
+    async def asubmit(self, kind: str, payload: Dict[str, Any]) -> str:
+        """Queues a job without blocking the event loop on the SQLite write."""
+        job_id = await asyncio.get_running_loop().run_in_executor(blocking_executor, self.store.submit, kind, payload)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job_id
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await loop.run_in_executor(
+                blocking_executor, self.store.claim_next, self.worker_id, self.lease_seconds
+            )
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._execute(loop, job)
+
+    async def _renew_lease(self, loop, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            await loop.run_in_executor(blocking_executor, self.store.renew_lease, job_id, self.worker_id, self.lease_seconds)
+
+    async def _execute(self, loop, job: Dict[str, Any]) -> None:
+        handler = self.handlers.get(job["kind"])
+        heartbeat = asyncio.create_task(self._renew_lease(loop, job["id"]))
+        try:
+            if handler is None:
+                raise JobFailed(f"No handler for job kind '{job['kind']}'.")
+            result = await loop.run_in_executor(blocking_executor, lambda: handler(**job["payload"]))
+        except asyncio.CancelledError:
+            # Shutting down: stop() hands the job back to the queue
+            raise
+        except Exception as e:
+            retry = handler is not None and job["attempts"] < self.max_attempts
+            retry_in = self.retry_backoff_seconds * job["attempts"] if retry else None
+            print(f"❌ Job {job['id']} ({job['kind']}) attempt {job['attempts']} failed: {e}")
+            await loop.run_in_executor(blocking_executor, self.store.fail, job["id"], str(e), retry_in)
+            return
+        finally:
+            heartbeat.cancel()
+        await loop.run_in_executor(blocking_executor, self.store.complete, job["id"], result)
@@ -0,0 +1,54 @@
+import asyncio
+import os
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Spaces calls to one upstream evenly to at most `rate_per_minute`, across
+    threads and the event loop alike. A rate of 0 disables limiting.
+    """
+
+    def __init__(self, rate_per_minute: float):
+        self.interval = 60.0 / rate_per_minute if rate_per_minute > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Claims the next free slot and returns how long the caller must wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        return slot - now
+
+    def try_acquire(self) -> bool:
+        """Claims a slot only if one is free right now; never waits."""
+        if not self.interval:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            if self._next_slot > now:
+                return False
+            self._next_slot = now + self.interval
+        return True
+
+    def acquire(self) -> None:
+        """Blocks the calling thread until its slot comes up."""
+        if self.interval:
+            delay = self._reserve()
+            if delay > 0:
+                time.sleep(delay)
+
+    async def aacquire(self) -> None:
+        """Async variant of acquire() that waits without blocking the event loop."""
+        if self.interval:
+            delay = self._reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+
+# --- Per-upstream limiters, shared by every caller in the process ---
+tavily_limiter = RateLimiter(float(os.getenv("TAVILY_RATE_PER_MINUTE", "100")))
+gemini_limiter = RateLimiter(float(os.getenv("GEMINI_RATE_PER_MINUTE", "60")))
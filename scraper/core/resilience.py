@@ -0,0 +1,65 @@
+import os
+import threading
+from collections import Counter
+from typing import Any, Dict
+
+from core.ratelimit import gemini_limiter, tavily_limiter
+from core import resilience_core
+from core.resilience_core import CircuitBreaker, CircuitOpenError  # CircuitOpenError is re-exported for the routes
+
+# The retry/breaker/hedging logic lives in core/resilience_core.py, shared verbatim with
+# the backend; this module configures it for the scraper and counts its outcomes.
+
+# --- Configuration ---
+RETRY_ATTEMPTS = int(os.getenv("RETRY_ATTEMPTS", "3"))
+RETRY_BASE_DELAY_SECONDS = float(os.getenv("RETRY_BASE_DELAY_SECONDS", "0.5"))
+RETRY_MAX_DELAY_SECONDS = float(os.getenv("RETRY_MAX_DELAY_SECONDS", "8"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", "30"))
+# A call still running after this long gets a duplicate sent in parallel; 0 disables hedging.
+# Off by default: every duplicate is another billed search or generation.
+TAVILY_HEDGE_AFTER_SECONDS = float(os.getenv("TAVILY_HEDGE_AFTER_SECONDS", "0"))
+GEMINI_HEDGE_AFTER_SECONDS = float(os.getenv("GEMINI_HEDGE_AFTER_SECONDS", "0"))
+
+
+class Upstream(resilience_core.Upstream):
+    """
+    Resilient calls to one external service (see core/resilience_core.py), with
+    the scraper's defaults. Outcomes are counted and exposed at GET /upstreams.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        attempts: int = RETRY_ATTEMPTS,
+        base_delay: float = RETRY_BASE_DELAY_SECONDS,
+        max_delay: float = RETRY_MAX_DELAY_SECONDS,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_seconds: float = BREAKER_RESET_SECONDS,
+        **kwargs,
+    ):
+        self.outcomes = Counter()
+        self._outcomes_lock = threading.Lock()
+        super().__init__(name, attempts, base_delay, max_delay, failure_threshold, reset_seconds, **kwargs)
+
+    def report(self, outcome: str) -> None:
+        with self._outcomes_lock:
+            self.outcomes[outcome] += 1
+
+    def on_retry(self, error: Exception, attempt: int, delay: float) -> None:
+        print(f"⚠️  {self.name} call failed ({error}); retry {attempt}/{self.attempts - 1} in {delay:.2f}s")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._outcomes_lock:
+            outcomes = dict(self.outcomes)
+        return {
+            "state": CircuitBreaker.STATE_NAMES[self.breaker.state],
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "hedge_after_seconds": self.hedge_after,
+            "calls": outcomes,
+        }
+
+
+tavily_upstream = Upstream("tavily", hedge_after=TAVILY_HEDGE_AFTER_SECONDS, limiter=tavily_limiter)
+gemini_upstream = Upstream("gemini", hedge_after=GEMINI_HEDGE_AFTER_SECONDS, limiter=gemini_limiter)
+UPSTREAMS = [tavily_upstream, gemini_upstream]
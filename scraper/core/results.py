@@ -0,0 +1,246 @@
+import argparse
+import json
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from core.cache import normalize_text
+from core.db import connect
+
+# The parameters the analysis prompt rates, each stored in its own indexed column
+RATED_PARAMETERS = ["work_life_balance", "salary_and_benefits", "career_growth", "job_security", "company_culture"]
+
+EXPORT_BATCH_SIZE = 500
+
+
+_conn = None
+_conn_lock = threading.Lock()
+
+
+def _shared_connection():
+    """Opens the results table and its indexes on first use, so importing this module touches no files."""
+    global _conn
+    with _conn_lock:
+        if _conn is None:
+            _conn = connect()
+            rating_columns = ", ".join(f"{name} INTEGER" for name in RATED_PARAMETERS)
+            with _conn:
+                _conn.execute(
+                    f"""
+                    CREATE TABLE IF NOT EXISTS analysis_results (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        title TEXT NOT NULL,
+                        title_key TEXT NOT NULL,
+                        analyzed_at REAL NOT NULL,
+                        {rating_columns},
+                        ratings TEXT NOT NULL
+                    )
+                    """
+                )
+                _conn.execute("CREATE INDEX IF NOT EXISTS analysis_results_title ON analysis_results (title_key, id)")
+                _conn.execute("CREATE INDEX IF NOT EXISTS analysis_results_time ON analysis_results (analyzed_at)")
+                for name in RATED_PARAMETERS:
+                    _conn.execute(f"CREATE INDEX IF NOT EXISTS analysis_results_{name} ON analysis_results ({name})")
+                # Change log: one entry per new or changed role, read incrementally by the backend preprocessing
+                _conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS job_changes (
+                        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                        title TEXT NOT NULL,
+                        title_key TEXT NOT NULL,
+                        ratings TEXT NOT NULL,
+                        changed_at REAL NOT NULL
+                    )
+                    """
+                )
+                _conn.execute("CREATE INDEX IF NOT EXISTS job_changes_title ON job_changes (title_key, seq)")
+                # Seed an empty log with the latest analysis of every role stored before it existed
+                _conn.execute(
+                    """
+                    INSERT INTO job_changes (title, title_key, ratings, changed_at)
+                    SELECT title, title_key, ratings, analyzed_at FROM analysis_results
+                    WHERE id IN (SELECT MAX(id) FROM analysis_results GROUP BY title_key)
+                      AND NOT EXISTS (SELECT 1 FROM job_changes)
+                    ORDER BY id
+                    """
+                )
+        return _conn
+
+
+class ResultsStore:
+    """
+    Stores job role analyses in SQLite, one row per analysis, with the ratings
+    as indexed columns so they can be filtered without loading every result.
+    Re-analyzing a role adds a new row; queries return the latest one per role
+    unless asked for the history.
+    """
+
+    def save(self, title: str, ratings: Dict[str, Any]) -> int:
+        """
+        Stores one analysis and returns its row id. If the role is new or its
+        ratings differ from the last logged ones, the same transaction appends
+        it to the change log.
+        """
+        conn = _shared_connection()
+        title_key = normalize_text(title)
+        encoded = json.dumps(ratings, sort_keys=True)
+        now = time.time()
+        values = [ratings.get(name) for name in RATED_PARAMETERS]
+        columns = ", ".join(RATED_PARAMETERS)
+        placeholders = ", ".join("?" for _ in RATED_PARAMETERS)
+        with _conn_lock, conn:
+            cursor = conn.execute(
+                f"INSERT INTO analysis_results (title, title_key, analyzed_at, {columns}, ratings) "
+                f"VALUES (?, ?, ?, {placeholders}, ?)",
+                (title, title_key, now, *values, encoded),
+            )
+            last_logged = conn.execute(
+                "SELECT ratings FROM job_changes WHERE title_key = ? ORDER BY seq DESC LIMIT 1", (title_key,)
+            ).fetchone()
+            if last_logged is None or json.loads(last_logged["ratings"]) != ratings:
+                conn.execute(
+                    "INSERT INTO job_changes (title, title_key, ratings, changed_at) VALUES (?, ?, ?, ?)",
+                    (title, title_key, encoded, now),
+                )
+        return cursor.lastrowid
+
+    def latest(self, title: str) -> Optional[Dict[str, Any]]:
+        conn = _shared_connection()
+        with _conn_lock:
+            row = conn.execute(
+                "SELECT * FROM analysis_results WHERE title_key = ? ORDER BY id DESC LIMIT 1",
+                (normalize_text(title),),
+            ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def query(
+        self,
+        minimums: Optional[Dict[str, int]] = None,
+        maximums: Optional[Dict[str, int]] = None,
+        title_contains: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        latest_only: bool = True,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns analyses matching every given filter, newest first.
+
+        Args:
+            minimums / maximums: Rated parameter -> inclusive bound, e.g. {"career_growth": 4}.
+            title_contains: Case-insensitive substring of the job title.
+            since / until: Unix timestamp bounds on when the analysis ran.
+            latest_only: Only consider each role's most recent analysis.
+        """
+        clauses, params = self._filters(minimums, maximums, title_contains, since, until, latest_only)
+        sql = "SELECT * FROM analysis_results"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY id DESC LIMIT ? OFFSET ?"
+        conn = _shared_connection()
+        with _conn_lock:
+            rows = conn.execute(sql, (*params, limit, offset)).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def export(self, since: Optional[float] = None, latest_only: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Yields analyses oldest first as rating records ({"title", "job_ratings",
+        "analyzed_at"}). They are not corpus jobs: no description or skills.
+        """
+        clauses, params = self._filters(None, None, None, since, None, latest_only)
+        for row in _batched_rows("analysis_results", "id", clauses, params):
+            yield {"title": row["title"], "job_ratings": json.loads(row["ratings"]), "analyzed_at": row["analyzed_at"]}
+
+    def changes_since(self, seq: int = 0) -> Iterator[Dict[str, Any]]:
+        """
+        Yields change log entries after sequence number `seq`, oldest first, as
+        rating records with their `seq`. A consumer stores the last seq it applied
+        and passes it back next time to receive only the delta; the backend
+        preprocessing applies the ratings to corpus jobs with the same title.
+        """
+        for row in _batched_rows("job_changes", "seq", [], [], after=seq):
+            yield {
+                "seq": row["seq"],
+                "title": row["title"],
+                "job_ratings": json.loads(row["ratings"]),
+                "changed_at": row["changed_at"],
+            }
+
+    def latest_seq(self) -> int:
+        conn = _shared_connection()
+        with _conn_lock:
+            row = conn.execute("SELECT MAX(seq) AS seq FROM job_changes").fetchone()
+        return row["seq"] or 0
+
+    @staticmethod
+    def _filters(minimums, maximums, title_contains, since, until, latest_only) -> Tuple[List[str], List[Any]]:
+        clauses, params = [], []
+        for bounds, operator in ((minimums or {}, ">="), (maximums or {}, "<=")):
+            for name, value in bounds.items():
+                if name not in RATED_PARAMETERS:
+                    raise ValueError(f"Unknown rated parameter '{name}'.")
+                clauses.append(f"{name} {operator} ?")
+                params.append(value)
+        if title_contains:
+            clauses.append("title_key LIKE ?")
+            params.append(f"%{normalize_text(title_contains)}%")
+        if since is not None:
+            clauses.append("analyzed_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("analyzed_at <= ?")
+            params.append(until)
+        if latest_only:
+            clauses.append("id IN (SELECT MAX(id) FROM analysis_results GROUP BY title_key)")
+        return clauses, params
+
+    @staticmethod
+    def _to_dict(row) -> Dict[str, Any]:
+        return {
+            "id": row["id"],
+            "title": row["title"],
+            "analyzed_at": row["analyzed_at"],
+            "ratings": json.loads(row["ratings"]),
+        }
+
+
+def _batched_rows(table: str, order_column: str, clauses: List[str], params: List[Any], after: int = 0):
+    """Yields matching rows in `order_column` order, reading in batches so the lock is never held for the whole scan."""
+    conn = _shared_connection()
+    sql = f"SELECT * FROM {table} WHERE " + " AND ".join(clauses + [f"{order_column} > ?"])
+    sql += f" ORDER BY {order_column} LIMIT ?"
+    while True:
+        with _conn_lock:
+            rows = conn.execute(sql, (*params, after, EXPORT_BATCH_SIZE)).fetchall()
+        if not rows:
+            return
+        yield from rows
+        after = rows[-1][order_column]
+
+
+results_store = ResultsStore()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export stored analyses (title and ratings) as JSON Lines.")
+    parser.add_argument("-o", "--output", default="analyzed_jobs.jsonl", help="Output JSON Lines file.")
+    parser.add_argument("--since", type=float, default=None, help="Only analyses run at or after this Unix timestamp.")
+    parser.add_argument("--history", action="store_true", help="Export every analysis, not just the latest per role.")
+    parser.add_argument(
+        "--changes-since", type=int, default=None, metavar="SEQ",
+        help="Export the change log after this sequence number instead (0 for all of it), "
+             "for the backend preprocessing's --incremental run.",
+    )
+    args = parser.parse_args()
+
+    if args.changes_since is not None:
+        records = results_store.changes_since(args.changes_since)
+    else:
+        records = results_store.export(since=args.since, latest_only=not args.history)
+    count = 0
+    with open(args.output, "w", encoding="utf-8") as out:
+        for record in records:
+            out.write(json.dumps(record) + "\n")
+            count += 1
+    print(f"Exported {count} records to {args.output}")
@@ -0,0 +1,128 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional
+
+from llms.gemini import analyze_job_role, configure_gemini
+
+# --- Configuration ---
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+
+
+def analyze_record(job_title: str) -> Dict:
+    """
+    Analyzes one role and returns a JSON Lines record: {"title", "status",
+    "job_ratings" or "error", "elapsed_seconds"}. These are ratings of a role,
+    not corpus jobs (no description or skills); the analysis is also saved to
+    the results store, whose change log the backend preprocessing merges onto
+    corpus jobs of the same title.
+    """
+    started = time.monotonic()
+    try:
+        analysis = analyze_job_role(job_title=job_title)
+        error = analysis.get("error")
+    except Exception as e:
+        analysis, error = None, str(e)
+    record = {"title": job_title, "status": "failed" if error else "succeeded"}
+    if error:
+        record["error"] = error
+    else:
+        record["job_ratings"] = analysis
+    record["elapsed_seconds"] = round(time.monotonic() - started, 2)
+    return record
+
+
+def dedupe_titles(job_titles: List[str]) -> List[str]:
+    """Strips blanks and duplicates, keeping the first occurrence order."""
+    seen = {}
+    for title in job_titles:
+        title = title.strip()
+        if title and title.lower() not in seen:
+            seen[title.lower()] = title
+    return list(seen.values())
+
+
+def analyze_job_roles(
+    job_titles: List[str],
+    concurrency: int = BATCH_CONCURRENCY,
+    on_progress: Optional[Callable[[int, int, Dict], None]] = None,
+) -> Iterator[Dict]:
+    """
+    Analyzes many roles concurrently and yields each record as it finishes.
+
+    Each role still runs its stages (query generation, Tavily search, Gemini
+    analysis) in order, but up to `concurrency` roles are in flight at once.
+    Throughput is ultimately capped by the per-upstream rate limiters in
+    core.ratelimit, which every Tavily and Gemini call goes through.
+
+    Args:
+        job_titles: Roles to analyze.
+        concurrency: Maximum roles analyzed at once.
+        on_progress: Called as (done, total, record) after each role.
+    """
+    titles = dedupe_titles(job_titles)
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="batch-analysis") as pool:
+        futures = [pool.submit(analyze_record, title) for title in titles]
+        for done, future in enumerate(as_completed(futures), start=1):
+            record = future.result()
+            if on_progress:
+                on_progress(done, len(titles), record)
+            yield record
+
+
+def read_job_titles(path: str) -> List[str]:
+    """Reads titles from a JSON array (of strings or job records) or a text file with one title per line."""
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    if path.endswith(".json"):
+        return [item["title"] if isinstance(item, dict) else item for item in json.loads(content)]
+    return content.splitlines()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze many job roles and write the results as JSON Lines.")
+    parser.add_argument("input", help="Job titles: a .json array or a text file with one title per line.")
+    parser.add_argument("-o", "--output", default="analyzed_jobs.jsonl", help="JSON Lines file for successful analyses.")
+    parser.add_argument("--failures", default=None, help="Optional JSON Lines file for failed analyses.")
+    parser.add_argument("-c", "--concurrency", type=int, default=BATCH_CONCURRENCY, help="Roles analyzed at once.")
+    args = parser.parse_args()
+
+    configure_gemini()
+
+    job_titles = read_job_titles(args.input)
+    started = time.monotonic()
+    counts = {"succeeded": 0, "failed": 0}
+
+    def report(done: int, total: int, record: Dict):
+        counts[record["status"]] += 1
+        rate = done / max(time.monotonic() - started, 1e-9) * 60
+        print(
+            f"[{done}/{total}] {record['status']:<9} {record['title']} "
+            f"({record['elapsed_seconds']}s, {rate:.1f} roles/min)",
+            file=sys.stderr,
+        )
+
+    failures = open(args.failures, "w", encoding="utf-8") if args.failures else None
+    try:
+        with open(args.output, "w", encoding="utf-8") as out:
+            for record in analyze_job_roles(job_titles, args.concurrency, on_progress=report):
+                target = out if record["status"] == "succeeded" else failures
+                if target is not None:
+                    target.write(json.dumps(record) + "\n")
+                    target.flush()
+    finally:
+        if failures:
+            failures.close()
+
+    print(
+        f"\nDone in {time.monotonic() - started:.1f}s: {counts['succeeded']} succeeded, "
+        f"{counts['failed']} failed. Results written to {args.output}",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import time
+
+# Simulated latency per call, so throughput can be measured offline
+FAKE_GEMINI_LATENCY_SECONDS = float(os.getenv("FAKE_GEMINI_LATENCY_SECONDS", "0"))
+# Fraction of calls that fail with a 503, to exercise retries and the circuit breaker offline
+FAKE_GEMINI_FAILURE_RATE = float(os.getenv("FAKE_GEMINI_FAILURE_RATE", "0"))
+
+RATED_PARAMETERS = ["work_life_balance", "salary_and_benefits", "career_growth", "job_security", "company_culture"]
+
+
+class ServiceUnavailable(Exception):
+    """Mimics google.api_core.exceptions.ServiceUnavailable, which core/resilience.py retries."""
+    code = 503
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """
+    Offline stand-in for genai.GenerativeModel with the same generate_content /
+    generate_content_async interface. Answers are deterministic per prompt:
+    a search query for free-text prompts, and a ratings object in JSON mode.
+    Enable with GEMINI_BACKEND=fake; FAKE_GEMINI_FAILURE_RATE makes it flaky.
+    """
+
+    def __init__(self, json_output: bool = False):
+        self.json_output = json_output
+        self.calls = 0
+
+    def _answer(self, prompt: str) -> str:
+        self.calls += 1
+        if FAKE_GEMINI_FAILURE_RATE and random.random() < FAKE_GEMINI_FAILURE_RATE:
+            raise ServiceUnavailable("503 The model is overloaded. Please try again later.")
+        title = re.search(r"'([^']+)'", prompt)
+        title = title.group(1) if title else "the role"
+        if not self.json_output:
+            return f"{title} salary work-life balance career growth"
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        return json.dumps({name: digest[i] % 5 + 1 for i, name in enumerate(RATED_PARAMETERS)})
+
+    def generate_content(self, prompt: str) -> FakeResponse:
+        if FAKE_GEMINI_LATENCY_SECONDS:
+            time.sleep(FAKE_GEMINI_LATENCY_SECONDS)
+        return FakeResponse(self._answer(prompt))
+
+    async def generate_content_async(self, prompt: str) -> FakeResponse:
+        if FAKE_GEMINI_LATENCY_SECONDS:
+            await asyncio.sleep(FAKE_GEMINI_LATENCY_SECONDS)
+        return FakeResponse(self._answer(prompt))
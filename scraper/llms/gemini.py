@@ -1,21 +1,119 @@
 import os
 import json
-import google.generativeai as genai
-from scraping.scrapper import tavily_search
-
-def get_gemini_response(prompt: str) -> str:
+import asyncio
+from typing import Optional
+from scraping.scrapper import tavily_search, async_tavily_search
+from core.resilience import gemini_upstream
+from core.cache import normalize_text, search_query_cache
+from core.results import results_store
+from scraping.content import prepare_content
+
+# --- Configuration ---
+# JSON output mode needs a Gemini 1.5+ model
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+# "google" calls the Gemini API; "fake" uses the offline stand-in in llms/fake_gemini.py
+GEMINI_BACKEND = os.getenv("GEMINI_BACKEND", "google")
+
+# Shared model instances, created once by configure_gemini()
+_text_model = None
+_json_model = None
+
+def configure_gemini(api_key: Optional[str] = None):
+    """
+    Configures the Gemini client and creates the shared model instances: one for
+    free text and one that is constrained to return JSON. Called once at startup;
+    scripts fall back to calling it on first use.
+    """
+    global _text_model, _json_model
+    if GEMINI_BACKEND == "fake":
+        from llms.fake_gemini import FakeGenerativeModel
+        _text_model = FakeGenerativeModel(json_output=False)
+        _json_model = FakeGenerativeModel(json_output=True)
+        return
+
+    import google.generativeai as genai
+    api_key = api_key or os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        raise ValueError("GOOGLE_API_KEY environment variable not set.")
+    genai.configure(api_key=api_key)
+    _text_model = genai.GenerativeModel(GEMINI_MODEL)
+    _json_model = genai.GenerativeModel(
+        GEMINI_MODEL, generation_config={"response_mime_type": "application/json"}
+    )
+
+def _get_model(json_output: bool):
+    if _text_model is None:
+        configure_gemini()
+    return _json_model if json_output else _text_model
+
+def get_gemini_response(prompt: str, json_output: bool = False) -> str:
     """
     Sends a prompt to the Gemini API and returns the text response.
 
     Args:
         prompt (str): The prompt to send to Gemini.
+        json_output (bool, optional): Ask Gemini to answer with a JSON document only. Defaults to False.
 
     Returns:
         str: The text part of the Gemini response.
+
+    Every attempt waits for a Gemini rate limit slot, transient errors are
+    retried with backoff, and calls fail fast with CircuitOpenError while Gemini
+    is degraded (core/resilience.py).
     """
-    model = genai.GenerativeModel('gemini-pro')
-    response = model.generate_content(prompt)
-    return response.text
+    def generate():
+        return _get_model(json_output).generate_content(prompt).text
+
+    return gemini_upstream.call(generate, hedge=True)
+
+async def get_gemini_response_async(prompt: str, json_output: bool = False) -> str:
+    """Async variant of get_gemini_response() that does not block the event loop."""
+    async def generate():
+        return (await _get_model(json_output).generate_content_async(prompt)).text
+
+    return await gemini_upstream.acall(generate, hedge=True)
+
+def _query_generation_prompt(job_title: str) -> str:
+    return f"Generate a concise and effective search query to find information about the typical work-life balance, salary expectations, and career growth for a '{job_title}' role. The query should be suitable for a web search engine."
+
+def _analysis_prompt(job_title: str, consolidated_content: str) -> str:
+    return f"""
+    Based on the following text which contains articles, reviews, and salary data about the job role '{job_title}', please analyze the content and return a JSON object.
+
+    The JSON object should rate the following parameters on a scale of 1 to 5, where 1 is very poor and 5 is excellent.
+    - "work_life_balance"
+    - "salary_and_benefits"
+    - "career_growth"
+    - "job_security"
+    - "company_culture"
+
+    If there is not enough information to rate a parameter, use a value of null.
+    Only return the raw JSON object and nothing else.
+
+    Here is the content to analyze:
+    ---
+    {consolidated_content}
+    ---
+    """
+
+def _prepare_search_content(job_title: str, search_results: dict):
+    """Returns the packed analysis input, or None if there is nothing to analyze."""
+    raw_content_list = [res.get("raw_content", "") for res in search_results["results"] if res.get("raw_content")]
+    # Drop boilerplate and duplicated paragraphs, then keep the most relevant ones within the token budget
+    consolidated_content, content_stats = prepare_content(raw_content_list, job_title)
+    print(
+        f"   Content prepared: {content_stats['tokens_before']} -> {content_stats['tokens_after']} tokens "
+        f"({content_stats['boilerplate_removed']} boilerplate and {content_stats['duplicates_removed']} duplicate "
+        f"paragraphs removed, {content_stats['paragraphs_kept']} kept)"
+    )
+    if not consolidated_content.strip():
+        print("   No raw content found in search results to analyze. Aborting.")
+        return None
+    return consolidated_content
+
+def _save_analysis(job_title: str, final_json_data: dict) -> None:
+    print("\n4. Saving analysis to the results store")
+    results_store.save(job_title, final_json_data)
 
 def analyze_job_role(job_title: str) -> dict:
     """
@@ -24,7 +122,7 @@ def analyze_job_role(job_title: str) -> dict:
     1. Generates a search query for a given job role.
     2. Uses Tavily to get search results.
     3. Sends the results to Gemini for analysis and JSON generation.
-    4. Saves the resulting JSON to a file.
+    4. Saves the ratings to the results store (core/results.py).
 
     Args:
         job_title (str): The job title to analyze (e.g., "Software Engineer").
@@ -35,75 +133,78 @@ def analyze_job_role(job_title: str) -> dict:
     print(f"--- Starting analysis for: {job_title} ---")
 
     # 1. Use Gemini to generate a targeted search query
-    query_generation_prompt = f"Generate a concise and effective search query to find information about the typical work-life balance, salary expectations, and career growth for a '{job_title}' role. The query should be suitable for a web search engine."
     print("1. Generating search query with Gemini...")
-    search_query = get_gemini_response(query_generation_prompt).strip().replace('"', '')
-    print(f"   Generated Query: {search_query}")
+    search_query = search_query_cache.get(normalize_text(job_title))
+    if search_query is None:
+        search_query = get_gemini_response(_query_generation_prompt(job_title)).strip().replace('"', '')
+        search_query_cache.set(normalize_text(job_title), search_query)
+        print(f"   Generated Query: {search_query}")
+    else:
+        print(f"   Cached Query: {search_query}")
 
     # 2. Call Tavily search with the generated query
     print("\n2. Searching with Tavily...")
     search_results = tavily_search(query=search_query, max_results=5)
-    
+
     if "error" in search_results or not search_results.get("results"):
         print("   Could not retrieve search results. Aborting.")
         return {"error": "Failed to get search results from Tavily."}
 
     # 3. Consolidate raw content and send to Gemini for analysis
     print("\n3. Analyzing content with Gemini...")
-    raw_content_list = [res.get("raw_content", "") for res in search_results["results"] if res.get("raw_content")]
-    consolidated_content = "\n\n---\n\n".join(raw_content_list)
-
-    if not consolidated_content.strip():
-        print("   No raw content found in search results to analyze. Aborting.")
+    consolidated_content = _prepare_search_content(job_title, search_results)
+    if consolidated_content is None:
         return {"error": "No raw content available for analysis."}
 
-    analysis_prompt = f"""
-    Based on the following text which contains articles, reviews, and salary data about the job role '{job_title}', please analyze the content and return a JSON object.
+    # JSON output mode: the response is a bare JSON document, no code fences to strip
+    json_string = get_gemini_response(_analysis_prompt(job_title, consolidated_content), json_output=True)
+    final_json_data = json.loads(json_string)
 
-    The JSON object should rate the following parameters on a scale of 1 to 5, where 1 is very poor and 5 is excellent.
-    - "work_life_balance"
-    - "salary_and_benefits"
-    - "career_growth"
-    - "job_security"
-    - "company_culture"
+    # 4. Save the ratings to the results store
+    _save_analysis(job_title, final_json_data)
 
-    If there is not enough information to rate a parameter, use a value of null.
-    Only return the raw JSON object and nothing else.
+    print("\n--- Analysis Complete ---")
+    return final_json_data
 
-    Here is the content to analyze:
-    ---
-    {consolidated_content}
-    ---
+async def analyze_job_role_async(job_title: str) -> dict:
     """
-    json_string = get_gemini_response(analysis_prompt)
-    
-    # Clean up the response to ensure it's valid JSON
-    cleaned_json_string = json_string.strip().lstrip("```json").rstrip("```")
-    final_json_data = json.loads(cleaned_json_string)
-
-    # 4. Save the JSON data to a file
-    output_dir = "results"
-    os.makedirs(output_dir, exist_ok=True)
-    file_path = os.path.join(output_dir, f"{job_title.lower().replace(' ', '_')}_analysis.json")
-    
-    print(f"\n4. Saving analysis to {file_path}")
-    with open(file_path, 'w') as f:
-        json.dump(final_json_data, f, indent=4)
-    
-    print("\n--- Analysis Complete ---")
+    Async variant of analyze_job_role() for the API: Gemini and Tavily calls are
+    awaited natively, and the CPU-bound content preparation and results write run
+    on worker threads. Returns the same result.
+    """
+    print(f"--- Starting analysis for: {job_title} ---")
+
+    search_query = await asyncio.to_thread(search_query_cache.get, normalize_text(job_title))
+    if search_query is None:
+        search_query = (await get_gemini_response_async(_query_generation_prompt(job_title))).strip().replace('"', '')
+        await asyncio.to_thread(search_query_cache.set, normalize_text(job_title), search_query)
+
+    search_results = await async_tavily_search(query=search_query, max_results=5)
+    if "error" in search_results or not search_results.get("results"):
+        print("   Could not retrieve search results. Aborting.")
+        return {"error": "Failed to get search results from Tavily."}
+
+    consolidated_content = await asyncio.to_thread(_prepare_search_content, job_title, search_results)
+    if consolidated_content is None:
+        return {"error": "No raw content available for analysis."}
+
+    json_string = await get_gemini_response_async(
+        _analysis_prompt(job_title, consolidated_content), json_output=True
+    )
+    final_json_data = json.loads(json_string)
+
+    await asyncio.to_thread(_save_analysis, job_title, final_json_data)
+    print(f"--- Analysis Complete: {job_title} ---")
     return final_json_data
 
 if __name__ == "__main__":
-    # Configure the Gemini API key
-    google_api_key = os.getenv("GOOGLE_API_KEY")
-    if not google_api_key:
-        raise ValueError("GOOGLE_API_KEY environment variable not set.")
-    genai.configure(api_key=google_api_key)
+    # Configure the Gemini API key and shared models
+    configure_gemini()
 
     # --- Example Usage ---
     # Replace "Software Engineer" with any job role you want to analyze
     job_to_analyze = "Software Engineer"
     analysis_result = analyze_job_role(job_to_analyze)
-    
+
     print("\nFinal JSON Output:")
-    print(json.dumps(analysis_result, indent=2))
\ No newline at end of file
+    print(json.dumps(analysis_result, indent=2))
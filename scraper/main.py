@@ -4,7 +4,14 @@ from fastapi import FastAPI
 # Import the routers from the new 'routes' directory
 from routes.search_router import router as scraping_router
 from routes.analysis_router import router as analysis_router
-import google.generativeai as genai
+from routes.results_router import router as results_router
+from scraping.tavily_client import init_tavily_client, close_tavily_client
+from core.concurrency import blocking_executor
+from core.jobs import JobStore, JobWorkerPool
+from core.cache import search_query_cache, tavily_cache
+from core.resilience import UPSTREAMS
+from routes.analysis_router import ANALYSIS_JOB_KIND, run_analysis_job
+from llms.gemini import GEMINI_BACKEND, configure_gemini
 
 # --- App Initialization ---
 app = FastAPI(
@@ -15,17 +22,46 @@ app = FastAPI(
 
 # --- API Key Configuration ---
 @app.on_event("startup")
-def startup_event():
+async def startup_event():
     """
     On startup, check for necessary API keys and configure the Gemini client.
     """
     tavily_api_key = os.getenv("TAVILY_API_KEY")
     google_api_key = os.getenv("GOOGLE_API_KEY")
-    if not tavily_api_key or not google_api_key:
+    # The fake Gemini backend runs offline and needs no Google key
+    if not tavily_api_key or (not google_api_key and GEMINI_BACKEND != "fake"):
         raise RuntimeError("API keys for Tavily and/or Google are not set in environment variables.")
-    genai.configure(api_key=google_api_key)
+    # Shared Gemini models, created once for the whole process
+    configure_gemini(google_api_key)
+    # One pooled Tavily client for the whole process, shared by every search
+    init_tavily_client()
+    # Drop cache entries that expired while the service was down
+    for cache in (tavily_cache, search_query_cache):
+        cache.purge_expired()
+    # Persistent job queue for analyses; picks up work queued before a restart
+    app.state.job_pool = JobWorkerPool(JobStore(), {ANALYSIS_JOB_KIND: run_analysis_job})
+    app.state.job_pool.start()
     print("FastAPI server started. API keys loaded and Gemini client configured.")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    On shutdown, stop the job workers (running jobs are requeued on the next start),
+    then close the Tavily client's pooled connections and the blocking I/O pool.
+    """
+    await app.state.job_pool.stop()
+    await close_tavily_client()
+    blocking_executor.shutdown(wait=False, cancel_futures=True)
+
 # --- Include Routers in the Main App ---
 app.include_router(scraping_router)
 app.include_router(analysis_router)
+app.include_router(results_router)
+
+@app.get("/upstreams", tags=["Health"])
+async def upstream_stats_endpoint():
+    """
+    Circuit breaker state and call outcomes (success, error, retry, rejected,
+    hedged) for each upstream the scraper depends on.
+    """
+    return {upstream.name: upstream.snapshot() for upstream in UPSTREAMS}
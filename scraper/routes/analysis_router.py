@@ -1,13 +1,32 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+import asyncio
+import json
+import os
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
 
 # Import the core analysis function
-from scraping.gemini import analyze_job_role
+from llms.gemini import analyze_job_role, analyze_job_role_async
+from core.concurrency import analysis_limiter
+from core.jobs import JobFailed, TERMINAL_STATUSES
+from core.resilience import CircuitOpenError
+from llms.batch_analysis import BATCH_CONCURRENCY, analyze_job_roles, dedupe_titles
+
+ANALYSIS_JOB_KIND = "analyze_job_role"
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "16"))
+BATCH_MAX_TITLES = int(os.getenv("BATCH_MAX_TITLES", "500"))
 
 # --- Pydantic Models & Router for Analysis ---
 class JobAnalysisRequest(BaseModel):
     job_title: str
 
+class BatchAnalysisRequest(BaseModel):
+    job_titles: List[str] = Field(..., min_length=1)
+    concurrency: Optional[int] = Field(None, ge=1)
+
 router = APIRouter(
     prefix="/analyze",
     tags=["Analysis"],
@@ -17,12 +36,115 @@ router = APIRouter(
 async def analyze_job_role_endpoint(request: JobAnalysisRequest):
     """
     Analyzes a job role by searching the web and using Gemini for evaluation.
-    Note: This is a long-running task.
+    Note: This is a long-running task. Its Gemini and Tavily calls are awaited
+    asynchronously, so other requests keep being served meanwhile.
     """
     try:
-        analysis_result = analyze_job_role(job_title=request.job_title)
+        analysis_result = await analysis_limiter.run(analyze_job_role_async(job_title=request.job_title))
         if "error" in analysis_result:
             raise HTTPException(status_code=500, detail=analysis_result["error"])
         return analysis_result
+    except HTTPException:
+        raise
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
+
+
+# --- Background Jobs ---
+
+def run_analysis_job(job_title: str) -> dict:
+    """Job handler: runs one analysis, raising so the worker pool retries failures."""
+    analysis_result = analyze_job_role(job_title=job_title)
+    if "error" in analysis_result:
+        raise JobFailed(analysis_result["error"])
+    return analysis_result
+
+
+def _job_view(job: dict) -> dict:
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "job_title": job["payload"].get("job_title"),
+        "result": job["result"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+    }
+
+
+async def _get_job_or_404(http_request: Request, job_id: str) -> dict:
+    # SQLite reads block, so they run on the thread pool rather than the event loop
+    job = await run_in_threadpool(http_request.app.state.job_pool.store.get, job_id)
+    if job is None or job["kind"] != ANALYSIS_JOB_KIND:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found.")
+    return job
+
+
+@router.post("/jobs", status_code=202)
+async def submit_analysis_job(request: JobAnalysisRequest, http_request: Request):
+    """
+    Queues a job role analysis and returns its job id immediately. Poll
+    GET /analyze/jobs/{job_id} or subscribe to /analyze/jobs/{job_id}/events for the result.
+    """
+    job_id = await http_request.app.state.job_pool.asubmit(ANALYSIS_JOB_KIND, {"job_title": request.job_title})
+    return {"job_id": job_id, "status": "queued"}
+
+
+@router.get("/jobs/{job_id}")
+async def get_analysis_job(job_id: str, http_request: Request):
+    """
+    Returns a job's status, attempts so far and, once finished, its result or error.
+    """
+    return _job_view(await _get_job_or_404(http_request, job_id))
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_analysis_job(job_id: str, http_request: Request):
+    """
+    Server-sent events: emits the job every time its status changes and closes
+    once it has succeeded or failed.
+    """
+    await _get_job_or_404(http_request, job_id)
+    store = http_request.app.state.job_pool.store
+
+    async def events():
+        last_status = None
+        while True:
+            job = await run_in_threadpool(store.get, job_id)
+            if job["status"] != last_status:
+                last_status = job["status"]
+                yield f"data: {json.dumps(_job_view(job))}\n\n"
+            if job["status"] in TERMINAL_STATUSES or await http_request.is_disconnected():
+                return
+            await asyncio.sleep(1)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+# --- Batch Analysis ---
+
+@router.post("/batch")
+async def analyze_job_roles_batch_endpoint(request: BatchAnalysisRequest):
+    """
+    Analyzes many job roles concurrently and streams one JSON Lines record per
+    role as it finishes (`application/x-ndjson`): the title, its status and
+    either `job_ratings` or `error` (see llms/batch_analysis.analyze_record).
+    The total number of roles is sent in the X-Batch-Total header so clients
+    can show progress.
+    """
+    job_titles = dedupe_titles(request.job_titles)
+    if len(job_titles) > BATCH_MAX_TITLES:
+        raise HTTPException(status_code=413, detail=f"A batch may contain at most {BATCH_MAX_TITLES} job titles.")
+    concurrency = min(request.concurrency or BATCH_CONCURRENCY, BATCH_MAX_CONCURRENCY)
+
+    # A sync generator: Starlette iterates it on a worker thread, keeping the event loop free
+    def lines():
+        for record in analyze_job_roles(job_titles, concurrency):
+            yield json.dumps(record) + "\n"
+
+    return StreamingResponse(
+        lines(), media_type="application/x-ndjson", headers={"X-Batch-Total": str(len(job_titles))}
+    )
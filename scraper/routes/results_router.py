@@ -0,0 +1,117 @@
+import json
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from core.results import results_store
+
+# --- Router Initialization ---
+router = APIRouter(
+    prefix="/results",
+    tags=["Results"],
+)
+
+def rating_filter():
+    """A 1-5 rating bound. Each parameter needs its own Query: FastAPI collapses parameters sharing one."""
+    return Query(None, ge=1, le=5)
+
+# --- API Endpoints ---
+
+@router.get("")
+async def query_results_endpoint(
+    title: Optional[str] = Query(None, description="Case-insensitive substring of the job title."),
+    since: Optional[float] = Query(None, description="Only analyses run at or after this Unix timestamp."),
+    until: Optional[float] = Query(None, description="Only analyses run at or before this Unix timestamp."),
+    min_work_life_balance: Optional[int] = rating_filter(),
+    max_work_life_balance: Optional[int] = rating_filter(),
+    min_salary_and_benefits: Optional[int] = rating_filter(),
+    max_salary_and_benefits: Optional[int] = rating_filter(),
+    min_career_growth: Optional[int] = rating_filter(),
+    max_career_growth: Optional[int] = rating_filter(),
+    min_job_security: Optional[int] = rating_filter(),
+    max_job_security: Optional[int] = rating_filter(),
+    min_company_culture: Optional[int] = rating_filter(),
+    max_company_culture: Optional[int] = rating_filter(),
+    history: bool = Query(False, description="Include earlier analyses of each role, not just the latest."),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Lists stored analyses matching every given filter, newest first, e.g.
+    GET /results?min_career_growth=4 for all roles rated 4 or better on career growth.
+    """
+    bounds = {
+        "work_life_balance": (min_work_life_balance, max_work_life_balance),
+        "salary_and_benefits": (min_salary_and_benefits, max_salary_and_benefits),
+        "career_growth": (min_career_growth, max_career_growth),
+        "job_security": (min_job_security, max_job_security),
+        "company_culture": (min_company_culture, max_company_culture),
+    }
+    try:
+        # SQLite reads block, so they run on the thread pool rather than the event loop
+        results = await run_in_threadpool(
+            results_store.query,
+            minimums={name: low for name, (low, _) in bounds.items() if low is not None},
+            maximums={name: high for name, (_, high) in bounds.items() if high is not None},
+            title_contains=title,
+            since=since,
+            until=until,
+            latest_only=not history,
+            limit=limit,
+            offset=offset,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to query results: {e}")
+    return {"count": len(results), "results": results}
+
+
+@router.get("/export")
+async def export_results_endpoint(
+    since: Optional[float] = Query(None, description="Only analyses run at or after this Unix timestamp."),
+    history: bool = Query(False, description="Export every analysis, not just the latest per role."),
+):
+    """
+    Streams stored analyses oldest first as JSON Lines (`application/x-ndjson`)
+    rating records: {"title", "job_ratings", "analyzed_at"}.
+    """
+    # A sync generator: Starlette iterates it on a worker thread, keeping the event loop free
+    def lines():
+        for record in results_store.export(since=since, latest_only=not history):
+            yield json.dumps(record) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.get("/changes")
+async def stream_changes_endpoint(
+    since_seq: int = Query(0, ge=0, description="Last change log sequence number the client has applied."),
+):
+    """
+    Streams the change log after `since_seq` as JSON Lines: one record per role
+    that was added or whose ratings changed, {"seq", "title", "job_ratings",
+    "changed_at"}. The backend preprocessing (--incremental) applies them to
+    corpus jobs of the same title, stores the last seq it applied and asks
+    only for the delta. X-Latest-Seq carries the newest seq at request time.
+    """
+    latest_seq = await run_in_threadpool(results_store.latest_seq)
+
+    def lines():
+        for record in results_store.changes_since(since_seq):
+            yield json.dumps(record) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson", headers={"X-Latest-Seq": str(latest_seq)})
+
+
+@router.get("/{job_title}")
+async def get_result_endpoint(job_title: str):
+    """
+    Returns the latest stored analysis of a job role.
+    """
+    result = await run_in_threadpool(results_store.latest, job_title)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"No analysis stored for '{job_title}'.")
+    return result
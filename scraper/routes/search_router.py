@@ -2,8 +2,10 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
 # Import your existing search functions from the 'scraping' directory
-from scraping.scrapper import tavily_search
-from scraping.use_knowledge_base import query_rag_knowledge_base
+from scraping.scrapper import async_tavily_search
+from scraping.use_knowledge_base import KNOWLEDGE_BASES, async_query_rag_knowledge_base
+from core.concurrency import search_limiter
+from core.cache import search_query_cache, tavily_cache
 
 # --- Router Initialization ---
 router = APIRouter(
@@ -28,7 +30,9 @@ async def search_web_endpoint(request: WebSearchRequest):
     """
     Performs a general web search using the Tavily API.
     """
-    results = tavily_search(query=request.query, max_results=request.max_results)
+    results = await search_limiter.run(
+        async_tavily_search(query=request.query, max_results=request.max_results)
+    )
     if "error" in results:
         raise HTTPException(status_code=500, detail=results["error"])
     return results
@@ -36,9 +40,22 @@ async def search_web_endpoint(request: WebSearchRequest):
 @router.post("/kb")
 async def search_kb_endpoint(request: KBSearchRequest):
     """
-    Queries a specific RAG knowledge base on Tavily.
+    Queries a knowledge base: a Tavily search restricted to the domains
+    configured for `topic` in TAVILY_KNOWLEDGE_BASES.
     """
-    results = query_rag_knowledge_base(query=request.query, topic=request.topic, max_results=request.max_results)
+    if request.topic not in KNOWLEDGE_BASES:
+        raise HTTPException(status_code=404, detail=f"Unknown knowledge base '{request.topic}'.")
+    results = await search_limiter.run(
+        async_query_rag_knowledge_base(query=request.query, topic=request.topic, max_results=request.max_results)
+    )
     if "error" in results:
         raise HTTPException(status_code=500, detail=results["error"])
-    return results
\ No newline at end of file
+    return results
+
+@router.get("/cache-stats")
+async def get_cache_stats():
+    """
+    Hit rates of the Tavily response cache and the generated search query
+    cache, and how many upstream calls each has saved since startup.
+    """
+    return {"caches": [tavily_cache.snapshot(), search_query_cache.snapshot()]}
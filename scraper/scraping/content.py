@@ -0,0 +1,177 @@
+import hashlib
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Tuple
+
+# --- Configuration ---
+ANALYSIS_TOKEN_BUDGET = int(os.getenv("ANALYSIS_TOKEN_BUDGET", "12000"))
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.8"))
+
+# Terms the analysis prompt rates; chunks mentioning them rank higher
+ANALYSIS_TERMS = [
+    "salary", "pay", "compensation", "benefits", "bonus",
+    "work-life", "balance", "hours", "overtime", "remote", "stress",
+    "career", "growth", "promotion", "progression", "skills",
+    "security", "layoffs", "demand", "stable",
+    "culture", "team", "management", "environment",
+]
+
+# Lines that are navigation, consent banners and page chrome rather than content
+BOILERPLATE_PATTERNS = re.compile(
+    r"(cookie|privacy policy|terms of (use|service)|all rights reserved|sign (in|up)|log ?in|subscribe"
+    r"|newsletter|skip to (main )?content|back to top|share (on|this)|follow us|advertisement"
+    r"|accept all|read more|related (articles|posts)|©)",
+    re.IGNORECASE,
+)
+WORD = re.compile(r"[a-z0-9][a-z0-9'+#-]*")
+MARKDOWN_TABLE_ROW = re.compile(r"^\|.*\|$")
+
+SHINGLE_SIZE = 5
+MINHASH_PERMUTATIONS = 32
+LSH_BANDS = 8
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_PERMUTATIONS = [
+    (
+        int.from_bytes(hashlib.blake2b(f"a{i}".encode(), digest_size=8).digest(), "big") % _MERSENNE_PRIME or 1,
+        int.from_bytes(hashlib.blake2b(f"b{i}".encode(), digest_size=8).digest(), "big") % _MERSENNE_PRIME,
+    )
+    for i in range(MINHASH_PERMUTATIONS)
+]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for Gemini-style tokenizers (~4 characters per token)."""
+    return max(1, len(text) // 4) if text else 0
+
+
+def split_paragraphs(text: str) -> List[str]:
+    """Splits crawled page text into paragraphs, treating single line breaks as separators too."""
+    return [p.strip() for p in re.split(r"\n\s*\n|\n", text or "") if p.strip()]
+
+
+def is_boilerplate(paragraph: str) -> bool:
+    """Flags navigation menus, breadcrumbs, banners and other short page chrome."""
+    # Markdown table rows (e.g. "| Data Scientist | $120,000 | 35% |") are data, not menus;
+    # only the divider under the header ("|---|:---:|") is chrome
+    if MARKDOWN_TABLE_ROW.match(paragraph.strip()):
+        return not re.search(r"[^\s|:-]", paragraph)
+    words = paragraph.split()
+    # Very short lines are menu items or headings, unless they carry figures (e.g. "Median salary: $95,000")
+    if len(words) < 4 and not re.search(r"\d", paragraph):
+        return True
+    # Menus and breadcrumbs: many separators relative to words
+    if sum(paragraph.count(sep) for sep in ("|", "»", "›", " > ", "•")) >= max(2, len(words) // 4):
+        return True
+    return len(words) < 25 and bool(BOILERPLATE_PATTERNS.search(paragraph))
+
+
+def _shingles(paragraph: str) -> set:
+    words = WORD.findall(paragraph.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash_signature(paragraph: str) -> Tuple[int, ...]:
+    """
+    MinHash signature of the paragraph's word shingles, for estimating Jaccard
+    similarity. Uses the built-in string hash, so signatures are only comparable
+    within one process (which is all dedup needs).
+    """
+    hashes = [hash(s) & _MAX_HASH for s in _shingles(paragraph)]
+    return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def _similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / len(sig_a)
+
+
+def dedupe_paragraphs(paragraphs: List[str], threshold: float = NEAR_DUPLICATE_THRESHOLD) -> List[int]:
+    """
+    Returns the indexes of the paragraphs to keep, dropping any whose estimated
+    Jaccard similarity to an earlier kept paragraph reaches `threshold`.
+    Candidates are found with LSH banding, so paragraphs are not compared pairwise.
+    """
+    rows = MINHASH_PERMUTATIONS // LSH_BANDS
+    buckets: Dict[Tuple, List[int]] = {}
+    signatures = {}
+    exact = set()
+    kept = []
+    for index, paragraph in enumerate(paragraphs):
+        # Exact repeats (e.g. the same footer on every page) skip the MinHash work entirely
+        normalized = " ".join(WORD.findall(paragraph.lower()))
+        if normalized in exact:
+            continue
+        exact.add(normalized)
+        signature = minhash_signature(paragraph)
+        band_keys = [(band, signature[band * rows:(band + 1) * rows]) for band in range(LSH_BANDS)]
+        candidates = {other for key in band_keys for other in buckets.get(key, [])}
+        if any(_similarity(signature, signatures[other]) >= threshold for other in candidates):
+            continue
+        signatures[index] = signature
+        for key in band_keys:
+            buckets.setdefault(key, []).append(index)
+        kept.append(index)
+    return kept
+
+
+def relevance_score(paragraph: str, query_terms: Counter) -> float:
+    """Query-term matches per paragraph, damped by length so long paragraphs don't win by size alone."""
+    words = WORD.findall(paragraph.lower())
+    if not words:
+        return 0.0
+    counts = Counter(words)
+    matches = sum(min(counts[term], 3) * weight for term, weight in query_terms.items())
+    return matches / math.log(len(words) + 2)
+
+
+def prepare_content(raw_contents: List[str], job_title: str, token_budget: int = ANALYSIS_TOKEN_BUDGET) -> Tuple[str, Dict]:
+    """
+    Turns the raw content of several crawled pages into a compact analysis input.
+
+    1. Splits pages into paragraphs and drops navigation/boilerplate.
+    2. Drops exact and near-duplicate paragraphs (shingling + MinHash), including
+       boilerplate repeated across pages.
+    3. Ranks paragraphs by relevance to the job title and the rated parameters.
+    4. Packs the best paragraphs into `token_budget`, keeping their original order.
+
+    Returns:
+        The packed text, and stats with the token counts before and after.
+    """
+    paragraphs = [p for content in raw_contents for p in split_paragraphs(content)]
+    tokens_before = estimate_tokens("\n\n".join(raw_contents))
+
+    content_paragraphs = [p for p in paragraphs if not is_boilerplate(p)]
+    unique_indexes = dedupe_paragraphs(content_paragraphs)
+    unique_paragraphs = [content_paragraphs[i] for i in unique_indexes]
+
+    query_terms = Counter({term: 2.0 for term in WORD.findall(job_title.lower())})
+    for term in ANALYSIS_TERMS:
+        query_terms.setdefault(term, 1.0)
+    ranked = sorted(
+        range(len(unique_paragraphs)),
+        key=lambda i: relevance_score(unique_paragraphs[i], query_terms),
+        reverse=True,
+    )
+
+    selected, used = [], 0
+    for i in ranked:
+        cost = estimate_tokens(unique_paragraphs[i]) + 1
+        if used + cost > token_budget:
+            continue
+        selected.append(i)
+        used += cost
+
+    packed = "\n\n".join(unique_paragraphs[i] for i in sorted(selected))
+    stats = {
+        "tokens_before": tokens_before,
+        "tokens_after": estimate_tokens(packed),
+        "paragraphs": len(paragraphs),
+        "boilerplate_removed": len(paragraphs) - len(content_paragraphs),
+        "duplicates_removed": len(content_paragraphs) - len(unique_paragraphs),
+        "paragraphs_kept": len(selected),
+    }
+    return packed, stats
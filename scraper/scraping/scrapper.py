@@ -1,7 +1,7 @@
-import os
-from tavily import TavilyClient
 from typing import List, Optional, Dict, Any
 
+from scraping.tavily_client import get_tavily_client
+
 def tavily_search(
     query: str,
     search_depth: str = "advanced",
@@ -33,15 +33,8 @@ def tavily_search(
         Dict[str, Any]: The search results from the Tavily API.
     """
     try:
-        # It's recommended to set TAVILY_API_KEY as an environment variable
-        api_key = os.getenv("TAVILY_API_KEY")
-        if not api_key:
-            raise ValueError("TAVILY_API_KEY environment variable not set.")
-
-        tavily = TavilyClient(api_key=api_key)
-
-        # Perform the search with the specified parameters
-        response = tavily.search(
+        # Perform the search with the specified parameters on the shared, pooled client
+        response = get_tavily_client().search(
             query=query,
             search_depth=search_depth,
             include_raw_content=include_raw_content,
@@ -56,6 +49,35 @@ def tavily_search(
         print(f"An error occurred: {e}")
         return {"error": str(e)}
 
+async def async_tavily_search(
+    query: str,
+    search_depth: str = "advanced",
+    include_raw_content: bool = True,
+    max_results: int = 5,
+    include_answer: bool = True,
+    include_images: bool = False,
+    include_domains: Optional[List[str]] = None,
+    exclude_domains: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Async variant of tavily_search() for the FastAPI routes. Takes the same
+    arguments and returns the same results, without blocking the event loop.
+    """
+    try:
+        return await get_tavily_client().asearch(
+            query=query,
+            search_depth=search_depth,
+            include_raw_content=include_raw_content,
+            max_results=max_results,
+            include_answer=include_answer,
+            include_images=include_images,
+            include_domains=include_domains,
+            exclude_domains=exclude_domains,
+        )
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        return {"error": str(e)}
+
 if __name__ == "__main__":
     # Example of how to use the function
     # This part will only run when you execute the script directly
@@ -0,0 +1,125 @@
+import asyncio
+import os
+from typing import Any, Dict, Optional
+
+import httpx
+
+from core.cache import make_key, tavily_cache
+from core.resilience import tavily_upstream
+
+# --- Configuration ---
+TAVILY_BASE_URL = os.getenv("TAVILY_BASE_URL", "https://api.tavily.com")
+TAVILY_MAX_CONNECTIONS = int(os.getenv("TAVILY_MAX_CONNECTIONS", "20"))
+TAVILY_MAX_KEEPALIVE = int(os.getenv("TAVILY_MAX_KEEPALIVE", "10"))
+TAVILY_KEEPALIVE_SECONDS = float(os.getenv("TAVILY_KEEPALIVE_SECONDS", "60"))
+TAVILY_TIMEOUT_SECONDS = float(os.getenv("TAVILY_TIMEOUT_SECONDS", "60"))
+
+
+class TavilyHTTPClient:
+    """
+    A long-lived Tavily API client that keeps its HTTP connections alive, so
+    repeated searches reuse pooled connections instead of paying a new TCP and
+    TLS handshake each time.
+
+    Holds a sync client for the scripts and thread-pool callers, and an async
+    client for the FastAPI routes. Both share the same pool settings.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = TAVILY_BASE_URL,
+        max_connections: int = TAVILY_MAX_CONNECTIONS,
+        max_keepalive: int = TAVILY_MAX_KEEPALIVE,
+        keepalive_seconds: float = TAVILY_KEEPALIVE_SECONDS,
+        timeout: float = TAVILY_TIMEOUT_SECONDS,
+    ):
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_seconds,
+        )
+        options = {
+            "base_url": base_url,
+            "headers": {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
+            "limits": limits,
+            "timeout": timeout,
+        }
+        self._client = httpx.Client(**options)
+        self._async_client = httpx.AsyncClient(**options)
+
+    @staticmethod
+    def _payload(query: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        # Omit unset options so Tavily applies its own defaults
+        return {"query": query, **{key: value for key, value in params.items() if value is not None}}
+
+    def _post(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        response = self._client.post("/search", json=payload)
+        response.raise_for_status()
+        return response.json()
+
+    async def _apost(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        response = await self._async_client.post("/search", json=payload)
+        response.raise_for_status()
+        return response.json()
+
+    def search(self, query: str, **params) -> Dict[str, Any]:
+        """
+        POSTs to /search and returns the decoded response, serving repeated
+        requests from the shared cache. Every attempt waits for a Tavily rate
+        limit slot; transient failures are retried and slow searches hedged
+        (core/resilience.py). Raises httpx.HTTPError on failure,
+        or CircuitOpenError while Tavily is degraded.
+        """
+        payload = self._payload(query, params)
+        key = make_key(payload)
+        cached = tavily_cache.get(key)
+        if cached is not None:
+            return cached
+        result = tavily_upstream.call(lambda: self._post(payload), hedge=True)
+        tavily_cache.set(key, result)
+        return result
+
+    async def asearch(self, query: str, **params) -> Dict[str, Any]:
+        """Async variant of search(), for use from the event loop."""
+        payload = self._payload(query, params)
+        key = make_key(payload)
+        cached = await asyncio.to_thread(tavily_cache.get, key)
+        if cached is not None:
+            return cached
+        result = await tavily_upstream.acall(lambda: self._apost(payload), hedge=True)
+        await asyncio.to_thread(tavily_cache.set, key, result)
+        return result
+
+    def close(self) -> None:
+        self._client.close()
+
+    async def aclose(self) -> None:
+        self._client.close()
+        await self._async_client.aclose()
+
+
+_tavily_client: Optional[TavilyHTTPClient] = None
+
+
+def init_tavily_client() -> TavilyHTTPClient:
+    """Creates the shared client. Called once at scraper startup."""
+    global _tavily_client
+    api_key = os.getenv("TAVILY_API_KEY")
+    if not api_key:
+        raise ValueError("TAVILY_API_KEY environment variable not set.")
+    _tavily_client = TavilyHTTPClient(api_key=api_key)
+    return _tavily_client
+
+
+def get_tavily_client() -> TavilyHTTPClient:
+    """Returns the shared client, creating it on first use when running outside the API (scripts)."""
+    return _tavily_client or init_tavily_client()
+
+
+async def close_tavily_client() -> None:
+    """Closes the shared client's connection pools. Called at scraper shutdown."""
+    global _tavily_client
+    if _tavily_client is not None:
+        await _tavily_client.aclose()
+        _tavily_client = None
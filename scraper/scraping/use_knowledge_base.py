@@ -1,8 +1,28 @@
-import os
 import json
-from tavily import TavilyClient
+import os
 from typing import Dict, Any, List, Optional
 
+from scraping.tavily_client import get_tavily_client
+
+# --- Configuration ---
+# Tavily has no hosted knowledge bases, and its `topic` only accepts general/news/finance.
+# A knowledge base here is a named set of domains that searches are restricted to, e.g.
+# TAVILY_KNOWLEDGE_BASES='{"careers": ["onetonline.org", "bls.gov"]}'
+KNOWLEDGE_BASES: Dict[str, List[str]] = json.loads(os.getenv("TAVILY_KNOWLEDGE_BASES", "{}"))
+
+
+def knowledge_base_domains(topic: str, include_domains: Optional[List[str]] = None) -> List[str]:
+    """
+    The domains a knowledge base query is restricted to: `include_domains` if
+    given, else the configured domains of the knowledge base named `topic`.
+    Raises ValueError for an unknown knowledge base, so it is never sent to Tavily unscoped.
+    """
+    if include_domains:
+        return include_domains
+    if topic not in KNOWLEDGE_BASES:
+        raise ValueError(f"Unknown knowledge base '{topic}'. Configure its domains in TAVILY_KNOWLEDGE_BASES.")
+    return KNOWLEDGE_BASES[topic]
+
 def query_rag_knowledge_base(
     query: str,
     topic: str,
@@ -11,43 +31,59 @@ def query_rag_knowledge_base(
     include_domains: Optional[List[str]] = None,
 ) -> Dict[str, Any]:
     """
-    Queries a custom RAG knowledge base on Tavily.
+    Queries a knowledge base: a Tavily search restricted to the knowledge
+    base's domains (see KNOWLEDGE_BASES).
 
     Args:
         query (str): The search query to run against the knowledge base.
-        topic (str): The name of your custom knowledge base on Tavily.
-        search_depth (str, optional): The depth of the search. "advanced" is required for RAG.
-                                     Defaults to "advanced".
+        topic (str): The name of the knowledge base in TAVILY_KNOWLEDGE_BASES. It is
+                     not sent to Tavily, whose `topic` is a search category.
+        search_depth (str, optional): The depth of the search. Defaults to "advanced".
         max_results (int, optional): The maximum number of results to return. Defaults to 5.
-        include_domains (Optional[List[str]], optional): A list of domains to specifically search within
-                                                        your knowledge base. Defaults to None.
+        include_domains (Optional[List[str]], optional): Domains to search instead of the
+                                                        knowledge base's configured ones. Defaults to None.
 
     Returns:
         Dict[str, Any]: The search results from your Tavily RAG knowledge base.
     """
     try:
-        api_key = os.getenv("TAVILY_API_KEY")
-        if not api_key:
-            raise ValueError("TAVILY_API_KEY environment variable not set.")
-
-        tavily = TavilyClient(api_key=api_key)
-
-        # Use the rag() method to query your custom knowledge base
-        response = tavily.rag(
+        # Knowledge base queries go through /search scoped to its domains, on the shared, pooled client
+        response = get_tavily_client().search(
             query=query,
-            topic=topic,
             search_depth=search_depth,
             max_results=max_results,
-            include_domains=include_domains,
+            include_domains=knowledge_base_domains(topic, include_domains),
         )
         return response
     except Exception as e:
         print(f"An error occurred: {e}")
         return {"error": str(e)}
 
+async def async_query_rag_knowledge_base(
+    query: str,
+    topic: str,
+    search_depth: str = "advanced",
+    max_results: int = 5,
+    include_domains: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Async variant of query_rag_knowledge_base() for the FastAPI routes. Takes the
+    same arguments and returns the same results, without blocking the event loop.
+    """
+    try:
+        return await get_tavily_client().asearch(
+            query=query,
+            search_depth=search_depth,
+            max_results=max_results,
+            include_domains=knowledge_base_domains(topic, include_domains),
+        )
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        return {"error": str(e)}
+
 if __name__ == "__main__":
     # --- IMPORTANT ---
-    # Replace "your_knowledge_base_name" with the actual name of your knowledge base on Tavily.
+    # Replace "your_knowledge_base_name" with a knowledge base configured in TAVILY_KNOWLEDGE_BASES.
     my_knowledge_base_topic = "your_knowledge_base_name"
     my_query = "What is the main product offered on the website?"
 
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the scraper's top-level packages (core, scraping, ...), like main.py does when run from scraper/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
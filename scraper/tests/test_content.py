@@ -0,0 +1,35 @@
+from scraping.content import is_boilerplate, prepare_content
+
+
+def test_markdown_table_rows_are_kept():
+    assert not is_boilerplate("| Data Scientist | $120,000 | 35% |")
+    assert not is_boilerplate("| Role | Median salary | Growth |")
+    assert not is_boilerplate("|Software Engineer|$130,000|25%|")
+
+
+def test_markdown_table_divider_is_dropped():
+    assert is_boilerplate("|---|---|---|")
+    assert is_boilerplate("| :--- | :---: | ---: |")
+
+
+def test_menus_and_breadcrumbs_are_still_dropped():
+    assert is_boilerplate("Home | Careers | Data Science | Salaries")
+    assert is_boilerplate("Home » Careers » Data Scientist")
+    assert is_boilerplate("Accept all cookies to continue")
+
+
+def test_prepare_content_keeps_salary_table():
+    page = "\n".join([
+        "Home | Careers | Salaries | Contact",
+        "| Role | Median salary | Growth |",
+        "|---|---|---|",
+        "| Data Scientist | $120,000 | 35% |",
+        "| Data Analyst | $85,000 | 23% |",
+    ])
+
+    packed, stats = prepare_content([page], "Data Scientist")
+
+    assert "| Data Scientist | $120,000 | 35% |" in packed
+    assert "| Data Analyst | $85,000 | 23% |" in packed
+    assert "Contact" not in packed
+    assert stats["boilerplate_removed"] == 2
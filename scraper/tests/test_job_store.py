@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+from core.db import connect
+from core.jobs import JobStore, JobWorkerPool
+
+
+def make_store(tmp_path):
+    return JobStore(connect(str(tmp_path / "jobs.db")))
+
+
+def test_running_job_is_not_stolen_while_its_lease_is_live(tmp_path):
+    ours, theirs = make_store(tmp_path), make_store(tmp_path)
+    job_id = ours.submit("kind", {})
+
+    assert ours.claim_next("worker-a", lease_seconds=60)["id"] == job_id
+    # Another process starting up or polling leaves the live job alone
+    assert theirs.claim_next("worker-b", lease_seconds=60) is None
+    assert theirs.release("worker-b") == 0
+    assert theirs.get(job_id)["status"] == "running"
+
+
+def test_job_with_expired_lease_is_reclaimed(tmp_path):
+    ours, theirs = make_store(tmp_path), make_store(tmp_path)
+    job_id = ours.submit("kind", {})
+    ours.claim_next("dead-worker", lease_seconds=0.01)
+    time.sleep(0.02)
+
+    job = theirs.claim_next("worker-b", lease_seconds=60)
+
+    assert job["id"] == job_id
+    assert job["claimed_by"] == "worker-b"
+    assert job["attempts"] == 2
+    # The dead worker can no longer renew it
+    assert not ours.renew_lease(job_id, "dead-worker")
+
+
+def test_renewed_lease_keeps_the_job(tmp_path):
+    store = make_store(tmp_path)
+    job_id = store.submit("kind", {})
+    store.claim_next("worker-a", lease_seconds=0.05)
+    time.sleep(0.03)
+    assert store.renew_lease(job_id, "worker-a", lease_seconds=60)
+    time.sleep(0.03)
+
+    assert store.claim_next("worker-b") is None
+
+
+def test_release_only_requeues_the_stopping_workers_jobs(tmp_path):
+    store = make_store(tmp_path)
+    first, second = store.submit("kind", {}), store.submit("kind", {})
+    store.claim_next("worker-a")
+    store.claim_next("worker-b")
+
+    assert store.release("worker-a") == 1
+    assert store.get(first)["status"] == "queued"
+    assert store.get(second)["status"] == "running"
+
+
+def test_pool_runs_jobs_and_hands_back_unfinished_ones_on_stop(tmp_path):
+    store = make_store(tmp_path)
+
+    async def scenario():
+        pool = JobWorkerPool(
+            store, {"add": lambda a, b: a + b, "slow": lambda: time.sleep(0.5)},
+            workers=1, poll_seconds=0.01, lease_seconds=0.3,
+        )
+        pool.start()
+        done = await pool.asubmit("add", {"a": 1, "b": 2})
+        while store.get(done)["status"] != "succeeded":
+            await asyncio.sleep(0.01)
+
+        slow = await pool.asubmit("slow", {})
+        while store.get(slow)["status"] != "running":
+            await asyncio.sleep(0.01)
+        await pool.stop()
+        return done, slow
+
+    done, slow = asyncio.run(scenario())
+    assert store.get(done)["result"] == 3
+    assert store.get(slow)["status"] == "queued"
@@ -0,0 +1,264 @@
+import asyncio
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from core import resilience_core
+from core.ratelimit import RateLimiter
+from core.resilience import CircuitBreaker, CircuitOpenError, Upstream
+
+BACKEND_COPY = Path(__file__).resolve().parents[2] / "backend" / "app" / "core" / "resilience_core.py"
+
+
+class FakeClock:
+    """Stands in for the time module in core.resilience_core: sleeping just moves the clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(resilience_core, "time", fake)
+    return fake
+
+
+def flaky(failures, error=ConnectionError, result="ok"):
+    """A callable that raises `error` for its first `failures` calls, then returns `result`."""
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise error("upstream down")
+        return result
+
+    fn.calls = calls
+    return fn
+
+
+def test_transient_errors_are_retried_with_capped_backoff(clock):
+    upstream = Upstream("test", attempts=3, base_delay=1, max_delay=1.5, failure_threshold=10)
+    fn = flaky(2)
+
+    assert upstream.call(fn) == "ok"
+    assert len(fn.calls) == 3
+    assert len(clock.sleeps) == 2
+    assert 0 <= clock.sleeps[0] <= 1 and 0 <= clock.sleeps[1] <= 1.5
+    assert upstream.outcomes == {"retry": 2, "success": 1}
+
+
+def test_gives_up_after_the_last_attempt(clock):
+    upstream = Upstream("test", attempts=3, failure_threshold=10)
+    fn = flaky(5)
+
+    with pytest.raises(ConnectionError):
+        upstream.call(fn)
+    assert len(fn.calls) == 3
+    assert upstream.outcomes == {"retry": 2, "error": 1}
+
+
+def test_non_transient_errors_are_not_retried_or_counted_against_the_breaker(clock):
+    upstream = Upstream("test", attempts=3, failure_threshold=1)
+    fn = flaky(1, error=ValueError)
+
+    with pytest.raises(ValueError):
+        upstream.call(fn)
+    assert len(fn.calls) == 1
+    assert upstream.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_non_transient_error_during_the_trial_gives_no_verdict(clock):
+    upstream = Upstream("test", attempts=1, failure_threshold=1, reset_seconds=30)
+    with pytest.raises(ConnectionError):
+        upstream.call(flaky(1))
+    clock.now += 30
+
+    # An unparsable answer neither closes nor reopens the circuit; the next caller runs the trial
+    with pytest.raises(ValueError):
+        upstream.call(flaky(1, error=ValueError))
+    assert upstream.snapshot()["state"] == "half_open"
+    assert upstream.snapshot()["consecutive_failures"] == 1
+    assert upstream.call(lambda: "ok") == "ok"
+    assert upstream.snapshot()["state"] == "closed"
+
+
+def test_breaker_opens_then_lets_one_trial_through_after_the_reset(clock):
+    upstream = Upstream("test", attempts=1, failure_threshold=2, reset_seconds=30)
+    failing = flaky(100)
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            upstream.call(failing)
+    assert upstream.snapshot()["state"] == "open"
+
+    # Rejected without reaching the upstream while open
+    with pytest.raises(CircuitOpenError):
+        upstream.call(failing)
+    assert len(failing.calls) == 2
+
+    # A failed trial reopens the circuit for another full reset period
+    clock.now += 30
+    with pytest.raises(ConnectionError):
+        upstream.call(failing)
+    assert len(failing.calls) == 3
+    with pytest.raises(CircuitOpenError):
+        upstream.call(failing)
+
+    # A successful trial closes it
+    clock.now += 30
+    assert upstream.call(lambda: "ok") == "ok"
+    assert upstream.snapshot()["state"] == "closed"
+    assert upstream.snapshot()["consecutive_failures"] == 0
+
+
+def test_failure_that_opens_the_breaker_stops_the_retries(clock):
+    upstream = Upstream("test", attempts=5, failure_threshold=2)
+    fn = flaky(100)
+
+    with pytest.raises(ConnectionError):
+        upstream.call(fn)
+    assert len(fn.calls) == 2
+    assert upstream.breaker.state == CircuitBreaker.OPEN
+
+
+def test_cancelled_trial_releases_the_half_open_breaker(clock):
+    upstream = Upstream("test", attempts=1, failure_threshold=1, reset_seconds=30)
+    with pytest.raises(ConnectionError):
+        upstream.call(flaky(1))
+    clock.now += 30
+
+    async def scenario():
+        started = asyncio.Event()
+
+        async def hang():
+            started.set()
+            await asyncio.sleep(60)
+
+        trial = asyncio.create_task(upstream.acall(hang))
+        await started.wait()
+        # Only one trial at a time while half-open
+        with pytest.raises(CircuitOpenError):
+            await upstream.acall(hang)
+
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+        # The cancelled call gave no verdict, and the next caller gets to run the trial
+        assert upstream.breaker.state == CircuitBreaker.HALF_OPEN
+
+        async def succeed():
+            return "ok"
+
+        assert await upstream.acall(succeed) == "ok"
+
+    asyncio.run(scenario())
+    assert upstream.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_async_calls_retry_transient_errors():
+    upstream = Upstream("test", attempts=3, base_delay=0, failure_threshold=10)
+    fn = flaky(2)
+
+    async def attempt():
+        return fn()
+
+    assert asyncio.run(upstream.acall(attempt)) == "ok"
+    assert len(fn.calls) == 3
+
+
+def test_slow_call_is_hedged_and_the_first_success_wins():
+    upstream = Upstream("test", hedge_after=0.05)
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) == 1:
+            release.wait(5)
+            return "slow"
+        return "fast"
+
+    try:
+        assert upstream.call(fn, hedge=True) == "fast"
+    finally:
+        release.set()
+    assert upstream.outcomes == {"hedged": 1, "success": 1}
+
+
+def test_async_hedge_cancels_the_slower_copy():
+    upstream = Upstream("test", hedge_after=0.05)
+    calls = []
+    cancelled = []
+
+    async def attempt():
+        calls.append(1)
+        if len(calls) == 1:
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(1)
+                raise
+            return "slow"
+        return "fast"
+
+    async def scenario():
+        result = await upstream.acall(attempt, hedge=True)
+        # Give the cancelled copy a turn to unwind
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(scenario()) == "fast"
+    assert cancelled == [1]
+
+
+def test_no_hedge_without_a_free_rate_limit_slot():
+    # One call a minute: the first attempt takes the only slot
+    upstream = Upstream("test", hedge_after=0.05, limiter=RateLimiter(1))
+    calls = []
+
+    def fn():
+        calls.append(1)
+        time.sleep(0.2)
+        return "ok"
+
+    assert upstream.call(fn, hedge=True) == "ok"
+    assert len(calls) == 1
+    assert "hedged" not in upstream.outcomes
+
+
+def test_waiting_for_the_limiter_does_not_count_towards_the_hedge_delay():
+    # Five calls a second; the slot taken here makes the call below queue for ~0.2s
+    limiter = RateLimiter(300)
+    limiter.acquire()
+    upstream = Upstream("test", hedge_after=0.1, limiter=limiter)
+    calls = []
+
+    async def attempt():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    assert asyncio.run(upstream.acall(attempt, hedge=True)) == "ok"
+    assert len(calls) == 1
+    assert "hedged" not in upstream.outcomes
+
+
+def test_shared_core_matches_the_backend_copy():
+    if not BACKEND_COPY.exists():
+        pytest.skip("the backend is not checked out next to the scraper")
+    assert Path(resilience_core.__file__).read_bytes() == BACKEND_COPY.read_bytes(), (
+        "core/resilience_core.py and backend/app/core/resilience_core.py differ; copy the edited one over the other"
+    )
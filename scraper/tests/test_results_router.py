@@ -0,0 +1,58 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core import db, results
+from routes import results_router
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(results, "_conn", None)
+    monkeypatch.setattr(results, "connect", lambda: db.connect(str(tmp_path / "results.db")))
+    app = FastAPI()
+    app.include_router(results_router.router)
+    return TestClient(app)
+
+
+def ratings(career_growth):
+    return {"work_life_balance": 3, "salary_and_benefits": 4, "career_growth": career_growth,
+            "job_security": 3, "company_culture": 4}
+
+
+def test_query_filters_by_rating(client):
+    results.results_store.save("Data Scientist", ratings(5))
+    results.results_store.save("Data Entry Clerk", ratings(2))
+
+    response = client.get("/results", params={"min_career_growth": 4})
+
+    assert response.status_code == 200
+    assert [r["title"] for r in response.json()["results"]] == ["Data Scientist"]
+
+
+def test_bad_filter_is_a_400(client, monkeypatch):
+    def query(**kwargs):
+        raise ValueError("Unknown rated parameter 'vibes'.")
+
+    monkeypatch.setattr(results_router.results_store, "query", query)
+
+    response = client.get("/results")
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown rated parameter 'vibes'."
+
+
+def test_store_failure_is_a_500(client, monkeypatch):
+    def query(**kwargs):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(results_router.results_store, "query", query)
+
+    assert client.get("/results").status_code == 500
+
+
+def test_latest_result_and_404(client):
+    results.results_store.save("Data Scientist", ratings(5))
+
+    assert client.get("/results/data scientist").json()["ratings"]["career_growth"] == 5
+    assert client.get("/results/Astronaut").status_code == 404
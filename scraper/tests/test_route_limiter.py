@@ -0,0 +1,44 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from core.concurrency import RouteLimiter
+
+
+def test_run_blocking_returns_the_result():
+    limiter = RouteLimiter("Test", max_concurrent=2, timeout_seconds=5)
+
+    assert asyncio.run(limiter.run_blocking(lambda a, b=0: a + b, 1, b=2)) == 3
+
+
+def test_timed_out_call_holds_its_slot_until_the_thread_finishes():
+    limiter = RouteLimiter("Test", max_concurrent=1, timeout_seconds=0.1)
+    release = threading.Event()
+    started = []
+
+    async def scenario():
+        with pytest.raises(HTTPException) as exc_info:
+            await limiter.run_blocking(release.wait, 5)
+        assert exc_info.value.status_code == 504
+
+        # The abandoned thread still runs, so a second call cannot get the only slot
+        with pytest.raises(HTTPException):
+            await limiter.run_blocking(started.append, "second")
+        assert started == []
+
+        # Once the thread finishes the slot is free again
+        release.set()
+        await limiter.run_blocking(started.append, "third")
+        assert started == ["third"]
+
+    asyncio.run(scenario())
+
+
+def test_run_times_out_with_504():
+    limiter = RouteLimiter("Test", max_concurrent=1, timeout_seconds=0.05)
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(limiter.run(asyncio.sleep(1)))
+    assert exc_info.value.status_code == 504